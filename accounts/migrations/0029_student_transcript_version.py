@@ -0,0 +1,20 @@
+# Generated by Django 4.0.8 on 2026-10-18 20:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0028_remove_student_level_remove_user_facebook_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="student",
+            name="transcript_version",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=32
+            ),
+        ),
+    ]
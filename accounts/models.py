@@ -139,6 +139,11 @@ class StudentManager(models.Manager):
 class Student(models.Model):
     student = models.OneToOneField(User, on_delete=models.CASCADE)
     program = models.ForeignKey(Program, on_delete=models.CASCADE, null=True)
+    # renewed by result.transcript.clear_transcripts, the cached transcript
+    # is keyed by it so every process sees a change at once
+    transcript_version = models.CharField(
+        max_length=32, blank=True, default="", editable=False
+    )
 
     objects = StudentManager()
 
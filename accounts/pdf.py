@@ -0,0 +1,35 @@
+from io import BytesIO
+
+from django.template.loader import render_to_string
+from xhtml2pdf import pisa
+
+from .models import User, Student
+from .utils import get_profile_single_context
+
+
+def render_template_pdf(template_name, context):
+    """Render a template to PDF with xhtml2pdf and return the bytes."""
+    html = render_to_string(template_name, context)
+    buffer = BytesIO()
+    pisa_status = pisa.CreatePDF(html, dest=buffer)
+    if pisa_status.err:
+        raise ValueError("We had some errors rendering %s" % template_name)
+    return buffer.getvalue()
+
+
+# ########################################################
+# Background document jobs (see core.documents)
+# ########################################################
+def student_list_document():
+    students = Student.objects.select_related("student", "program")
+    return render_template_pdf("pdf/student_list.html", {"students": students})
+
+
+def lecturer_list_document():
+    lecturers = User.objects.filter(is_lecturer=True)
+    return render_template_pdf("pdf/lecturer_list.html", {"lecturers": lecturers})
+
+
+def profile_document(user_id):
+    context = get_profile_single_context(User.objects.get(pk=user_id))
+    return render_template_pdf("pdf/profile_single.html", context)
@@ -27,3 +27,36 @@ def generate_student_credentials():
 
 def generate_lecturer_credentials():
     return generate_lecturer_id(), generate_password()
+
+
+def get_profile_single_context(user):
+    """Context shared by the profile page of ``user`` and its PDF."""
+    from core.models import Session, Semester
+    from course.models import Course
+    from result.transcript import get_transcript
+    from .models import Student
+
+    current_session = Session.objects.filter(is_current_session=True).first()
+    current_semester = Semester.objects.filter(
+        is_current_semester=True, session=current_session
+    ).first()
+
+    context = {
+        "title": user.get_full_name,
+        "user": user,
+        "current_session": current_session,
+        "current_semester": current_semester,
+    }
+
+    if user.is_lecturer:
+        courses = Course.objects.filter(allocated_course__lecturer__pk=user.pk).filter(
+            semester=current_semester
+        )
+        context.update({"user_type": "Lecturer", "courses": courses})
+    elif user.is_student:
+        student = Student.objects.get(student=user)
+        courses = get_transcript(student)["courses"]
+        context.update({"user_type": "student", "courses": courses, "student": student})
+    else:
+        context["user_type"] = "superuser"
+    return context
@@ -15,12 +15,8 @@ from .decorators import admin_required
 from .forms import StaffAddForm, StudentAddForm, ProfileUpdateForm, ParentAddForm
 from .models import User, Student, Parent
 from .filters import LecturerFilter, StudentFilter
-
-# to generate pdf from template we need the following
-from django.http import HttpResponse
-from django.template.loader import get_template  # to get template which render as pdf
-from xhtml2pdf import pisa
-from django.template.loader import render_to_string  # to render a template into a string
+from core.documents import enqueue_document, document_job_response
+from .utils import get_profile_single_context
 
 
 def validate_username(request):
@@ -78,18 +74,6 @@ def profile(request):
 
     return render(request, "accounts/profile.html", context)
 
-def render_to_pdf(template_name, context):
-    """Renders a given template to PDF format."""
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = 'filename="profile.pdf"'  # Set default filename
-
-    template = render_to_string(template_name, context)
-    pdf = pisa.CreatePDF(template, dest=response)
-    if pdf.err:
-        return HttpResponse('We had some problems generating the PDF')
-
-    return response
-
 @login_required
 @admin_required
 def profile_single(request, id):
@@ -97,37 +81,17 @@ def profile_single(request, id):
     if request.user.id == id:
         return redirect("/profile/")
 
-    current_session = Session.objects.filter(is_current_session=True).first()
-    current_semester = Semester.objects.filter(
-        is_current_semester=True, session=current_session
-    ).first()
-
     user = get_object_or_404(User, pk=id)
-
-    common_context = {
-        "title": user.get_full_name,
-        "user": user,
-        "current_session": current_session,
-        "current_semester": current_semester,
-    }
-
-    if user.is_lecturer:
-        courses = Course.objects.filter(allocated_course__lecturer__pk=id).filter(
-            semester=current_semester
-        )
-        context = {**common_context, "user_type": "Lecturer", "courses": courses}
-    elif user.is_student:
-        student = get_object_or_404(Student, student__pk=id)
-        courses = TakenCourse.objects.filter(
-        )
-        context = {**common_context, "user_type": "student", "courses": courses, "student": student}
-    else:
-        context = {**common_context, "user_type": "superuser"}
+    if user.is_student:
+        get_object_or_404(Student, student__pk=id)
 
     if request.GET.get('download_pdf'):
-        return render_to_pdf("pdf/profile_single.html", context)
-    else:
-        return render(request, "accounts/profile_single.html", context)
+        job = enqueue_document(
+            "profile", user.username + ".pdf", request.user, user_id=user.pk
+        )
+        return document_job_response(request, job)
+    context = get_profile_single_context(user)
+    return render(request, "accounts/profile_single.html", context)
 
 @login_required
 @admin_required
@@ -260,22 +224,11 @@ class LecturerFilterView(FilterView):
 
 
 # lecturers list pdf
+@login_required
+@admin_required
 def render_lecturer_pdf_list(request):
-    lecturers = User.objects.filter(is_lecturer=True)
-    template_path = 'pdf/lecturer_list.html'
-    context = {'lecturers': lecturers}
-    response = HttpResponse(content_type='application/pdf')  # convert the response to pdf
-    response['Content-Disposition'] = 'filename="lecturers_list.pdf"'
-    # find the template and render it.
-    template = get_template(template_path)
-    html = template.render(context)
-    # create a pdf
-    pisa_status = pisa.CreatePDF(
-        html, dest=response)
-    # if error then show some funny view
-    if pisa_status.err:
-        return HttpResponse('We had some errors <pre>' + html + '</pre>')
-    return response
+    job = enqueue_document("lecturer_list", "lecturers_list.pdf", request.user)
+    return document_job_response(request, job)
 
 
 # @login_required
@@ -369,22 +322,11 @@ class StudentListView(FilterView):
 
 
 # student list pdf
+@login_required
+@admin_required
 def render_student_pdf_list(request):
-    students = Student.objects.all()
-    template_path = 'pdf/student_list.html'
-    context = {'students': students}
-    response = HttpResponse(content_type='application/pdf')  # convert the response to pdf
-    response['Content-Disposition'] = 'filename="students_list.pdf"'
-    # find the template and render it.
-    template = get_template(template_path)
-    html = template.render(context)
-    # create a pdf
-    pisa_status = pisa.CreatePDF(
-        html, dest=response)
-    # if error then show some funny view
-    if pisa_status.err:
-        return HttpResponse('We had some errors <pre>' + html + '</pre>')
-    return response
+    job = enqueue_document("student_list", "students_list.pdf", request.user)
+    return document_job_response(request, job)
 
 
 @login_required
@@ -115,6 +115,25 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/4.0/topics/cache/
+# Set CACHE_BACKEND=django.core.cache.backends.redis.RedisCache and
+# CACHE_LOCATION=redis://127.0.0.1:6379/1 to share the cache between workers.
+CACHES = {
+    "default": {
+        "BACKEND": config(
+            "CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": config("CACHE_LOCATION", default=""),
+    }
+}
+
+# Celery
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html
+# Set CELERY_TASK_ALWAYS_EAGER=True to run tasks (e.g. the document jobs)
+# in the calling process when no worker is available.
+CELERY_BROKER_URL = config("CELERY_BROKER_URL", default="amqp://guest@localhost//")
+CELERY_TASK_ALWAYS_EAGER = config("CELERY_TASK_ALWAYS_EAGER", default=False, cast=bool)
 
 # https://docs.djangoproject.com/en/stable/ref/settings/#std:setting-DEFAULT_AUTO_FIELD
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -239,6 +258,53 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 STUDENT_ID_PREFIX = config("STUDENT_ID_PREFIX", "ugr")
 LECTURER_ID_PREFIX = config("LECTURER_ID_PREFIX", "lec")
 
+# Seconds a rendered result sheet is kept in the cache, 0 disables caching
+RESULT_SHEET_CACHE_TIMEOUT = config(
+    "RESULT_SHEET_CACHE_TIMEOUT", default=60 * 60 * 24, cast=int
+)
+
+# Seconds a rendered document (PDF, semester archive) is kept for download,
+# purge_documents then deletes the job and its file
+DOCUMENT_JOB_TTL = config("DOCUMENT_JOB_TTL", default=60 * 60 * 24 * 7, cast=int)
+
+# Seconds a student's transcript is cached, it is also dropped on changes
+TRANSCRIPT_CACHE_TIMEOUT = config(
+    "TRANSCRIPT_CACHE_TIMEOUT", default=60 * 60 * 24, cast=int
+)
+
+# Seconds the compiled grading scales are cached, an edit is dropped at once
+# in the process that made it and reaches the other processes within this
+GRADE_SCALES_CACHE_TIMEOUT = config("GRADE_SCALES_CACHE_TIMEOUT", default=60, cast=int)
+
+# Seconds the questions and choices of a quiz are cached, edits bump a version
+QUIZ_PAYLOAD_CACHE_TIMEOUT = config(
+    "QUIZ_PAYLOAD_CACHE_TIMEOUT", default=60 * 60 * 24, cast=int
+)
+
+# Keep the state of sittings in progress in the cache and write it to the
+# database every QUIZ_LIVE_CHECKPOINT answers and on completion. All the
+# processes must share the cache, e.g.
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+QUIZ_LIVE_SITTINGS = config("QUIZ_LIVE_SITTINGS", default=False, cast=bool)
+QUIZ_LIVE_CHECKPOINT = config("QUIZ_LIVE_CHECKPOINT", default=10, cast=int)
+QUIZ_LIVE_TIMEOUT = config("QUIZ_LIVE_TIMEOUT", default=60 * 60 * 24, cast=int)
+
+# Seconds before a quiz opens that the sittings of its students are created
+QUIZ_PROVISION_LEAD = config("QUIZ_PROVISION_LEAD", default=60 * 15, cast=int)
+
+# Seconds after the deadline of a timed sitting that answers are still
+# accepted, for the submissions in flight when the time ran out
+QUIZ_DEADLINE_GRACE = config("QUIZ_DEADLINE_GRACE", default=30, cast=int)
+
+# Seconds after which an incomplete sitting is abandoned, compact_sittings
+# then deletes it or completes it when it is an exam paper with answers
+QUIZ_SITTING_TTL = config("QUIZ_SITTING_TTL", default=60 * 60 * 24 * 7, cast=int)
+
+# Seconds the item analysis of a quiz is cached, new sittings and marks renew it
+QUIZ_ANALYSIS_CACHE_TIMEOUT = config(
+    "QUIZ_ANALYSIS_CACHE_TIMEOUT", default=60 * 60, cast=int
+)
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
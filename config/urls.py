@@ -19,6 +19,8 @@ urlpatterns = [
     path("quiz/", include("quiz.urls")),
     path("payments/", include("payments.urls")),
     path("accounts/api/", include("accounts.api.urls", namespace="accounts-api")),
+    path("result/api/", include("result.api.urls", namespace="result-api")),
+    path("quiz/api/", include("quiz.api.urls", namespace="quiz-api")),
     path("admin/", admin.site.urls),
 ]
 
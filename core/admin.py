@@ -1,9 +1,57 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.auth.models import Group
+from django.utils.html import format_html
 
-from .models import Session, Semester, NewsAndEvents
+from result.export import RESULT_SHEETS, REGISTRATION_FORMS
+from .documents import enqueue_document
+from .models import Session, Semester, NewsAndEvents, DocumentJob
 
 
-admin.site.register(Semester)
+def export_semester_documents(modeladmin, request, queryset, kind):
+    if queryset.count() != 1:
+        modeladmin.message_user(
+            request, "Select exactly one semester to export.", messages.ERROR
+        )
+        return None
+    semester = queryset.select_related("session").get()
+    filename = "{0}_semester_{1}_{2}.zip".format(semester, semester.session, kind)
+    # rendered by a worker like the other documents, not in this request
+    job = enqueue_document(
+        "semester_archive", filename, request.user, export=kind, semester_id=semester.pk
+    )
+    modeladmin.message_user(
+        request,
+        format_html(
+            'Exporting {}, <a href="{}">download it</a> once it is ready.',
+            job.filename,
+            job.get_absolute_url(),
+        ),
+    )
+    return None
+
+
+class SemesterAdmin(admin.ModelAdmin):
+    list_display = ["semester", "session", "is_current_semester"]
+    actions = ["export_result_sheets", "export_registration_forms"]
+
+    @admin.action(description="Export result sheets of the selected semester")
+    def export_result_sheets(self, request, queryset):
+        return export_semester_documents(self, request, queryset, RESULT_SHEETS)
+
+    @admin.action(description="Export registration forms of the selected semester")
+    def export_registration_forms(self, request, queryset):
+        return export_semester_documents(self, request, queryset, REGISTRATION_FORMS)
+
+
+admin.site.register(Semester, SemesterAdmin)
 admin.site.register(Session)
 admin.site.register(NewsAndEvents)
+
+
+class DocumentJobAdmin(admin.ModelAdmin):
+    list_display = ["filename", "kind", "status", "created_by", "created_at"]
+    list_filter = ["kind", "status"]
+    readonly_fields = ["finished_at"]
+
+
+admin.site.register(DocumentJob, DocumentJobAdmin)
@@ -3,3 +3,12 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = "core"
+
+    def ready(self) -> None:
+        from django.db.models.signals import post_delete
+        from .models import DocumentJob
+        from .signals import document_job_deleted_receiver
+
+        post_delete.connect(document_job_deleted_receiver, sender=DocumentJob)
+
+        return super().ready()
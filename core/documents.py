@@ -0,0 +1,101 @@
+import datetime
+import logging
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.http import JsonResponse
+from django.shortcuts import redirect
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import DocumentJob
+
+logger = logging.getLogger(__name__)
+
+# Job kind -> function rendering the document from the job params to bytes
+DOCUMENT_RENDERERS = {
+    "result_sheet": "result.pdf.result_sheet_document",
+    "registration_form": "result.pdf.registration_form_document",
+    "student_list": "accounts.pdf.student_list_document",
+    "lecturer_list": "accounts.pdf.lecturer_list_document",
+    "profile": "accounts.pdf.profile_document",
+    "semester_archive": "result.export.semester_archive_document",
+}
+
+
+def enqueue_document(kind, filename, user=None, **params):
+    """
+    Create a DocumentJob and queue it for rendering.
+
+    ``params`` are stored as JSON and passed to the renderer of ``kind``,
+    so they must be plain values (ids, strings). The task is sent once the
+    surrounding transaction commits so the worker can see the job.
+    """
+    from .tasks import render_document
+
+    if kind not in DOCUMENT_RENDERERS:
+        raise ValueError(f"Unknown document kind '{kind}'.")
+    job = DocumentJob.objects.create(
+        kind=kind,
+        params=params,
+        filename=filename.replace("/", "-"),
+        created_by=user,
+    )
+    transaction.on_commit(lambda: render_document.delay(str(job.pk)))
+    return job
+
+
+def run_document_job(job_id):
+    """Render a queued job and store the file on it. Called by the worker."""
+    job = DocumentJob.objects.get(pk=job_id)
+    if job.is_finished:
+        return job
+    job.status = DocumentJob.RUNNING
+    job.save(update_fields=["status"])
+    try:
+        content = import_string(DOCUMENT_RENDERERS[job.kind])(**job.params)
+    except Exception as exc:
+        logger.exception("Rendering document job %s failed", job.pk)
+        job.status = DocumentJob.FAILED
+        job.error = str(exc)
+    else:
+        job.file.save(job.filename, ContentFile(content), save=False)
+        job.status = DocumentJob.DONE
+    job.finished_at = timezone.now()
+    job.save()
+    return job
+
+
+def purge_document_jobs(ttl=None, now=None):
+    """
+    Delete the jobs created more than ``ttl`` seconds ago, DOCUMENT_JOB_TTL
+    by default; their files go with them. Returns the number of jobs.
+    """
+    ttl = settings.DOCUMENT_JOB_TTL if ttl is None else ttl
+    now = now or timezone.now()
+    deleted, _ = DocumentJob.objects.filter(
+        created_at__lt=now - datetime.timedelta(seconds=ttl)
+    ).delete()
+    return deleted
+
+
+def document_job_response(request, job):
+    """
+    Answer a request that queued ``job``: API clients get the job id and
+    its status URL, browsers are sent to the page that waits for the file.
+    """
+    if "application/json" in request.headers.get("Accept", ""):
+        return JsonResponse(document_job_data(job), status=202)
+    return redirect(job)
+
+
+def document_job_data(job):
+    return {
+        "id": str(job.pk),
+        "status": job.status,
+        "error": job.error,
+        "status_url": reverse("document_job_status", kwargs={"pk": job.pk}),
+        "url": job.get_absolute_url() if job.status == DocumentJob.DONE else None,
+    }
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core.documents import purge_document_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the document jobs older than DOCUMENT_JOB_TTL with their "
+        "rendered files. Run it periodically, e.g. daily from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ttl", type=int, help="Seconds, DOCUMENT_JOB_TTL by default."
+        )
+
+    def handle(self, *args, **options):
+        deleted = purge_document_jobs(ttl=options["ttl"])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} document jobs."))
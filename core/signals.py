@@ -0,0 +1,8 @@
+from django.db import transaction
+
+
+def document_job_deleted_receiver(sender, instance=None, **kwargs):
+    """Remove the rendered file once the job row is gone for good"""
+    if instance.file:
+        storage, name = instance.file.storage, instance.file.name
+        transaction.on_commit(lambda: storage.delete(name))
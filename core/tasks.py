@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from .documents import run_document_job
+
+
+@shared_task
+def render_document(job_id):
+    run_document_job(job_id)
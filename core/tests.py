@@ -1,3 +1,116 @@
-from django.test import TestCase
+import datetime
+import io
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from config.celery import app as celery_app
+from core import documents
+from core.models import DocumentJob
+
+
+@override_settings(
+    MEDIA_ROOT=tempfile.mkdtemp(),
+    STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage",
+)
+class DocumentJobTestCase(TestCase):
+    def setUp(self):
+        # run the jobs in-process like a worker would
+        celery_app.conf.CELERY_TASK_ALWAYS_EAGER = True
+        self.addCleanup(setattr, celery_app.conf, "CELERY_TASK_ALWAYS_EAGER", False)
+        self.admin = User.objects.create_superuser(username="admin", password="pw")
+        self.client.force_login(self.admin)
+
+    def enqueue(self, **params):
+        with self.captureOnCommitCallbacks(execute=True):
+            return documents.enqueue_document(
+                "lecturer_list", "lecturers.pdf", self.admin, **params
+            )
+
+    def test_job_is_pending_until_a_worker_runs_it(self):
+        with mock.patch("core.tasks.render_document.delay") as delay:
+            job = self.enqueue()
+        delay.assert_called_once_with(str(job.pk))
+        response = self.client.get(
+            reverse("document_job_status", kwargs={"pk": job.pk})
+        )
+        self.assertEqual(response.json()["status"], DocumentJob.PENDING)
+        self.assertIsNone(response.json()["url"])
+        response = self.client.get(job.get_absolute_url())
+        self.assertTemplateUsed(response, "core/document_job.html")
+
+    def test_eager_job_is_rendered_and_served(self):
+        with mock.patch.dict(
+            documents.DOCUMENT_RENDERERS,
+            {"lecturer_list": "core.tests.render_stub"},
+        ):
+            job = self.enqueue(title="Lecturers")
+        job.refresh_from_db()
+        self.assertEqual(job.status, DocumentJob.DONE)
+        self.assertIsNotNone(job.finished_at)
+        response = self.client.get(job.get_absolute_url())
+        self.assertEqual(b"".join(response.streaming_content), b"%PDF Lecturers")
+
+    def test_failed_job_keeps_the_error(self):
+        with mock.patch.dict(
+            documents.DOCUMENT_RENDERERS,
+            {"lecturer_list": "core.tests.render_failure"},
+        ):
+            job = self.enqueue()
+        response = self.client.get(
+            reverse("document_job_status", kwargs={"pk": job.pk})
+        )
+        self.assertEqual(response.json()["status"], DocumentJob.FAILED)
+        self.assertEqual(response.json()["error"], "boom")
+
+    def test_api_clients_get_the_job_id(self):
+        with mock.patch("core.tasks.render_document.delay"):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.get(
+                    reverse("lecturer_list_pdf"), HTTP_ACCEPT="application/json"
+                )
+        self.assertEqual(response.status_code, 202)
+        job = DocumentJob.objects.get()
+        self.assertEqual(response.json()["id"], str(job.pk))
+
+    def test_old_jobs_are_purged_with_their_files(self):
+        with mock.patch.dict(
+            documents.DOCUMENT_RENDERERS,
+            {"lecturer_list": "core.tests.render_stub"},
+        ):
+            old, recent = self.enqueue(title="Old"), self.enqueue(title="Recent")
+        old.refresh_from_db()
+        DocumentJob.objects.filter(pk=old.pk).update(
+            created_at=timezone.now() - datetime.timedelta(days=8)
+        )
+        self.assertTrue(old.file.storage.exists(old.file.name))
+
+        out = io.StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("purge_documents", stdout=out)
+        self.assertIn("Deleted 1 document jobs", out.getvalue())
+        self.assertEqual(list(DocumentJob.objects.all()), [recent])
+        self.assertFalse(old.file.storage.exists(old.file.name))
+        recent.refresh_from_db()
+        self.assertTrue(recent.file.storage.exists(recent.file.name))
+
+    def test_other_users_cannot_see_the_job(self):
+        with mock.patch("core.tasks.render_document.delay"):
+            job = self.enqueue()
+        other = User.objects.create_user(username="other", password="pw")
+        self.client.force_login(other)
+        response = self.client.get(job.get_absolute_url())
+        self.assertEqual(response.status_code, 404)
+
+
+def render_stub(title):
+    return b"%PDF " + title.encode()
+
+
+def render_failure():
+    raise ValueError("boom")
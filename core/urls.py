@@ -14,6 +14,8 @@ from .views import (
     semester_update_view,
     semester_delete_view,
     dashboard_view,
+    document_job_view,
+    document_job_status,
 )
 
 
@@ -32,4 +34,10 @@ urlpatterns = [
     path("semester/<int:pk>/edit/", semester_update_view, name="edit_semester"),
     path("semester/<int:pk>/delete/", semester_delete_view, name="delete_semester"),
     path("dashboard/", dashboard_view, name="dashboard"),
+    path("documents/<uuid:pk>/", document_job_view, name="document_job"),
+    path(
+        "documents/<uuid:pk>/status/",
+        document_job_status,
+        name="document_job_status",
+    ),
 ]
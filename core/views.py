@@ -1,11 +1,15 @@
+import mimetypes
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, Http404, JsonResponse
 
 from accounts.decorators import admin_required, lecturer_required
 from accounts.models import User, Student
 from .forms import SessionForm, SemesterForm, NewsAndEventsForm
-from .models import NewsAndEvents, ActivityLog, Session, Semester
+from .documents import document_job_data
+from .models import NewsAndEvents, ActivityLog, Session, Semester, DocumentJob
 
 
 # ########################################################
@@ -33,6 +37,7 @@ def dashboard_view(request):
         "males_count": gender_count["M"],
         "females_count": gender_count["F"],
         "logs": logs,
+        "current_semester": Semester.objects.filter(is_current_semester=True).first(),
     }
     return render(request, "core/dashboard.html", context)
 
@@ -308,3 +313,32 @@ def semester_delete_view(request, pk):
         semester.delete()
         messages.success(request, "Semester successfully deleted")
     return redirect("semester_list")
+
+
+# ########################################################
+# Document jobs
+# ########################################################
+def get_document_job(request, pk):
+    job = get_object_or_404(DocumentJob, pk=pk)
+    if job.created_by_id != request.user.id and not request.user.is_superuser:
+        raise Http404
+    return job
+
+
+@login_required
+def document_job_view(request, pk):
+    """Serve a rendered document, or a page that waits until it is ready."""
+    job = get_document_job(request, pk)
+    if job.status == DocumentJob.DONE:
+        return FileResponse(
+            job.file.open("rb"),
+            content_type=mimetypes.guess_type(job.filename)[0] or "application/pdf",
+            filename=job.filename,
+        )
+    context = {"title": job.filename, "job": job}
+    return render(request, "core/document_job.html", context)
+
+
+@login_required
+def document_job_status(request, pk):
+    return JsonResponse(document_job_data(get_document_job(request, pk)))
@@ -6,12 +6,16 @@ from django.utils.translation import gettext_lazy as _
 from .models import (
     Quiz,
     Progress,
+    QuizProgress,
     Question,
     MCQuestion,
     Choice,
     EssayQuestion,
     Sitting,
+    SittingAnswer,
+    RescoreJob,
 )
+from .rescoring import enqueue_rescore
 
 
 class ChoiceInline(admin.TabularInline):
@@ -63,15 +67,27 @@ class MCQuestionAdmin(admin.ModelAdmin):
 
     search_fields = ("content", "explanation")
     filter_horizontal = ("quiz",)
+    actions = ["rescore_sittings"]
 
     inlines = [ChoiceInline]
 
+    @admin.action(description=_("Пересчитать ответы по текущему ключу"))
+    def rescore_sittings(self, request, queryset):
+        for question in queryset:
+            enqueue_rescore(question, request.user)
+        self.message_user(
+            request, _("Пересчет запущен для %d вопросов.") % len(queryset)
+        )
+
 
 class ProgressAdmin(admin.ModelAdmin):
-    search_fields = (
-        "user",
-        "score",
-    )
+    search_fields = ("user__username",)
+
+
+class QuizProgressAdmin(admin.ModelAdmin):
+    list_display = ("user", "quiz", "score", "possible")
+    list_select_related = ("user", "quiz")
+    search_fields = ("user__username", "quiz__title")
 
 
 class EssayQuestionAdmin(admin.ModelAdmin):
@@ -86,8 +102,41 @@ class EssayQuestionAdmin(admin.ModelAdmin):
     filter_horizontal = ("quiz",)
 
 
+class SittingAnswerInline(admin.TabularInline):
+    model = SittingAnswer
+    fields = ("position", "question", "answer", "correct", "created_at")
+    readonly_fields = ("position", "question", "answer", "created_at")
+    extra = 0
+    can_delete = False
+
+
+class RescoreJobAdmin(admin.ModelAdmin):
+    list_display = (
+        "question",
+        "status",
+        "processed",
+        "total",
+        "changed",
+        "created_by",
+        "created_at",
+    )
+    list_filter = ("status",)
+    readonly_fields = ("total", "processed", "changed", "finished_at")
+
+
+class SittingAdmin(admin.ModelAdmin):
+    list_display = ("user", "quiz", "current_position", "question_count", "complete")
+    list_filter = ("complete",)
+    search_fields = ("user__username", "quiz__title")
+    readonly_fields = ("current_position", "question_count")
+
+    inlines = [SittingAnswerInline]
+
+
 admin.site.register(Quiz, QuizAdmin)
 admin.site.register(MCQuestion, MCQuestionAdmin)
 admin.site.register(Progress, ProgressAdmin)
+admin.site.register(QuizProgress, QuizProgressAdmin)
 admin.site.register(EssayQuestion, EssayQuestionAdmin)
-admin.site.register(Sitting)
+admin.site.register(Sitting, SittingAdmin)
+admin.site.register(RescoreJob, RescoreJobAdmin)
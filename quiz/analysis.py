@@ -0,0 +1,171 @@
+"""
+Item analysis of the completed sittings of a quiz.
+
+``get_item_analysis`` reports for every question its difficulty (the share
+of correct answers), its point-biserial discrimination against the sitting
+totals and, for multiple choice questions, how often each choice was
+picked, together with the KR-20 reliability of the quiz. The answers are
+read as one streamed column set and folded into running sums, so memory
+stays flat with the number of sittings.
+"""
+import hashlib
+import math
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Q, Sum
+
+from .models import MCQuestion, Sitting, SittingAnswer
+from .payload import get_quiz_payload
+
+# difficulty above which a question is too easy, below which too hard
+EASY = 0.9
+HARD = 0.2
+# discrimination below which a question does not separate strong students
+POOR_DISCRIMINATION = 0.2
+
+
+def analysis_cache_key(quiz_id, version, stamp):
+    return f"quiz:analysis:{quiz_id}:{version}:{stamp}"
+
+
+def get_item_analysis(quiz):
+    """
+    Return the item analysis of ``quiz``.
+
+    It is cached under the quiz version and a stamp of its completed
+    sittings (count, score total and last end), so it is computed again
+    once the quiz is edited, taken or marked.
+    """
+    stamp = Sitting.objects.filter(quiz=quiz, complete=True).aggregate(
+        sittings=Count("id"), score=Sum("current_score"), end=Max("end")
+    )
+    stamp = hashlib.md5(repr(sorted(stamp.items())).encode()).hexdigest()
+    key = analysis_cache_key(quiz.pk, quiz.payload_version, stamp)
+    analysis = cache.get(key)
+    if analysis is None:
+        analysis = build_item_analysis(quiz)
+        cache.set(key, analysis, settings.QUIZ_ANALYSIS_CACHE_TIMEOUT)
+    return analysis
+
+
+def build_item_analysis(quiz):
+    payload = get_quiz_payload(quiz)
+    answers = SittingAnswer.objects.filter(
+        sitting__quiz=quiz, sitting__complete=True, question_id__in=payload
+    ).order_by()
+    totals = dict(
+        answers.values_list("sitting").annotate(
+            total=Count("id", filter=Q(correct=True))
+        )
+    )
+
+    # per question: answered, correct, sum and sum of squares of the totals
+    # of the sittings answering it, sum of the totals of correct ones
+    sums = defaultdict(lambda: [0, 0, 0, 0, 0])
+    picks = defaultdict(Counter)
+    for sitting_id, question_id, answer, correct in answers.values_list(
+        "sitting_id", "question_id", "answer", "correct"
+    ).iterator(chunk_size=2000):
+        total = totals[sitting_id]
+        item = sums[question_id]
+        item[0] += 1
+        item[2] += total
+        item[3] += total * total
+        if correct:
+            item[1] += 1
+            item[4] += total
+        if isinstance(payload[question_id], MCQuestion):
+            picks[question_id][answer] += 1
+
+    items = [
+        item_data(question, sums[question.id], picks[question.id])
+        for question in payload.values()
+    ]
+    scores = list(totals.values())
+    return {
+        "sittings": len(scores),
+        "mean": round(mean(scores), 2),
+        "stddev": round(math.sqrt(variance(scores)), 2),
+        "reliability": kr20(items, scores),
+        "items": items,
+    }
+
+
+def item_data(question, sums, picks):
+    answered, correct, total, total_squares, correct_total = sums
+    difficulty = correct / answered if answered else None
+    discrimination = None
+    if answered and 0 < correct < answered:
+        total_variance = total_squares / answered - (total / answered) ** 2
+        if total_variance > 0:
+            # r = (M1 - M0) / s * sqrt(p * q)
+            mean_correct = correct_total / correct
+            mean_incorrect = (total - correct_total) / (answered - correct)
+            discrimination = round(
+                (mean_correct - mean_incorrect)
+                / math.sqrt(total_variance)
+                * math.sqrt(difficulty * (1 - difficulty)),
+                3,
+            )
+    flags = []
+    if difficulty is not None and difficulty > EASY:
+        flags.append("easy")
+    if difficulty is not None and difficulty < HARD:
+        flags.append("hard")
+    if discrimination is not None and discrimination < POOR_DISCRIMINATION:
+        flags.append("poor")
+    return {
+        "question": question.id,
+        "content": question.content,
+        "answered": answered,
+        "correct": correct,
+        "difficulty": None if difficulty is None else round(difficulty, 3),
+        "discrimination": discrimination,
+        "flags": flags,
+        "distractors": distractors(question, picks, answered),
+    }
+
+
+def distractors(question, picks, answered):
+    if not isinstance(question, MCQuestion):
+        return []
+    return [
+        {
+            "choice": choice.id,
+            "text": choice.choice,
+            "correct": choice.correct,
+            "count": picks[str(choice.id)],
+            "share": round(picks[str(choice.id)] / answered, 3) if answered else 0,
+        }
+        for choice in question.choice_set.all()
+    ]
+
+
+def kr20(items, scores):
+    """
+    Kuder-Richardson 20 reliability, None with less than two questions or
+    no spread in the totals.
+    """
+    answered = [item for item in items if item["answered"]]
+    score_variance = variance(scores)
+    if len(answered) < 2 or not score_variance:
+        return None
+    pq = sum(
+        item["correct"] / item["answered"] * (1 - item["correct"] / item["answered"])
+        for item in answered
+    )
+    k = len(answered)
+    return round(k / (k - 1) * (1 - pq / score_variance), 3)
+
+
+def mean(values):
+    return sum(values) / len(values) if values else 0
+
+
+def variance(values):
+    if not values:
+        return 0
+    average = mean(values)
+    return sum((value - average) ** 2 for value in values) / len(values)
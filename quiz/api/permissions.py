@@ -0,0 +1,8 @@
+from rest_framework.permissions import BasePermission
+
+
+class CanTakeQuiz(BasePermission):
+    """Draft quizzes can only be taken by users who may edit quizzes."""
+
+    def has_object_permission(self, request, view, quiz):
+        return not quiz.draft or request.user.has_perm("quiz.change_quiz")
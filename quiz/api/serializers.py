@@ -0,0 +1,40 @@
+from rest_framework import serializers
+
+from ..models import EssayQuestion
+
+
+class SittingQuestionSerializer(serializers.Serializer):
+    """A question as shown to the student, without the answer key."""
+
+    id = serializers.IntegerField()
+    type = serializers.SerializerMethodField()
+    content = serializers.CharField()
+    figure = serializers.SerializerMethodField()
+    choices = serializers.SerializerMethodField()
+
+    def get_type(self, question):
+        return "essay" if isinstance(question, EssayQuestion) else "mc"
+
+    def get_figure(self, question):
+        return question.figure.url if question.figure else None
+
+    def get_choices(self, question):
+        if isinstance(question, EssayQuestion):
+            return []
+        return [
+            {"id": pk, "choice": choice}
+            for pk, choice in question.get_choices_list(self.context.get("seed"))
+        ]
+
+
+class SubmissionSerializer(serializers.Serializer):
+    answers = serializers.DictField(
+        child=serializers.CharField(allow_blank=True), allow_empty=True
+    )
+
+
+class SubmittedAnswerSerializer(serializers.Serializer):
+    question = serializers.IntegerField(source="question_id")
+    position = serializers.IntegerField()
+    answer = serializers.CharField()
+    correct = serializers.BooleanField()
@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = "quiz-api"
+
+urlpatterns = [
+    path("<int:pk>/<slug>/", views.QuizSittingAPIView.as_view(), name="sitting"),
+]
@@ -0,0 +1,106 @@
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from course.models import Course
+from ..expiry import expire_sittings
+from ..leaderboard import get_standing, record_result
+from ..models import Quiz, QuizProgress, Sitting
+from ..payload import get_quiz_payload
+from .permissions import CanTakeQuiz
+from .serializers import (
+    SittingQuestionSerializer,
+    SubmissionSerializer,
+    SubmittedAnswerSerializer,
+)
+
+
+class QuizSittingAPIView(APIView):
+    """
+    GET the remaining questions of the user's sitting at a quiz at once,
+    POST ``{"answers": {question_id: guess}}`` to grade them all in one
+    batch and complete the sitting.
+    """
+
+    permission_classes = [IsAuthenticated, CanTakeQuiz]
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.quiz = get_object_or_404(Quiz, slug=kwargs["slug"])
+        self.check_object_permissions(request, self.quiz)
+        if (
+            self.quiz.opens_at
+            and self.quiz.opens_at > timezone.now()
+            and not (request.user.is_superuser or request.user.is_lecturer)
+        ):
+            raise PermissionDenied(
+                f"The quiz opens at {timezone.localtime(self.quiz.opens_at).isoformat()}."
+            )
+        self.course = get_object_or_404(Course, pk=kwargs["pk"])
+        self.payload = get_quiz_payload(self.quiz)
+        if not self.payload:
+            raise ValidationError("The quiz has no questions.")
+        self.sitting = Sitting.objects.user_sitting(
+            request.user, self.quiz, self.course
+        )
+        if self.sitting is False:
+            raise PermissionDenied("The quiz allows a single attempt.")
+        if self.sitting.is_expired():
+            # the scheduler may not have reached it yet
+            expire_sittings([self.sitting.pk])
+            raise PermissionDenied("The time for the quiz is up.")
+
+    def get(self, request, *args, **kwargs):
+        questions = self.sitting.get_questions(payload=self.payload)
+        answered, total = self.sitting.progress()
+        return Response(
+            {
+                "sitting": self.sitting.pk,
+                "quiz": self.quiz.title,
+                "answered": answered,
+                "total": total,
+                "questions": SittingQuestionSerializer(
+                    questions[answered:],
+                    many=True,
+                    context={"seed": self.sitting.seed},
+                ).data,
+            }
+        )
+
+    def post(self, request, *args, **kwargs):
+        serializer = SubmissionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        answers = self.sitting.submit_answers(
+            serializer.validated_data["answers"], self.payload
+        )
+        if answers is False:
+            return Response(
+                {"detail": "The answers were already submitted."},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        QuizProgress.objects.add_score(
+            request.user,
+            self.quiz,
+            sum(answer.correct for answer in answers),
+            len(answers),
+        )
+        self.sitting.mark_quiz_complete()
+        self.sitting.user = request.user
+        record_result(self.sitting)
+        data = {
+            "sitting": self.sitting.pk,
+            "score": self.sitting.get_current_score,
+            "max_score": self.sitting.get_max_score,
+            "percent": self.sitting.get_percent_correct,
+            "passed": self.sitting.check_if_passed,
+            "standing": get_standing(self.quiz, self.sitting.get_percent_correct),
+            "answers": SubmittedAnswerSerializer(answers, many=True).data,
+        }
+        if not self.sitting.is_kept_for(request.user):
+            self.sitting.delete()
+        return Response(data)
@@ -3,3 +3,37 @@ from django.apps import AppConfig
 
 class QuizConfig(AppConfig):
     name = "quiz"
+
+    def ready(self) -> None:
+        from django.db.models.signals import (
+            pre_save,
+            post_save,
+            post_delete,
+            pre_delete,
+            m2m_changed,
+        )
+        from .models import Quiz, Question, MCQuestion, EssayQuestion, Choice
+        from .signals import (
+            quiz_changed_receiver,
+            quiz_pre_save_receiver,
+            quiz_scheduled_receiver,
+            question_changed_receiver,
+            choice_changed_receiver,
+            question_quiz_changed_receiver,
+        )
+
+        post_save.connect(quiz_changed_receiver, sender=Quiz)
+        pre_save.connect(quiz_pre_save_receiver, sender=Quiz)
+        post_save.connect(quiz_scheduled_receiver, sender=Quiz)
+        post_delete.connect(quiz_changed_receiver, sender=Quiz)
+        for model in (Question, MCQuestion, EssayQuestion):
+            post_save.connect(question_changed_receiver, sender=model)
+            # while the question still knows its quizzes
+            pre_delete.connect(question_changed_receiver, sender=model)
+        post_save.connect(choice_changed_receiver, sender=Choice)
+        post_delete.connect(choice_changed_receiver, sender=Choice)
+        m2m_changed.connect(
+            question_quiz_changed_receiver, sender=Question.quiz.through
+        )
+
+        return super().ready()
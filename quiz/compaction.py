@@ -0,0 +1,114 @@
+"""
+Compaction of the sittings left incomplete.
+
+Sittings abandoned for longer than ``QUIZ_SITTING_TTL`` seconds are
+deleted, or completed with the answers given when they count as an exam
+paper, and the duplicate open sittings of a user at a quiz are reduced to
+the most advanced one. Everything works in batches of primary keys. Run
+it periodically with ``manage.py compact_sittings``.
+"""
+import datetime
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .leaderboard import refresh_results
+from .models import Sitting
+
+COMPACTION_BATCH_SIZE = 1000
+
+
+def compact_sittings(ttl=None, batch_size=COMPACTION_BATCH_SIZE, now=None):
+    """
+    Reap the stale sittings and merge the duplicates. Returns the counts
+    of ``{"deleted", "archived", "merged", "answers", "questions"}``, the
+    last two being the rows deleted with the sittings.
+    """
+    now = now or timezone.now()
+    ttl = settings.QUIZ_SITTING_TTL if ttl is None else ttl
+    report = Counter(deleted=0, archived=0, merged=0, answers=0, questions=0)
+    reap_stale_sittings(now - datetime.timedelta(seconds=ttl), batch_size, report)
+    merge_duplicate_sittings(batch_size, report)
+    return dict(report)
+
+
+def reap_stale_sittings(cutoff, batch_size, report):
+    stale = Sitting.objects.filter(complete=False, start__lt=cutoff)
+    last_pk = 0
+    while True:
+        batch = list(
+            stale.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list(
+                "pk",
+                "current_position",
+                "quiz__exam_paper",
+                "user__is_superuser",
+                "user__is_lecturer",
+            )[:batch_size]
+        )
+        if not batch:
+            break
+        last_pk = batch[-1][0]
+
+        # as Sitting.is_kept_for(), an exam paper with answers is kept
+        archive, drop = [], []
+        for pk, position, exam_paper, is_superuser, is_lecturer in batch:
+            if position and exam_paper and not (is_superuser or is_lecturer):
+                archive.append(pk)
+            else:
+                drop.append(pk)
+        with transaction.atomic():
+            report["archived"] += Sitting.objects.filter(
+                pk__in=archive, complete=False
+            ).update(complete=True, end=timezone.now())
+            delete_sittings(drop, report, "deleted")
+        refresh_results(archive)
+
+
+def merge_duplicate_sittings(batch_size, report):
+    """
+    Keep one open sitting per user, quiz and course, the one furthest in
+    (then the latest), as user_sitting() expects.
+    """
+    duplicates = list(
+        Sitting.objects.filter(complete=False)
+        .values_list("user", "quiz", "course")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+        .order_by()
+    )
+    for start in range(0, len(duplicates), batch_size):
+        keys = {key[:3] for key in duplicates[start : start + batch_size]}
+        sittings = (
+            Sitting.objects.filter(
+                complete=False,
+                user_id__in={user_id for user_id, quiz_id, course_id in keys},
+                quiz_id__in={quiz_id for user_id, quiz_id, course_id in keys},
+            )
+            .order_by("-current_position", "-pk")
+            .values_list("pk", "user", "quiz", "course")
+        )
+        kept, drop = set(), []
+        for pk, *key in sittings:
+            key = tuple(key)
+            if key not in keys:
+                continue
+            if key in kept:
+                drop.append(pk)
+            else:
+                kept.add(key)
+        with transaction.atomic():
+            delete_sittings(drop, report, "merged")
+
+
+def delete_sittings(sitting_ids, report, counter):
+    if not sitting_ids:
+        return
+    deleted, per_model = Sitting.objects.filter(pk__in=sitting_ids).delete()
+    report[counter] += per_model.get("quiz.Sitting", 0)
+    report["answers"] += per_model.get("quiz.SittingAnswer", 0)
+    report["questions"] += per_model.get("quiz.SittingQuestion", 0)
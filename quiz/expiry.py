@@ -0,0 +1,137 @@
+"""
+Expiry of timed sittings.
+
+``ExpiryScheduler`` keeps the deadlines of the open timed sittings in a
+heap. Every round it reads only the sittings started since the previous
+round, and all the open ones now and then, and completes those whose
+deadline passed, once
+the ``QUIZ_DEADLINE_GRACE`` given to answers in flight is over; it sleeps
+until the next one otherwise. Run one with ``manage.py
+expire_sittings``.
+"""
+import datetime
+import heapq
+import logging
+import time
+
+from django.db.models import F
+from django.utils import timezone
+
+from . import live
+from .leaderboard import record_result
+from .models import QuizProgress, Sitting, get_grace
+
+logger = logging.getLogger(__name__)
+
+# sittings committed a while after they started are picked up by reading
+# again this far before the previous round, and by a read of all the open
+# sittings every FULL_RELOAD_INTERVAL for the transactions longer than that
+RELOAD_OVERLAP = datetime.timedelta(minutes=1)
+FULL_RELOAD_INTERVAL = datetime.timedelta(minutes=10)
+
+
+def expire_sittings(sitting_ids, now=None):
+    """
+    Complete the sittings of ``sitting_ids`` whose deadline passed, with
+    the answers given so far, and drop those that are not kept. Returns
+    the ids of the sittings expired.
+    """
+    now = now or timezone.now()
+    sittings = list(
+        Sitting.objects.filter(
+            pk__in=sitting_ids, complete=False, deadline__lte=now - get_grace()
+        ).select_related("quiz", "user")
+    )
+    if live.live_enabled():
+        for sitting in sittings:
+            if sitting.quiz.single_page:
+                continue
+            # write the answers still in the cache, as the view would
+            live.restore_sitting(sitting)
+            live.complete_sitting(sitting)
+            QuizProgress.objects.add_score(
+                sitting.user,
+                sitting.quiz,
+                sitting.current_score,
+                sitting.current_position,
+            )
+    expired = [sitting.pk for sitting in sittings]
+    Sitting.objects.filter(pk__in=expired, complete=False).update(
+        complete=True, end=F("deadline")
+    )
+    for sitting in sittings:
+        if not sitting.complete:
+            sitting.complete, sitting.end = True, sitting.deadline
+        record_result(sitting)
+    Sitting.objects.filter(
+        pk__in=[
+            sitting.pk for sitting in sittings if not sitting.is_kept_for(sitting.user)
+        ]
+    ).delete()
+    return expired
+
+
+class ExpiryScheduler:
+    def __init__(self):
+        self.heap = []
+        self.scheduled = set()
+        self.loaded_at = None
+        self.swept_at = None
+
+    def push(self, pk, deadline):
+        if pk not in self.scheduled:
+            self.scheduled.add(pk)
+            heapq.heappush(self.heap, (deadline + get_grace(), pk))
+
+    def load(self):
+        """
+        Schedule the timed sittings started since the last load, or all the
+        open ones when the last full read is ``FULL_RELOAD_INTERVAL`` old.
+        """
+        now = timezone.now()
+        sittings = Sitting.objects.filter(complete=False, deadline__isnull=False)
+        if self.swept_at is None or now - self.swept_at >= FULL_RELOAD_INTERVAL:
+            self.swept_at = now
+        else:
+            sittings = sittings.filter(start__gte=self.loaded_at - RELOAD_OVERLAP)
+        self.loaded_at = now
+        for pk, deadline in sittings.values_list("pk", "deadline"):
+            self.push(pk, deadline)
+
+    def pop_due(self, now):
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            deadline, pk = heapq.heappop(self.heap)
+            self.scheduled.discard(pk)
+            due.append(pk)
+        return due
+
+    def run_once(self, now=None):
+        """Expire the sittings due at ``now``, returns their ids."""
+        now = now or timezone.now()
+        self.load()
+        due = self.pop_due(now)
+        if not due:
+            return []
+        expired = expire_sittings(due, now)
+        # sittings given more time since they were loaded go back in
+        for pk, deadline in Sitting.objects.filter(
+            pk__in=set(due) - set(expired), complete=False, deadline__isnull=False
+        ).values_list("pk", "deadline"):
+            self.push(pk, deadline)
+        if expired:
+            logger.info("Expired %s sittings", len(expired))
+        return expired
+
+    def seconds_to_next(self, now, interval):
+        """Seconds to sleep: until the next deadline, at most ``interval``."""
+        if not self.heap:
+            return interval
+        return min(interval, max((self.heap[0][0] - now).total_seconds(), 0))
+
+    def run(self, interval=5, rounds=None):
+        done = 0
+        while rounds is None or done < rounds:
+            self.run_once()
+            done += 1
+            time.sleep(self.seconds_to_next(timezone.now(), interval))
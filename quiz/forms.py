@@ -7,7 +7,8 @@ from django.db import transaction
 from django.forms.models import inlineformset_factory
 
 from accounts.models import User
-from .models import Question, Quiz, MCQuestion, Choice
+from . import question_bank
+from .models import Question, Quiz, MCQuestion, Choice, EssayQuestion
 
 
 class QuestionForm(forms.Form):
@@ -15,24 +16,81 @@ class QuestionForm(forms.Form):
         model = MCQuestion
         fields = ['content', 'figure', 'quiz']
 
-    def __init__(self, question, *args, **kwargs):
+    def __init__(self, question, *args, seed=None, **kwargs):
         super(QuestionForm, self).__init__(*args, **kwargs)
-        choice_list = [x for x in question.get_choices_list()]
+        choice_list = [x for x in question.get_choices_list(seed)]
         self.fields["answers"] = forms.ChoiceField(
             choices=choice_list, widget=RadioSelect
         )
 class EssayForm(forms.Form):
-    def __init__(self, question, *args, **kwargs):
+    def __init__(self, question, *args, seed=None, **kwargs):
         super(EssayForm, self).__init__(*args, **kwargs)
         self.fields["answers"] = forms.CharField(
             widget=Textarea(attrs={"style": "width:100%"})
         )
 
 
+class QuizSubmissionForm(forms.Form):
+    """All the remaining questions of a sitting, answered in one request."""
+
+    def __init__(self, questions, *args, seed=None, **kwargs):
+        super(QuizSubmissionForm, self).__init__(*args, **kwargs)
+        self.questions = questions
+        for question in questions:
+            if isinstance(question, EssayQuestion):
+                field = forms.CharField(
+                    widget=Textarea(attrs={"style": "width:100%"}), required=False
+                )
+            else:
+                field = forms.ChoiceField(
+                    choices=question.get_choices_list(seed),
+                    widget=RadioSelect,
+                    required=False,
+                )
+            field.question = question
+            self.fields[f"question_{question.id}"] = field
+
+    def get_answers(self):
+        return {
+            question.id: self.cleaned_data.get(f"question_{question.id}", "")
+            for question in self.questions
+        }
+
+
+class QuestionImportForm(forms.Form):
+    file = forms.FileField(label=_("Файл"))
+    format = forms.ChoiceField(
+        label=_("Формат"),
+        choices=(
+            (question_bank.JSON, "JSON"),
+            (question_bank.CSV, "CSV"),
+            (question_bank.GIFT, "GIFT"),
+        ),
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if self.errors:
+            return cleaned_data
+        try:
+            content = cleaned_data["file"].read().decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise forms.ValidationError(_("Файл должен быть в кодировке UTF-8."))
+        cleaned_data["questions"] = question_bank.parse_questions(
+            content, cleaned_data["format"]
+        )
+        return cleaned_data
+
+
 class QuizAddForm(forms.ModelForm):
     class Meta:
         model = Quiz
         exclude = []
+        widgets = {
+            "opens_at": forms.DateTimeInput(
+                attrs={"type": "datetime-local"}, format="%Y-%m-%dT%H:%M"
+            ),
+        }
 
     questions = forms.ModelMultipleChoiceField(
         queryset=Question.objects.all().select_subclasses(),
@@ -0,0 +1,167 @@
+"""
+Per-quiz leaderboards.
+
+Every student's best result at a quiz is a LeaderboardEntry, and the
+entries are counted per percent in at most 101 LeaderboardBuckets. A
+completed sitting updates its entry and moves one count between buckets,
+so the top of a quiz is an indexed read of its first entries and the
+rank and percentile of a result are read from the buckets, whatever the
+number of sittings.
+"""
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import LeaderboardBucket, LeaderboardEntry, Sitting, percent_correct
+
+
+def is_ranked(user):
+    return not (user.is_superuser or user.is_lecturer)
+
+
+def record_result(sitting):
+    """Enter the result of the completed ``sitting`` if it is its user's best."""
+    if not is_ranked(sitting.user):
+        return
+    values = {
+        "percent": sitting.get_percent_correct,
+        "score": max(sitting.current_score, 0),
+        "max_score": sitting.question_count,
+        "achieved_at": sitting.end or timezone.now(),
+    }
+    entries = LeaderboardEntry.objects.filter(
+        quiz_id=sitting.quiz_id, user_id=sitting.user_id
+    )
+    with transaction.atomic():
+        entry = entries.select_for_update().first()
+        if entry is None:
+            try:
+                with transaction.atomic():
+                    LeaderboardEntry.objects.create(
+                        quiz_id=sitting.quiz_id, user_id=sitting.user_id, **values
+                    )
+            except IntegrityError:
+                # entered by a concurrent completion in the meantime
+                entry = entries.select_for_update().get()
+            else:
+                move_buckets(sitting.quiz_id, {values["percent"]: 1})
+                return
+        if values["percent"] > entry.percent:
+            entries.update(**values)
+            move_buckets(sitting.quiz_id, {entry.percent: -1, values["percent"]: 1})
+
+
+def refresh_results(sitting_ids):
+    """
+    Rank again the users of ``sitting_ids`` after their scores changed,
+    from the best of their stored completed sittings.
+    """
+    pairs = set(
+        Sitting.objects.filter(pk__in=sitting_ids, complete=True).values_list(
+            "quiz_id", "user_id"
+        )
+    )
+    for quiz_id in {quiz_id for quiz_id, user_id in pairs}:
+        user_ids = {
+            user_id for pair_quiz_id, user_id in pairs if pair_quiz_id == quiz_id
+        }
+        refresh_entries(quiz_id, user_ids)
+
+
+def refresh_entries(quiz_id, user_ids):
+    best = {}
+    for user_id, score, question_count, end in (
+        Sitting.objects.filter(
+            quiz_id=quiz_id,
+            user_id__in=user_ids,
+            complete=True,
+            user__is_superuser=False,
+            user__is_lecturer=False,
+        )
+        .order_by("end")
+        .values_list("user_id", "current_score", "question_count", "end")
+    ):
+        percent = percent_correct(score, question_count)
+        if user_id not in best or percent > best[user_id].percent:
+            best[user_id] = LeaderboardEntry(
+                quiz_id=quiz_id,
+                user_id=user_id,
+                percent=percent,
+                score=max(score, 0),
+                max_score=question_count,
+                achieved_at=end or timezone.now(),
+            )
+
+    entries = LeaderboardEntry.objects.filter(quiz_id=quiz_id, user_id__in=user_ids)
+    with transaction.atomic():
+        deltas = Counter()
+        for percent in entries.select_for_update().values_list("percent", flat=True):
+            deltas[percent] -= 1
+        for entry in best.values():
+            deltas[entry.percent] += 1
+        entries.delete()
+        LeaderboardEntry.objects.bulk_create(best.values())
+        move_buckets(quiz_id, deltas)
+
+
+def move_buckets(quiz_id, deltas):
+    """Add ``{percent: delta}`` to the buckets of ``quiz_id``."""
+    for percent, delta in deltas.items():
+        if not delta:
+            continue
+        buckets = LeaderboardBucket.objects.filter(quiz_id=quiz_id, percent=percent)
+        if buckets.update(count=F("count") + delta) or delta < 0:
+            continue
+        try:
+            with transaction.atomic():
+                LeaderboardBucket.objects.create(
+                    quiz_id=quiz_id, percent=percent, count=delta
+                )
+        except IntegrityError:
+            buckets.update(count=F("count") + delta)
+
+
+def top_entries(quiz, limit=10):
+    return list(
+        LeaderboardEntry.objects.filter(quiz=quiz)
+        .select_related("user")
+        .order_by("-percent", "achieved_at")[:limit]
+    )
+
+
+def get_standing(quiz, percent):
+    """
+    The ``{"rank", "percentile", "total"}`` of a result of ``percent`` at
+    ``quiz`` among the best results of its students, None before any.
+    The percentile counts the results below and half of the equal ones.
+    """
+    return get_standings([(quiz, percent)])[0]
+
+
+def get_standings(results):
+    """
+    The standings of ``[(quiz, percent)]`` results, as ``get_standing``
+    gives them, with one read of the buckets of all their quizzes.
+    """
+    results = list(results)
+    counts = defaultdict(dict)
+    for quiz_id, percent, count in LeaderboardBucket.objects.filter(
+        quiz__in=[quiz for quiz, percent in results], count__gt=0
+    ).values_list("quiz_id", "percent", "count"):
+        counts[quiz_id][percent] = count
+    return [_standing(counts[quiz.pk], percent) for quiz, percent in results]
+
+
+def _standing(counts, percent):
+    total = sum(counts.values())
+    if not total:
+        return None
+    above = sum(count for value, count in counts.items() if value > percent)
+    below = sum(count for value, count in counts.items() if value < percent)
+    return {
+        "rank": above + 1,
+        "percentile": round(100 * (below + counts.get(percent, 0) / 2) / total),
+        "total": total,
+    }
@@ -0,0 +1,146 @@
+"""
+Live state of the sittings in progress, kept in the cache.
+
+With ``QUIZ_LIVE_SITTINGS`` on, answering a question writes nothing to the
+database: the answer takes its position with an atomic ``cache.add`` and
+the position and score move with ``cache.incr``. The answers are written
+with one bulk insert and one update of the sitting every
+``QUIZ_LIVE_CHECKPOINT`` answers and when the sitting completes. If the
+cache loses the state, the sitting resumes from its last checkpoint.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Sitting, SittingAnswer
+
+
+def live_enabled():
+    return settings.QUIZ_LIVE_SITTINGS
+
+
+def live_key(sitting_id, name):
+    return f"quiz:live:{sitting_id}:{name}"
+
+
+def answer_key(sitting_id, position):
+    return live_key(sitting_id, f"answer:{position}")
+
+
+def restore_sitting(sitting):
+    """
+    Set the position and score of ``sitting`` from its live state, seeding
+    the state from the database when the cache has none.
+    """
+    position_key = live_key(sitting.pk, "position")
+    score_key = live_key(sitting.pk, "score")
+    timeout = settings.QUIZ_LIVE_TIMEOUT
+    if cache.add(position_key, sitting.current_position, timeout):
+        cache.set_many(
+            {
+                score_key: sitting.current_score,
+                live_key(sitting.pk, "flushed"): sitting.current_position,
+            },
+            timeout,
+        )
+    state = cache.get_many([position_key, score_key])
+    sitting.current_position = state.get(position_key, sitting.current_position)
+    sitting.current_score = state.get(score_key, sitting.current_score)
+    return sitting
+
+
+def record_answer(sitting, question, guess, correct=False):
+    """
+    The live counterpart of Sitting.add_user_answer(): record ``guess`` at
+    the current position in the cache and move on. An answer already
+    recorded at this position is kept and False returned.
+    """
+    timeout = settings.QUIZ_LIVE_TIMEOUT
+    if not cache.add(
+        answer_key(sitting.pk, sitting.current_position),
+        (question.pk, guess, bool(correct)),
+        timeout,
+    ):
+        return False
+    try:
+        sitting.current_position = cache.incr(live_key(sitting.pk, "position"))
+        sitting.current_score = cache.incr(
+            live_key(sitting.pk, "score"), int(bool(correct))
+        )
+    except ValueError:
+        # the counters expired under us, carry on from this request's view
+        sitting.current_position += 1
+        sitting.current_score += int(bool(correct))
+        cache.set_many(
+            {
+                live_key(sitting.pk, "position"): sitting.current_position,
+                live_key(sitting.pk, "score"): sitting.current_score,
+            },
+            timeout,
+        )
+    if sitting.current_position % settings.QUIZ_LIVE_CHECKPOINT == 0:
+        flush_sitting(sitting)
+    return True
+
+
+def flush_sitting(sitting, complete=False):
+    """
+    Write the answers recorded since the last checkpoint and the position
+    and score of ``sitting``, completing it if ``complete``, in one bulk
+    insert and one update.
+    """
+    flushed_key = live_key(sitting.pk, "flushed")
+    flushed = cache.get(flushed_key, 0)
+    answers = cache.get_many(
+        [
+            answer_key(sitting.pk, position)
+            for position in range(flushed, sitting.current_position)
+        ]
+    )
+    rows = []
+    for position in range(flushed, sitting.current_position):
+        answer = answers.get(answer_key(sitting.pk, position))
+        if answer is None:
+            # evicted from the cache, the position is left unanswered
+            continue
+        question_id, guess, correct = answer
+        rows.append(
+            SittingAnswer(
+                sitting=sitting,
+                question_id=question_id,
+                position=position,
+                answer=guess,
+                correct=correct,
+            )
+        )
+    fields = {
+        "current_position": sitting.current_position,
+        "current_score": sitting.current_score,
+    }
+    if complete:
+        sitting.complete, sitting.end = True, timezone.now()
+        fields.update(complete=True, end=sitting.end)
+    with transaction.atomic():
+        # ignore_conflicts: a checkpoint cut short may have written some
+        SittingAnswer.objects.bulk_create(rows, ignore_conflicts=True)
+        Sitting.objects.filter(
+            pk=sitting.pk, current_position__lte=sitting.current_position
+        ).update(**fields)
+    cache.set(flushed_key, sitting.current_position, settings.QUIZ_LIVE_TIMEOUT)
+
+
+def complete_sitting(sitting):
+    """Flush ``sitting`` as complete and drop its live state."""
+    flush_sitting(sitting, complete=True)
+    clear_sitting(sitting)
+
+
+def clear_sitting(sitting):
+    cache.delete_many(
+        [live_key(sitting.pk, name) for name in ("position", "score", "flushed")]
+        + [
+            answer_key(sitting.pk, position)
+            for position in range(sitting.question_count)
+        ]
+    )
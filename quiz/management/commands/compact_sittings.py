@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from quiz.compaction import COMPACTION_BATCH_SIZE, compact_sittings
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete or complete the sittings abandoned for longer than "
+        "QUIZ_SITTING_TTL and merge the duplicate open sittings. Run it "
+        "periodically, e.g. daily from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ttl", type=int, help="Seconds, QUIZ_SITTING_TTL by default."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=COMPACTION_BATCH_SIZE,
+            help="Sittings handled per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        report = compact_sittings(ttl=options["ttl"], batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Deleted {deleted} stale sittings, completed {archived} and merged "
+                "away {merged} duplicates ({answers} answers and {questions} "
+                "questions reclaimed).".format(**report)
+            )
+        )
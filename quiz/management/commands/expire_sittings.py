@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from quiz.expiry import ExpiryScheduler
+
+
+class Command(BaseCommand):
+    help = (
+        "Complete the timed sittings whose deadline passed. Runs until stopped, "
+        "one process is enough for all the quizzes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Most seconds between two looks for new sittings.",
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Expire the due sittings and exit."
+        )
+
+    def handle(self, *args, **options):
+        scheduler = ExpiryScheduler()
+        if options["once"]:
+            expired = scheduler.run_once()
+            self.stdout.write(self.style.SUCCESS(f"Expired {len(expired)} sittings."))
+            return
+        scheduler.run(interval=options["interval"])
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz.models import Quiz
+from quiz.provisioning import due_quizzes, provision_sittings
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the sittings of the quizzes opening within QUIZ_PROVISION_LEAD "
+        "seconds for the students of their course. Run it from cron where the "
+        "queued provisioning tasks are not reliable."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--quiz", type=int, help="Provision this quiz whatever its opening time."
+        )
+
+    def handle(self, *args, **options):
+        if options["quiz"] is not None:
+            quizzes = Quiz.objects.filter(pk=options["quiz"])
+            if not quizzes:
+                raise CommandError(f"There is no quiz {options['quiz']}.")
+        else:
+            quizzes = due_quizzes()
+        for quiz in quizzes:
+            created = provision_sittings(quiz)
+            self.stdout.write(
+                self.style.SUCCESS(f"Provisioned {created} sittings of {quiz}.")
+            )
@@ -0,0 +1,68 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .leaderboard import refresh_results
+from .models import QuizProgress, Sitting, SittingAnswer
+
+
+def essay_queue(quiz):
+    """
+    The answers to essay questions of ``quiz`` in completed sittings that
+    no lecturer marked yet, grouped by question.
+    """
+    return (
+        SittingAnswer.objects.filter(
+            sitting__quiz=quiz,
+            sitting__complete=True,
+            question__essayquestion__isnull=False,
+            marked_at__isnull=True,
+        )
+        .select_related("sitting__user", "question")
+        .order_by("question_id", "pk")
+    )
+
+
+def mark_answers(quiz, marks):
+    """
+    Record the marks given to essay answers of ``quiz`` in one batch.
+
+    ``marks`` maps answer ids to whether the answer is correct. The answers
+    are written with one bulk update and the scores of their sittings are
+    moved with one F() update per distinct change, and the quiz progress of
+    their students likewise. Returns the number of answers marked.
+    """
+    answers = list(
+        SittingAnswer.objects.filter(
+            pk__in=marks, sitting__quiz=quiz, question__essayquestion__isnull=False
+        ).only("pk", "sitting_id", "correct")
+    )
+    marked_at = timezone.now()
+    deltas = Counter()
+    for answer in answers:
+        correct = marks[answer.pk]
+        deltas[answer.sitting_id] += int(correct) - int(answer.correct)
+        answer.correct = correct
+        answer.marked_at = marked_at
+
+    sittings = defaultdict(list)
+    for sitting_id, delta in deltas.items():
+        if delta:
+            sittings[delta].append(sitting_id)
+    with transaction.atomic():
+        SittingAnswer.objects.bulk_update(answers, ["correct", "marked_at"])
+        for delta, sitting_ids in sittings.items():
+            Sitting.objects.filter(pk__in=sitting_ids).update(
+                current_score=F("current_score") + delta
+            )
+        if sittings:
+            progress = Counter()
+            for pk, user_id in Sitting.objects.filter(
+                pk__in=[pk for pks in sittings.values() for pk in pks]
+            ).values_list("pk", "user_id"):
+                progress[user_id, quiz.pk] += deltas[pk]
+            QuizProgress.objects.move_scores(progress)
+    refresh_results([pk for pks in sittings.values() for pk in pks])
+    return len(answers)
@@ -0,0 +1,182 @@
+import json
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_sitting_answers(apps, schema_editor):
+    """
+    Move the comma separated question lists and the JSON answers of every
+    sitting to SittingQuestion and SittingAnswer rows. Questions deleted
+    since the sitting started are dropped.
+    """
+    Sitting = apps.get_model("quiz", "Sitting")
+    SittingQuestion = apps.get_model("quiz", "SittingQuestion")
+    SittingAnswer = apps.get_model("quiz", "SittingAnswer")
+    Question = apps.get_model("quiz", "Question")
+
+    existing = set(Question.objects.values_list("id", flat=True))
+    sittings, questions, answers = [], [], []
+    for sitting in Sitting.objects.iterator():
+        order = [int(n) for n in sitting.question_order.split(",") if n]
+        remaining = [n for n in sitting.question_list.split(",") if n]
+        asked = order[: len(order) - len(remaining)]
+        incorrect = {int(n) for n in sitting.incorrect_questions.split(",") if n}
+        user_answers = json.loads(sitting.user_answers or "{}")
+
+        order = [question_id for question_id in order if question_id in existing]
+        for position, question_id in enumerate(order):
+            questions.append(
+                SittingQuestion(
+                    sitting_id=sitting.pk, question_id=question_id, position=position
+                )
+            )
+            if str(question_id) in user_answers:
+                answers.append(
+                    SittingAnswer(
+                        sitting_id=sitting.pk,
+                        question_id=question_id,
+                        position=position,
+                        answer=str(user_answers[str(question_id)]),
+                        correct=question_id not in incorrect,
+                    )
+                )
+        sitting.question_count = len(order)
+        sitting.current_position = len(
+            [question_id for question_id in asked if question_id in existing]
+        )
+        sittings.append(sitting)
+
+    SittingQuestion.objects.bulk_create(questions, batch_size=1000)
+    SittingAnswer.objects.bulk_create(answers, batch_size=1000)
+    Sitting.objects.bulk_update(
+        sittings, ["question_count", "current_position"], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0014_alter_quiz_options"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sitting",
+            name="current_position",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Current Position"
+            ),
+        ),
+        migrations.AddField(
+            model_name="sitting",
+            name="question_count",
+            field=models.PositiveIntegerField(default=0, verbose_name="Question Count"),
+        ),
+        migrations.CreateModel(
+            name="SittingQuestion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("position", models.PositiveIntegerField()),
+                (
+                    "question",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sitting_questions",
+                        to="quiz.question",
+                    ),
+                ),
+                (
+                    "sitting",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="questions",
+                        to="quiz.sitting",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("sitting", "position"),
+            },
+        ),
+        migrations.CreateModel(
+            name="SittingAnswer",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("position", models.PositiveIntegerField()),
+                ("answer", models.TextField(blank=True)),
+                ("correct", models.BooleanField(default=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "question",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sitting_answers",
+                        to="quiz.question",
+                    ),
+                ),
+                (
+                    "sitting",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="answers",
+                        to="quiz.sitting",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("sitting", "position"),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="sittingquestion",
+            constraint=models.UniqueConstraint(
+                fields=("sitting", "position"), name="unique_sitting_question_position"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sittinganswer",
+            index=models.Index(
+                fields=["sitting", "correct"], name="quiz_sittin_sitting_e18096_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="sittinganswer",
+            constraint=models.UniqueConstraint(
+                fields=("sitting", "position"), name="unique_sitting_answer_position"
+            ),
+        ),
+        migrations.RunPython(copy_sitting_answers, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="sitting",
+            name="incorrect_questions",
+        ),
+        migrations.RemoveField(
+            model_name="sitting",
+            name="question_list",
+        ),
+        migrations.RemoveField(
+            model_name="sitting",
+            name="question_order",
+        ),
+        migrations.RemoveField(
+            model_name="sitting",
+            name="user_answers",
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.0.8 on 2026-10-18 19:33
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("quiz", "0015_sitting_answers"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="progress",
+            name="score",
+        ),
+        migrations.CreateModel(
+            name="QuizProgress",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score", models.PositiveIntegerField(default=0, verbose_name="Счет")),
+                (
+                    "possible",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Возможный счет"
+                    ),
+                ),
+                (
+                    "quiz",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="quiz.quiz",
+                        verbose_name="Тест",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="quiz_progress",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Пользователь",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Прогресс по тесту",
+                "verbose_name_plural": "Прогресс по тестам",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="quizprogress",
+            constraint=models.UniqueConstraint(
+                fields=("user", "quiz"), name="unique_quiz_progress"
+            ),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.0.8 on 2026-10-18 19:37
+
+from django.db import migrations, models
+import quiz.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0016_quiz_progress"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="quiz",
+            name="max_questions",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Сколько вопросов выбрать из вопросов теста для каждой попытки. Пусто - все вопросы.",
+                null=True,
+                verbose_name="Количество вопросов",
+            ),
+        ),
+        migrations.AddField(
+            model_name="sitting",
+            name="seed",
+            field=models.PositiveIntegerField(
+                default=quiz.models.new_sitting_seed,
+                help_text="Orders the questions and choices of the sitting.",
+                verbose_name="Seed",
+            ),
+        ),
+    ]
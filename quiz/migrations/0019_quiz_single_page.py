@@ -0,0 +1,22 @@
+# Generated by Django 4.0.8 on 2026-10-18 19:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0018_rescorejob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="quiz",
+            name="single_page",
+            field=models.BooleanField(
+                default=False,
+                help_text="Если да, все вопросы показываются сразу и ответы отправляются одним запросом.",
+                verbose_name="Все вопросы на одной странице",
+            ),
+        ),
+    ]
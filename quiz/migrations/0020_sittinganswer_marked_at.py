@@ -0,0 +1,24 @@
+# Generated by Django 4.0.8 on 2026-10-18 19:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0019_quiz_single_page"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sittinganswer",
+            name="marked_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="sittinganswer",
+            index=models.Index(
+                fields=["question", "marked_at"], name="quiz_sittin_questio_07688e_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.0.8 on 2026-10-18 19:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0020_sittinganswer_marked_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="quiz",
+            name="opens_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Когда тест откроется для студентов. Попытки студентов курса создаются заранее, незадолго до начала.",
+                null=True,
+                verbose_name="Начало",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sitting",
+            index=models.Index(
+                fields=["user", "quiz", "course", "complete"],
+                name="quiz_sittin_user_id_05d9ca_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.0.8 on 2026-10-18 19:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0021_quiz_opens_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="quiz",
+            name="duration",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Сколько минут дается на попытку, по истечении попытка завершается. Пусто - без ограничения.",
+                null=True,
+                verbose_name="Длительность",
+            ),
+        ),
+        migrations.AddField(
+            model_name="sitting",
+            name="deadline",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When a timed sitting is completed with the answers given.",
+                null=True,
+                verbose_name="Deadline",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.0.8 on 2026-10-18 19:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0022_timed_quizzes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="sitting",
+            index=models.Index(
+                fields=["complete", "start"], name="quiz_sittin_complet_cc654a_idx"
+            ),
+        ),
+    ]
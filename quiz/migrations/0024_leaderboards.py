@@ -0,0 +1,99 @@
+# Generated by Django 4.0.8 on 2026-10-18 20:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("quiz", "0023_sitting_compaction_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LeaderboardEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("percent", models.PositiveSmallIntegerField(verbose_name="Процент")),
+                ("score", models.PositiveIntegerField(verbose_name="Счет")),
+                (
+                    "max_score",
+                    models.PositiveIntegerField(verbose_name="Максимальный балл"),
+                ),
+                ("achieved_at", models.DateTimeField(verbose_name="Дата")),
+                (
+                    "quiz",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="quiz.quiz",
+                        verbose_name="Тест",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="leaderboard_entries",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Пользователь",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Место в рейтинге",
+                "verbose_name_plural": "Рейтинг",
+            },
+        ),
+        migrations.CreateModel(
+            name="LeaderboardBucket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("percent", models.PositiveSmallIntegerField()),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "quiz",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="quiz.quiz"
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="leaderboardentry",
+            index=models.Index(
+                fields=["quiz", "-percent", "achieved_at"],
+                name="quiz_leader_quiz_id_0b8572_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="leaderboardentry",
+            constraint=models.UniqueConstraint(
+                fields=("quiz", "user"), name="unique_leaderboard_entry"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="leaderboardbucket",
+            constraint=models.UniqueConstraint(
+                fields=("quiz", "percent"), name="unique_leaderboard_bucket"
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.0.8 on 2026-10-18 20:24
+
+from django.db import migrations, models
+import quiz.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0024_leaderboards"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="quiz",
+            name="payload_version",
+            field=models.CharField(
+                default=quiz.models.new_payload_version, editable=False, max_length=32
+            ),
+        ),
+    ]
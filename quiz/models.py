@@ -1,19 +1,18 @@
-import re
-import json
+import datetime
+import random
+import uuid
 
-from django.db import models
+from django.db import models, transaction, IntegrityError
 from django.urls import reverse
 from django.core.exceptions import ValidationError, ImproperlyConfigured
-from django.core.validators import (
-    MaxValueValidator,
-    validate_comma_separated_integer_list,
-)
+from django.core.validators import MaxValueValidator
 from django.utils.translation import gettext_lazy as _
 from django.utils.timezone import now
 from django.conf import settings
 from django.db.models.signals import pre_save
 
-from django.db.models import Q
+from django.db.models import F, Q, Sum, prefetch_related_objects
+from django.db.models.functions import Greatest
 
 from model_utils.managers import InheritanceManager
 from course.models import Course
@@ -43,6 +42,10 @@ class QuizManager(models.Manager):
             qs = qs.filter(or_lookup).distinct()  # distinct() is often necessary with Q lookups
         return qs
 
+def new_payload_version():
+    return uuid.uuid4().hex
+
+
 class Quiz(models.Model):
     course = models.ForeignKey(Course, on_delete=models.CASCADE, null=True)
     title = models.CharField(verbose_name=_("Название"), max_length=60, blank=False)
@@ -75,12 +78,47 @@ class Quiz(models.Model):
             "Если да, результат каждой попытки пользователя будет сохранен. Необходимо для оценки."
         ),
     )
+    single_page = models.BooleanField(
+        blank=False,
+        default=False,
+        verbose_name=_("Все вопросы на одной странице"),
+        help_text=_(
+            "Если да, все вопросы показываются сразу и ответы отправляются одним запросом."
+        ),
+    )
     single_attempt = models.BooleanField(
         blank=False,
         default=False,
         verbose_name=_("Одна попытка"),
         help_text=_("Если да, пользователю будет разрешена только одна попытка."),
     )
+    max_questions = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        verbose_name=_("Количество вопросов"),
+        help_text=_(
+            "Сколько вопросов выбрать из вопросов теста для каждой попытки. "
+            "Пусто - все вопросы."
+        ),
+    )
+    opens_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name=_("Начало"),
+        help_text=_(
+            "Когда тест откроется для студентов. Попытки студентов курса "
+            "создаются заранее, незадолго до начала."
+        ),
+    )
+    duration = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        verbose_name=_("Длительность"),
+        help_text=_(
+            "Сколько минут дается на попытку, по истечении попытка завершается. "
+            "Пусто - без ограничения."
+        ),
+    )
     pass_mark = models.SmallIntegerField(
         blank=True,
         default=50,
@@ -97,6 +135,11 @@ class Quiz(models.Model):
         ),
     )
     timestamp = models.DateTimeField(auto_now=True)
+    # renewed whenever the quiz, its questions or their choices change, the
+    # cached payload is keyed by it so every process sees the edit at once
+    payload_version = models.CharField(
+        max_length=32, default=new_payload_version, editable=False
+    )
 
     objects = QuizManager()
 
@@ -123,6 +166,17 @@ class Quiz(models.Model):
     def get_max_score(self):
         return self.get_questions().count()
 
+    def get_deadline(self, start):
+        """
+        When a sitting started at ``start`` ends, None if the quiz is not
+        timed. The time of a scheduled quiz counts from its opening.
+        """
+        if not self.duration:
+            return None
+        if self.opens_at and self.opens_at > start:
+            start = self.opens_at
+        return start + datetime.timedelta(minutes=self.duration)
+
     def get_absolute_url(self):
         return reverse("quiz_index", kwargs={"slug": self.course.slug})
 
@@ -134,7 +188,7 @@ pre_save.connect(quiz_pre_save_receiver, sender=Quiz)
 
 class ProgressManager(models.Manager):
     def new_progress(self, user):
-        new_progress = self.create(user=user, score="")
+        new_progress = self.create(user=user)
         new_progress.save()
         return new_progress
 
@@ -143,11 +197,6 @@ class Progress(models.Model):
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL, verbose_name=_("Пользователь"), on_delete=models.CASCADE
     )
-    score = models.CharField(
-        max_length=1024,
-        verbose_name=_("Счет"),
-        validators=[validate_comma_separated_integer_list],
-    )
 
     objects = ProgressManager()
 
@@ -155,97 +204,270 @@ class Progress(models.Model):
         verbose_name = _("Прогресс пользователя")
         verbose_name_plural = _("Записи прогресса пользователей")
 
-    # @property
     def list_all_cat_scores(self):
-        score_before = self.score
+        """
+        Return ``{category: [correct, incorrect, percent]}`` of the user's
+        answers, summed over the quizzes of each category.
+        """
+        categories = dict(CATEGORY_OPTIONS)
         output = {}
+        for row in (
+            QuizProgress.objects.filter(user=self.user)
+            .values("quiz__category")
+            .annotate(score=Sum("score"), possible=Sum("possible"))
+            .order_by("quiz__category")
+        ):
+            score, possible = row["score"], row["possible"]
+            percent = int(round(score / possible * 100)) if possible else 0
+            category = categories.get(row["quiz__category"], _("Без категории"))
+            output[category] = [score, possible - score, percent]
+        return output
 
-        if len(self.score) > len(score_before):
-            # If a new category has been added, save changes.
-            self.save()
+    def update_score(self, quiz, score_to_add=0, possible_to_add=0):
+        if not isinstance(score_to_add, int) or not isinstance(possible_to_add, int):
+            return _("ошибка"), _("недопустимый счет")
 
-        return output
+        QuizProgress.objects.add_score(self.user, quiz, score_to_add, possible_to_add)
 
-    def update_score(self, question, score_to_add=0, possible_to_add=0):
-        # category_test = Category.objects.filter(category=question.category).exists()
-
-        if any(
-            [
-                item is False
-                for item in [
-                    score_to_add,
-                    possible_to_add,
-                    isinstance(score_to_add, int),
-                    isinstance(possible_to_add, int),
-                ]
-            ]
-        ):
-            return _("ошибка"), _("категория не существует или недопустимый счет")
+    def show_exams(self):
+        sittings = Sitting.objects.filter(complete=True).select_related("quiz")
+        if not self.user.is_superuser:
+            sittings = sittings.filter(user=self.user)
+        return sittings.order_by("-end")
+
+
+class QuizProgressManager(models.Manager):
+    def add_score(self, user, quiz, score_to_add=0, possible_to_add=0):
+        """
+        Add to the score of ``user`` at ``quiz`` with an atomic increment,
+        creating the row on the first answer.
+        """
+        increments = {
+            "score": F("score") + abs(score_to_add),
+            "possible": F("possible") + abs(possible_to_add),
+        }
+        if self.filter(user=user, quiz=quiz).update(**increments):
+            return
+        try:
+            with transaction.atomic():
+                self.create(
+                    user=user,
+                    quiz=quiz,
+                    score=abs(score_to_add),
+                    possible=abs(possible_to_add),
+                )
+        except IntegrityError:
+            # created by a concurrent answer in the meantime
+            self.filter(user=user, quiz=quiz).update(**increments)
+
+    def move_scores(self, deltas):
+        """
+        Move the scores of ``{(user_id, quiz_id): delta}``, e.g. after their
+        answers were graded again, with one update per distinct delta.
+        """
+        rows = {}
+        for pk, user_id, quiz_id in self.filter(
+            user_id__in={user_id for user_id, quiz_id in deltas},
+            quiz_id__in={quiz_id for user_id, quiz_id in deltas},
+        ).values_list("pk", "user_id", "quiz_id"):
+            delta = deltas.get((user_id, quiz_id))
+            if delta:
+                rows.setdefault(delta, []).append(pk)
+        for delta, pks in rows.items():
+            self.filter(pk__in=pks).update(score=Greatest(F("score") + delta, 0))
+
+
+class QuizProgress(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="quiz_progress",
+        verbose_name=_("Пользователь"),
+        on_delete=models.CASCADE,
+    )
+    quiz = models.ForeignKey(Quiz, verbose_name=_("Тест"), on_delete=models.CASCADE)
+    score = models.PositiveIntegerField(default=0, verbose_name=_("Счет"))
+    possible = models.PositiveIntegerField(default=0, verbose_name=_("Возможный счет"))
+
+    objects = QuizProgressManager()
 
-        to_find = re.escape(str(question.quiz)) + r",(?P<score>\d+),(?P<possible>\d+),"
+    class Meta:
+        verbose_name = _("Прогресс по тесту")
+        verbose_name_plural = _("Прогресс по тестам")
+        constraints = [
+            models.UniqueConstraint(
+                fields=("user", "quiz"), name="unique_quiz_progress"
+            ),
+        ]
 
-        match = re.search(to_find, self.score, re.IGNORECASE)
+    def __str__(self):
+        return f"{self.user} - {self.quiz}: {self.score}/{self.possible}"
 
-        if match:
-            updated_score = int(match.group("score")) + abs(score_to_add)
-            updated_possible = int(match.group("possible")) + abs(possible_to_add)
 
-            new_score = ",".join(
-                [str(question.quiz), str(updated_score), str(updated_possible), ""]
-            )
+class LeaderboardEntry(models.Model):
+    """The best result of a student at a quiz, what the leaderboard ranks."""
 
-            # swap old score for the new one
-            self.score = self.score.replace(match.group(), new_score)
-            self.save()
+    quiz = models.ForeignKey(Quiz, verbose_name=_("Тест"), on_delete=models.CASCADE)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="leaderboard_entries",
+        verbose_name=_("Пользователь"),
+        on_delete=models.CASCADE,
+    )
+    percent = models.PositiveSmallIntegerField(verbose_name=_("Процент"))
+    score = models.PositiveIntegerField(verbose_name=_("Счет"))
+    max_score = models.PositiveIntegerField(verbose_name=_("Максимальный балл"))
+    achieved_at = models.DateTimeField(verbose_name=_("Дата"))
 
-        else:
-            #  if not present but existing, add with the points passed in
-            self.score += ",".join(
-                [str(question.quiz), str(score_to_add), str(possible_to_add), ""]
-            )
-            self.save()
+    class Meta:
+        verbose_name = _("Место в рейтинге")
+        verbose_name_plural = _("Рейтинг")
+        constraints = [
+            models.UniqueConstraint(
+                fields=("quiz", "user"), name="unique_leaderboard_entry"
+            ),
+        ]
+        # the top of a quiz, read in order
+        indexes = [models.Index(fields=("quiz", "-percent", "achieved_at"))]
+
+    def __str__(self):
+        return f"{self.user} - {self.quiz}: {self.percent}%"
+
+
+class LeaderboardBucket(models.Model):
+    """
+    How many students of a quiz have their best result at ``percent``,
+    from which ranks and percentiles are read without counting entries.
+    """
+
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE)
+    percent = models.PositiveSmallIntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=("quiz", "percent"), name="unique_leaderboard_bucket"
+            ),
+        ]
+
+
+def get_grace():
+    return datetime.timedelta(seconds=settings.QUIZ_DEADLINE_GRACE)
+
+
+def percent_correct(score, question_count):
+    if question_count < 1:
+        return 0  # prevent divide by zero error
+    if score > question_count:
+        return 100
+    return max(int(round(float(score) / question_count * 100)), 0)
+
+
+def new_sitting_seed():
+    return random.SystemRandom().randrange(2**31)
 
-    def show_exams(self):
-        if self.user.is_superuser:
-            return Sitting.objects.filter(complete=True).order_by("-end")
-        else:
-            return Sitting.objects.filter(user=self.user, complete=True).order_by(
-                "-end"
-            )
+
+def draw_questions(question_ids, seed, random_order=False, max_questions=None):
+    """
+    Return the questions of a sitting drawn from ``question_ids``: a sample
+    of ``max_questions`` when set, shuffled when ``random_order``. The same
+    seed always gives the same questions in the same order.
+    """
+    rng = random.Random(seed)
+    question_ids = list(question_ids)
+    if max_questions and max_questions < len(question_ids):
+        drawn = set(rng.sample(question_ids, max_questions))
+        question_ids = [pk for pk in question_ids if pk in drawn]
+    if random_order:
+        rng.shuffle(question_ids)
+    return question_ids
 
 
 class SittingManager(models.Manager):
     def new_sitting(self, user, quiz, course):
-        if quiz.random_order is True:
-            question_set = quiz.question_set.all().select_subclasses().order_by("?")
-        else:
-            question_set = quiz.question_set.all().select_subclasses()
-
-        question_set = [item.id for item in question_set]
+        from .payload import get_quiz_payload
+
+        seed = new_sitting_seed()
+        question_set = draw_questions(
+            get_quiz_payload(quiz),
+            seed,
+            random_order=quiz.random_order,
+            max_questions=quiz.max_questions,
+        )
 
         if len(question_set) == 0:
             raise ImproperlyConfigured(
                 "Набор вопросов викторины пуст. Пожалуйста, правильно настройте вопросы"
             )
 
-        # if quiz.max_questions and quiz.max_questions < len(question_set):
-        #     question_set = question_set[:quiz.max_questions]
-
-        questions = ",".join(map(str, question_set)) + ","
-
-        new_sitting = self.create(
-            user=user,
-            quiz=quiz,
-            course=course,
-            question_order=questions,
-            question_list=questions,
-            incorrect_questions="",
-            current_score=0,
-            complete=False,
-            user_answers="{}",
-        )
+        with transaction.atomic():
+            new_sitting = self.create(
+                user=user,
+                quiz=quiz,
+                course=course,
+                seed=seed,
+                question_count=len(question_set),
+                current_score=0,
+                complete=False,
+                deadline=quiz.get_deadline(now()),
+            )
+            SittingQuestion.objects.bulk_create(
+                SittingQuestion(
+                    sitting=new_sitting, question_id=question_id, position=position
+                )
+                for position, question_id in enumerate(question_set)
+            )
         return new_sitting
 
+    def provision(self, user_ids, quiz, course, batch_size=500):
+        """
+        Create a sitting of ``quiz`` for each of ``user_ids`` ahead of time,
+        with one bulk insert of the sittings and one of their questions per
+        batch of ``batch_size`` users. Returns the number of sittings.
+        """
+        from .payload import get_quiz_payload
+
+        payload = get_quiz_payload(quiz)
+        if not payload:
+            raise ImproperlyConfigured(
+                "Набор вопросов викторины пуст. Пожалуйста, правильно настройте вопросы"
+            )
+
+        user_ids = list(user_ids)
+        deadline = quiz.get_deadline(now())
+        for start in range(0, len(user_ids), batch_size):
+            sittings, question_sets = [], []
+            for user_id in user_ids[start : start + batch_size]:
+                seed = new_sitting_seed()
+                question_set = draw_questions(
+                    payload,
+                    seed,
+                    random_order=quiz.random_order,
+                    max_questions=quiz.max_questions,
+                )
+                sittings.append(
+                    self.model(
+                        user_id=user_id,
+                        quiz=quiz,
+                        course=course,
+                        seed=seed,
+                        question_count=len(question_set),
+                        current_score=0,
+                        deadline=deadline,
+                    )
+                )
+                question_sets.append(question_set)
+            with transaction.atomic():
+                self.bulk_create(sittings)
+                SittingQuestion.objects.bulk_create(
+                    SittingQuestion(
+                        sitting=sitting, question_id=question_id, position=position
+                    )
+                    for sitting, question_set in zip(sittings, question_sets)
+                    for position, question_id in enumerate(question_set)
+                )
+        return len(user_ids)
+
     def user_sitting(self, user, quiz, course):
         if (
             quiz.single_attempt is True
@@ -257,13 +479,23 @@ class SittingManager(models.Manager):
         except Sitting.DoesNotExist:
             sitting = self.new_sitting(user, quiz, course)
         except Sitting.MultipleObjectsReturned:
-            sitting = self.filter(user=user, quiz=quiz, course=course, complete=False)[
-                0
-            ]
+            # the one compact_sittings would keep
+            sitting = self.filter(
+                user=user, quiz=quiz, course=course, complete=False
+            ).order_by("-current_position", "-pk")[0]
         return sitting
 
 
 class Sitting(models.Model):
+    """
+    An attempt of a user at a quiz.
+
+    The questions of the attempt, in the order they are asked, are
+    SittingQuestion rows and every answer given is a SittingAnswer row,
+    both indexed by their position. ``current_position`` points at the next
+    question to answer, ``current_score`` counts the correct answers.
+    """
+
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, verbose_name=_("User"), on_delete=models.CASCADE
     )
@@ -272,107 +504,109 @@ class Sitting(models.Model):
         Course, null=True, verbose_name=_("Course"), on_delete=models.CASCADE
     )
 
-    question_order = models.CharField(
-        max_length=1024,
-        verbose_name=_("Question Order"),
-        validators=[validate_comma_separated_integer_list],
+    seed = models.PositiveIntegerField(
+        default=new_sitting_seed,
+        verbose_name=_("Seed"),
+        help_text=_("Orders the questions and choices of the sitting."),
     )
-
-    question_list = models.CharField(
-        max_length=1024,
-        verbose_name=_("Question List"),
-        validators=[validate_comma_separated_integer_list],
+    question_count = models.PositiveIntegerField(
+        default=0, verbose_name=_("Question Count")
     )
-
-    incorrect_questions = models.CharField(
-        max_length=1024,
-        blank=True,
-        verbose_name=_("Incorrect questions"),
-        validators=[validate_comma_separated_integer_list],
+    current_position = models.PositiveIntegerField(
+        default=0, verbose_name=_("Current Position")
     )
-
     current_score = models.IntegerField(verbose_name=_("Current Score"))
     complete = models.BooleanField(
         default=False, blank=False, verbose_name=_("Complete")
     )
-    user_answers = models.TextField(
-        blank=True, default="{}", verbose_name=_("User Answers")
-    )
     start = models.DateTimeField(auto_now_add=True, verbose_name=_("Start"))
     end = models.DateTimeField(null=True, blank=True, verbose_name=_("End"))
+    deadline = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("Deadline"),
+        help_text=_("When a timed sitting is completed with the answers given."),
+    )
 
     objects = SittingManager()
 
     class Meta:
         permissions = (("view_sittings", _("Can see completed exams.")),)
+        indexes = [
+            # the lookups of user_sitting() when a student opens a quiz
+            models.Index(fields=("user", "quiz", "course", "complete")),
+            # the stale sittings reaped by compact_sittings
+            models.Index(fields=("complete", "start")),
+        ]
 
-    def get_first_question(self):
-        if not self.question_list:
+    def get_first_question(self, payload=None):
+        """
+        Return the question at the current position, taken from the
+        ``{question_id: question}`` payload of the quiz when given.
+        """
+        if self.current_position >= self.question_count:
             return False
 
-        first, _ = self.question_list.split(",", 1)
-        question_id = int(first)
-        return Question.objects.get_subclass(id=question_id)
-
-    def remove_first_question(self):
-        if not self.question_list:
-            return
+        if payload is not None:
+            question_id = (
+                self.questions.filter(position=self.current_position)
+                .values_list("question_id", flat=True)
+                .first()
+            )
+            if question_id in payload:
+                return payload[question_id]
 
-        _, others = self.question_list.split(",", 1)
-        self.question_list = others
-        self.save()
+        try:
+            return Question.objects.get_subclass(
+                sitting_questions__sitting=self,
+                sitting_questions__position=self.current_position,
+            )
+        except Question.DoesNotExist:
+            return False
 
     def add_to_score(self, points):
+        Sitting.objects.filter(pk=self.pk).update(
+            current_score=F("current_score") + int(points)
+        )
         self.current_score += int(points)
-        self.save()
 
     @property
     def get_current_score(self):
         return self.current_score
 
-    def _question_ids(self):
-        return [int(n) for n in self.question_order.split(",") if n]
-
     @property
     def get_percent_correct(self):
-        dividend = float(self.current_score)
-        divisor = len(self._question_ids())
-        if divisor < 1:
-            return 0  # prevent divide by zero error
-
-        if dividend > divisor:
-            return 100
-
-        correct = int(round((dividend / divisor) * 100))
-
-        if correct >= 1:
-            return correct
-        else:
-            return 0
+        return percent_correct(self.current_score, self.question_count)
 
     def mark_quiz_complete(self):
         self.complete = True
         self.end = now()
-        self.save()
+        self.save(update_fields=["complete", "end"])
 
     def add_incorrect_question(self, question):
-        if len(self.incorrect_questions) > 0:
-            self.incorrect_questions += ","
-        self.incorrect_questions += str(question.id) + ","
-        if self.complete:
-            self.add_to_score(-1)
-        self.save()
+        # only an answer given and counted as correct takes a point away
+        changed = self.answers.filter(question=question, correct=True).update(
+            correct=False, marked_at=now()
+        )
+        if changed:
+            self.add_to_score(-changed)
+        return changed
 
     @property
     def get_incorrect_questions(self):
-        return [int(q) for q in self.incorrect_questions.split(",") if q]
+        return list(
+            self.answers.filter(correct=False)
+            .order_by("position")
+            .values_list("question_id", flat=True)
+        )
 
     def remove_incorrect_question(self, question):
-        current = self.get_incorrect_questions
-        current.remove(question.id)
-        self.incorrect_questions = ",".join(map(str, current))
-        self.add_to_score(1)
-        self.save()
+        changed = self.answers.filter(question=question, correct=False).update(
+            correct=True, marked_at=now()
+        )
+        if changed:
+            self.add_to_score(changed)
+        return changed
 
     @property
     def check_if_passed(self):
@@ -385,23 +619,116 @@ class Sitting(models.Model):
         else:
             return f"Вы провалили этот тест, дайте ему еще один шанс."
 
-    def add_user_answer(self, question, guess):
-        current = json.loads(self.user_answers)
-        current[question.id] = guess
-        self.user_answers = json.dumps(current)
-        self.save()
-
-    def get_questions(self, with_answers=False):
-        question_ids = self._question_ids()
-        questions = sorted(
-            self.quiz.question_set.filter(id__in=question_ids).select_subclasses(),
-            key=lambda q: question_ids.index(q.id),
-        )
+    def add_user_answer(self, question, guess, correct=False):
+        """
+        Record ``guess`` as the answer to the current question and move on
+        to the next one. An answer already recorded at this position, e.g.
+        by a resubmitted form, is kept and the pointer is left as is.
+        """
+        try:
+            with transaction.atomic():
+                SittingAnswer.objects.create(
+                    sitting=self,
+                    question=question,
+                    position=self.current_position,
+                    answer=guess,
+                    correct=correct,
+                )
+                Sitting.objects.filter(pk=self.pk).update(
+                    current_position=F("current_position") + 1,
+                    current_score=F("current_score") + int(correct),
+                )
+        except IntegrityError:
+            return False
+        self.current_position += 1
+        self.current_score += int(correct)
+        return True
+
+    def submit_answers(self, answers, payload=None):
+        """
+        Grade ``answers``, ``{question_id: guess}``, to all the questions not
+        answered yet in one batch, and complete the sitting's answers.
+
+        Questions without an answer are recorded blank and incorrect. The
+        answers are inserted with one bulk insert and the position and
+        score moved with one update. Returns the recorded answers, or False
+        when the answers were already submitted by a concurrent request.
+        """
+        answers = {str(question_id): guess for question_id, guess in answers.items()}
+        questions = self.get_questions(payload=payload)[self.current_position :]
+        rows = []
+        for position, question in enumerate(questions, self.current_position):
+            guess = str(answers.get(str(question.id)) or "")
+            try:
+                correct = bool(guess) and question.check_if_correct(guess) is True
+            except Choice.DoesNotExist:
+                correct = False
+            rows.append(
+                SittingAnswer(
+                    sitting=self,
+                    question=question,
+                    position=position,
+                    answer=guess,
+                    correct=correct,
+                )
+            )
+        score = sum(row.correct for row in rows)
+
+        with transaction.atomic():
+            if not Sitting.objects.filter(
+                pk=self.pk, current_position=self.current_position
+            ).update(
+                current_position=self.current_position + len(rows),
+                current_score=F("current_score") + score,
+            ):
+                return False
+            SittingAnswer.objects.bulk_create(rows)
+        self.current_position += len(rows)
+        self.current_score += score
+        return rows
+
+    def is_expired(self):
+        """Whether the deadline passed, grace for answers in flight included."""
+        return self.deadline is not None and self.deadline <= now() - get_grace()
+
+    def is_kept_for(self, user):
+        """Whether the sitting is stored once ``user`` completed it."""
+        return self.quiz.exam_paper and not (user.is_superuser or user.is_lecturer)
+
+    def get_questions(self, with_answers=False, payload=None):
+        """
+        Return the questions of the sitting in the order they were asked,
+        as instances of their subclass with their choices prefetched.
+
+        The questions are taken from the quiz ``payload`` when given, else
+        fetched in one batch and put in order through an id to position
+        map. ``with_answers`` sets ``user_answer`` and ``user_was_correct``
+        on every question from one query of the answers.
+        """
+        positions = dict(self.questions.values_list("question_id", "position"))
+        if payload is not None and all(pk in payload for pk in positions):
+            questions = [payload[pk] for pk in positions]
+        else:
+            # questions removed from the quiz since the sitting started
+            questions = list(
+                Question.objects.filter(id__in=positions).select_subclasses()
+            )
+            prefetch_related_objects(
+                [q for q in questions if isinstance(q, MCQuestion)], "choice_set"
+            )
+        questions.sort(key=lambda question: positions[question.id])
 
         if with_answers:
-            user_answers = json.loads(self.user_answers)
+            answers = {
+                question_id: (answer, correct)
+                for question_id, answer, correct in self.answers.values_list(
+                    "question_id", "answer", "correct"
+                )
+            }
             for question in questions:
-                question.user_answer = user_answers[str(question.id)]
+                question.user_answer, question.user_was_correct = answers.get(
+                    question.id, (None, None)
+                )
 
         return questions
 
@@ -411,12 +738,55 @@ class Sitting(models.Model):
 
     @property
     def get_max_score(self):
-        return len(self._question_ids())
+        return self.question_count
 
     def progress(self):
-        answered = len(json.loads(self.user_answers))
-        total = self.get_max_score
-        return answered, total
+        return self.current_position, self.question_count
+
+
+class SittingQuestion(models.Model):
+    sitting = models.ForeignKey(
+        Sitting, related_name="questions", on_delete=models.CASCADE
+    )
+    question = models.ForeignKey(
+        "Question", related_name="sitting_questions", on_delete=models.CASCADE
+    )
+    position = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ("sitting", "position")
+        constraints = [
+            models.UniqueConstraint(
+                fields=("sitting", "position"), name="unique_sitting_question_position"
+            ),
+        ]
+
+
+class SittingAnswer(models.Model):
+    sitting = models.ForeignKey(
+        Sitting, related_name="answers", on_delete=models.CASCADE
+    )
+    question = models.ForeignKey(
+        "Question", related_name="sitting_answers", on_delete=models.CASCADE
+    )
+    position = models.PositiveIntegerField()
+    answer = models.TextField(blank=True)
+    correct = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # set when a lecturer marks the answer by hand, essays wait for it
+    marked_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ("sitting", "position")
+        constraints = [
+            models.UniqueConstraint(
+                fields=("sitting", "position"), name="unique_sitting_answer_position"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=("sitting", "correct")),
+            models.Index(fields=("question", "marked_at")),
+        ]
 
 
 class Question(models.Model):
@@ -469,33 +839,42 @@ class MCQuestion(Question):
     )
 
     def check_if_correct(self, guess):
-        answer = Choice.objects.get(id=guess)
+        answer = self.get_choice(guess)
 
         if answer.correct is True:
             return True
         else:
             return False
 
-    def order_choices(self, queryset):
-        if self.choice_order == "Контент":
-            return queryset.order_by("choice")
-        if self.choice_order == "Случайно":
-            return queryset.order_by("?")
-        if self.choice_order == "Нет":
-            return queryset.order_by()
-        return queryset
-
-    def get_choices(self):
-        return self.order_choices(Choice.objects.filter(question=self))
-
-    def get_choices_list(self):
-        return [
-            (choice.id, choice.choice)
-            for choice in self.order_choices(Choice.objects.filter(question=self))
-        ]
+    def order_choices(self, choices, seed=None):
+        """
+        Order ``choices`` by ``choice_order``. A random order is derived
+        from ``seed`` and the question, so a sitting always shows the
+        choices of a question in the same order.
+        """
+        choices = sorted(choices, key=lambda choice: choice.id)
+        if self.choice_order == "content":
+            choices.sort(key=lambda choice: choice.choice)
+        elif self.choice_order == "random":
+            rng = random.Random(f"{seed}-{self.id}") if seed is not None else random
+            rng.shuffle(choices)
+        return choices
+
+    def get_choices(self, seed=None):
+        # served from the prefetched choices of a cached quiz payload
+        return self.order_choices(self.choice_set.all(), seed)
+
+    def get_choices_list(self, seed=None):
+        return [(choice.id, choice.choice) for choice in self.get_choices(seed)]
+
+    def get_choice(self, guess):
+        for choice in self.choice_set.all():
+            if str(choice.id) == str(guess):
+                return choice
+        raise Choice.DoesNotExist(f"Choice {guess} is not a choice of {self.id}")
 
     def answer_choice_to_string(self, guess):
-        return Choice.objects.get(id=guess).choice
+        return self.get_choice(guess).choice
 
     class Meta:
         verbose_name = _("Вопрос с множественным выбором")
@@ -548,3 +927,53 @@ class EssayQuestion(Question):
     class Meta:
         verbose_name = _("Вопрос в стиле эссе")
         verbose_name_plural = _("Вопросы в стиле эссе")
+
+
+class RescoreJob(models.Model):
+    """
+    Re-scoring of the answers to a question after its answer key changed,
+    run in the background by quiz.tasks.rescore_question_task.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    STATUS = (
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    question = models.ForeignKey(
+        Question, verbose_name=_("Вопрос"), on_delete=models.CASCADE
+    )
+    status = models.CharField(max_length=10, choices=STATUS, default=PENDING)
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    changed = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ("-created_at",)
+
+    def __str__(self):
+        return f"{self.question} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.DONE, self.FAILED)
+
+    @property
+    def percent(self):
+        if not self.total:
+            return 100 if self.is_finished else 0
+        return int(self.processed * 100 / self.total)
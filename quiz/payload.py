@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+
+from .models import MCQuestion, Quiz, new_payload_version
+
+
+def payload_cache_key(quiz_id, version):
+    return f"quiz:payload:{quiz_id}:{version}"
+
+
+def get_payload_version(quiz_id):
+    return Quiz.objects.values_list("payload_version", flat=True).get(pk=quiz_id)
+
+
+def bump_payload_version(quiz_ids):
+    """
+    Make the cached payloads of ``quiz_ids`` stale, the next request builds
+    them again under the new version. The version is stored with the quiz,
+    so it commits or rolls back with the change and every process sees it
+    whatever the cache backend. Returns the new version.
+    """
+    version = new_payload_version()
+    Quiz.objects.filter(pk__in=list(quiz_ids)).update(payload_version=version)
+    return version
+
+
+def get_quiz_payload(quiz):
+    """
+    Return ``{question_id: question}`` of the questions of ``quiz``, as
+    instances of their subclass with the choices prefetched.
+
+    The payload is cached under the version of the quiz as loaded, so
+    taking and grading the quiz reads its questions and choices without
+    queries until a Quiz, Question or Choice edit bumps the version.
+    """
+    key = payload_cache_key(quiz.pk, quiz.payload_version)
+    payload = cache.get(key)
+    if payload is None:
+        payload = build_quiz_payload(quiz)
+        cache.set(key, payload, settings.QUIZ_PAYLOAD_CACHE_TIMEOUT)
+    return payload
+
+
+def build_quiz_payload(quiz):
+    questions = list(quiz.question_set.all().select_subclasses().order_by("id"))
+    prefetch_related_objects(
+        [question for question in questions if isinstance(question, MCQuestion)],
+        "choice_set",
+    )
+    return {question.id: question for question in questions}
@@ -0,0 +1,81 @@
+"""
+Sittings created ahead of a scheduled exam.
+
+When a quiz has an opening time, its sittings are created in bulk for the
+students of its course ``QUIZ_PROVISION_LEAD`` seconds before it opens, so
+the students opening the exam together only read their sitting.
+"""
+import datetime
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from result.models import TakenCourse
+from .models import Quiz, Sitting
+
+logger = logging.getLogger(__name__)
+
+
+def schedule_provisioning(quiz):
+    """
+    Queue the provisioning of ``quiz`` for shortly before it opens, once
+    the surrounding transaction commits.
+    """
+    from .tasks import provision_sittings_task
+
+    if quiz.opens_at is None or quiz.opens_at <= timezone.now():
+        return
+    eta = quiz.opens_at - datetime.timedelta(seconds=settings.QUIZ_PROVISION_LEAD)
+    opens_at = quiz.opens_at.isoformat()
+    transaction.on_commit(
+        lambda: provision_sittings_task.apply_async((quiz.pk, opens_at), eta=eta)
+    )
+
+
+def run_provisioning(quiz_id, opens_at):
+    """
+    Provision the quiz scheduled to open at ``opens_at`` (ISO format),
+    nothing if it was deleted or scheduled again since.
+    """
+    quiz = Quiz.objects.filter(pk=quiz_id).first()
+    if quiz is None or quiz.opens_at is None or quiz.opens_at.isoformat() != opens_at:
+        return 0
+    created = provision_sittings(quiz)
+    logger.info("Provisioned %s sittings of quiz %s", created, quiz_id)
+    return created
+
+
+def provision_sittings(quiz):
+    """
+    Create a sitting of ``quiz`` for every student of its course who has
+    none to take it with. Returns the number of sittings created.
+    """
+    if quiz.course_id is None:
+        return 0
+    with transaction.atomic():
+        # one run at a time per quiz, the next one sees the sittings created
+        list(Quiz.objects.select_for_update().filter(pk=quiz.pk).values_list("pk"))
+        user_ids = set(
+            TakenCourse.objects.filter(course_id=quiz.course_id).values_list(
+                "student__student_id", flat=True
+            )
+        )
+        existing = Sitting.objects.filter(
+            quiz=quiz, course_id=quiz.course_id, user_id__in=user_ids
+        )
+        if not quiz.single_attempt:
+            # those who completed it may take it again
+            existing = existing.filter(complete=False)
+        user_ids -= set(existing.values_list("user_id", flat=True))
+        return Sitting.objects.provision(sorted(user_ids), quiz, quiz.course)
+
+
+def due_quizzes(now=None):
+    """The quizzes opening within the provisioning lead time."""
+    now = now or timezone.now()
+    return Quiz.objects.filter(
+        opens_at__gt=now,
+        opens_at__lte=now + datetime.timedelta(seconds=settings.QUIZ_PROVISION_LEAD),
+    )
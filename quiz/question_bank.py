@@ -0,0 +1,343 @@
+"""
+Import and export of the questions of a quiz as JSON, CSV or GIFT.
+
+A question is read into ``{"type", "content", "explanation",
+"choice_order", "choices": [{"choice", "correct"}]}``, ``type`` being
+"mc" or "essay". ``parse_questions`` validates a whole file before
+``import_questions`` inserts anything, so a file is loaded completely or
+not at all.
+"""
+import csv
+import io
+import json
+import re
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+
+from .models import (
+    CHOICE_ORDER_OPTIONS,
+    Choice,
+    EssayQuestion,
+    MCQuestion,
+    Question,
+)
+from .payload import bump_payload_version, get_quiz_payload
+
+JSON = "json"
+CSV = "csv"
+GIFT = "gift"
+
+FORMATS = (JSON, CSV, GIFT)
+
+CONTENT_TYPES = {
+    JSON: "application/json",
+    CSV: "text/csv",
+    GIFT: "text/plain",
+}
+
+MC = "mc"
+ESSAY = "essay"
+
+CSV_FIELDS = ("type", "content", "explanation", "choice_order", "correct")
+CSV_CHOICE = re.compile(r"choice_\d+")
+
+# characters with a meaning in GIFT, escaped with a backslash in text
+GIFT_SPECIAL = "~=#{}:"
+
+
+def export_questions(quiz, format):
+    questions = [question_data(q) for q in get_quiz_payload(quiz).values()]
+    if format == JSON:
+        return json.dumps({"quiz": quiz.title, "questions": questions}, indent=2)
+    if format == CSV:
+        return questions_to_csv(questions)
+    if format == GIFT:
+        return questions_to_gift(questions)
+    raise ValueError(f"Unknown format '{format}', expected one of {FORMATS}.")
+
+
+def question_data(question):
+    if isinstance(question, MCQuestion):
+        return {
+            "type": MC,
+            "content": question.content,
+            "explanation": question.explanation,
+            "choice_order": question.choice_order or "",
+            "choices": [
+                {"choice": choice.choice, "correct": choice.correct}
+                for choice in question.choice_set.all()
+            ],
+        }
+    return {
+        "type": ESSAY,
+        "content": question.content,
+        "explanation": question.explanation,
+        "choice_order": "",
+        "choices": [],
+    }
+
+
+def questions_to_csv(questions):
+    width = max((len(q["choices"]) for q in questions), default=0)
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(CSV_FIELDS + tuple(f"choice_{i + 1}" for i in range(width)))
+    for q in questions:
+        correct = ";".join(
+            str(i + 1) for i, choice in enumerate(q["choices"]) if choice["correct"]
+        )
+        writer.writerow(
+            [q["type"], q["content"], q["explanation"], q["choice_order"], correct]
+            + [choice["choice"] for choice in q["choices"]]
+        )
+    return output.getvalue()
+
+
+def gift_escape(text):
+    for char in "\\" + GIFT_SPECIAL:
+        text = text.replace(char, "\\" + char)
+    return text.replace("\n", "\\n")
+
+
+def questions_to_gift(questions):
+    blocks = []
+    for q in questions:
+        lines = [gift_escape(q["content"]) + " {"]
+        for choice in q["choices"]:
+            mark = "=" if choice["correct"] else "~"
+            lines.append(f"\t{mark}{gift_escape(choice['choice'])}")
+        if q["explanation"]:
+            lines.append(f"\t####{gift_escape(q['explanation'])}")
+        lines.append("}")
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks) + "\n"
+
+
+def parse_questions(content, format):
+    """
+    Read and validate the questions of ``content``, raise ValidationError
+    listing every problem of the file.
+    """
+    try:
+        if format == JSON:
+            questions = parse_json(content)
+        elif format == CSV:
+            questions = parse_csv(content)
+        elif format == GIFT:
+            questions = parse_gift(content)
+        else:
+            raise ValidationError(f"Неизвестный формат «{format}».")
+    except (ValueError, csv.Error) as e:
+        raise ValidationError(f"Файл не прочитан: {e}")
+    errors = [
+        f"Вопрос {i}: {error}"
+        for i, question in enumerate(questions, 1)
+        for error in question_errors(question)
+    ]
+    if not questions:
+        errors.append("В файле нет вопросов.")
+    if errors:
+        raise ValidationError(errors)
+    return questions
+
+
+def parse_json(content):
+    data = json.loads(content)
+    if isinstance(data, dict):
+        data = data.get("questions")
+    if not isinstance(data, list) or not all(isinstance(q, dict) for q in data):
+        raise ValueError("ожидается список вопросов")
+    return [
+        {
+            "type": q.get("type", MC),
+            "content": q.get("content", ""),
+            "explanation": str(q.get("explanation") or ""),
+            "choice_order": str(q.get("choice_order") or ""),
+            "choices": q.get("choices") or [],
+        }
+        for q in data
+    ]
+
+
+def parse_csv(content):
+    questions = []
+    for row in csv.DictReader(io.StringIO(content)):
+        choice_columns = sorted(
+            (key for key in row if key and CSV_CHOICE.fullmatch(key)),
+            key=lambda key: int(key[7:]),
+        )
+        texts = [row[key] for key in choice_columns if row[key]]
+        correct = {
+            int(i) for i in (row.get("correct") or "").split(";") if i.strip().isdigit()
+        }
+        questions.append(
+            {
+                "type": row.get("type") or MC,
+                "content": row.get("content") or "",
+                "explanation": row.get("explanation") or "",
+                "choice_order": row.get("choice_order") or "",
+                "choices": [
+                    {"choice": text, "correct": i in correct}
+                    for i, text in enumerate(texts, 1)
+                ],
+            }
+        )
+    return questions
+
+
+GIFT_QUESTION = re.compile(
+    r"^(?:::(?P<title>(?:\\.|[^\\])*?)::)?(?P<text>(?:\\.|[^\\{])*)"
+    r"\{(?P<answers>(?:\\.|[^\\}])*)\}\s*$",
+    re.S,
+)
+# an answer, its feedback after a single # has no place in Choice and is dropped
+GIFT_ANSWER = re.compile(
+    r"(?P<mark>[=~]|####)(?P<text>(?:\\.|[^\\=~#])*)(?:#(?!###)(?:\\.|[^\\=~#])*)?"
+)
+
+
+def gift_unescape(text):
+    return re.sub(
+        r"\\(.)", lambda m: "\n" if m.group(1) == "n" else m.group(1), text
+    ).strip()
+
+
+def parse_gift(content):
+    """
+    Read the subset of GIFT the quiz models can hold: multiple choice
+    questions (``=`` right, ``~`` wrong), essays (``{}``) and general
+    feedback (``####``), which becomes the explanation.
+    """
+    blocks, block = [], []
+    for line in content.splitlines() + [""]:
+        if line.strip().startswith("//"):
+            continue
+        if line.strip():
+            block.append(line)
+        elif block:
+            blocks.append("\n".join(block))
+            block = []
+
+    questions = []
+    for block in blocks:
+        match = GIFT_QUESTION.match(block.strip())
+        if match is None:
+            raise ValueError(f"вопрос GIFT не распознан: {block[:50]!r}")
+        question = {
+            "type": MC,
+            "content": gift_unescape(match["text"]),
+            "explanation": "",
+            "choice_order": "",
+            "choices": [],
+        }
+        for answer in GIFT_ANSWER.finditer(match["answers"]):
+            text = gift_unescape(answer["text"])
+            if answer["mark"] == "####":
+                question["explanation"] = text
+            else:
+                question["choices"].append(
+                    {"choice": text, "correct": answer["mark"] == "="}
+                )
+        if not question["choices"]:
+            question["type"] = ESSAY
+        questions.append(question)
+    return questions
+
+
+def question_errors(question):
+    errors = []
+    if question["type"] not in (MC, ESSAY):
+        errors.append(f"неизвестный тип «{question['type']}».")
+    content = question["content"]
+    if not isinstance(content, str) or not content.strip():
+        errors.append("нет текста вопроса.")
+    elif len(content) > Question._meta.get_field("content").max_length:
+        errors.append("слишком длинный текст вопроса.")
+    if (
+        len(question["explanation"])
+        > Question._meta.get_field("explanation").max_length
+    ):
+        errors.append("слишком длинное объяснение.")
+    if question["type"] != MC:
+        return errors
+
+    if question["choice_order"] not in ("",) + tuple(
+        value for value, label in CHOICE_ORDER_OPTIONS
+    ):
+        errors.append(f"неизвестный порядок выбора «{question['choice_order']}».")
+    choices = question["choices"]
+    if not isinstance(choices, list) or len(choices) < 2:
+        errors.append("нужно не менее двух вариантов ответа.")
+        return errors
+    max_length = Choice._meta.get_field("choice").max_length
+    for choice in choices:
+        if not isinstance(choice, dict) or not str(choice.get("choice", "")).strip():
+            errors.append("пустой вариант ответа.")
+        elif len(str(choice["choice"])) > max_length:
+            errors.append("слишком длинный вариант ответа.")
+    if not any(isinstance(c, dict) and c.get("correct") is True for c in choices):
+        errors.append("нет правильного варианта ответа.")
+    return errors
+
+
+def import_questions(quiz, questions):
+    """
+    Add the validated ``questions`` to ``quiz`` in one transaction, with a
+    bulk insert each for the questions, their subclass rows, the choices
+    and the quiz links. Returns the number of questions added.
+    """
+    with transaction.atomic():
+        parents = [
+            Question(content=q["content"], explanation=q["explanation"])
+            for q in questions
+        ]
+        if connection.features.can_return_rows_from_bulk_insert:
+            Question.objects.bulk_create(parents)
+        else:
+            for parent in parents:
+                parent.save()
+
+        mc_questions, essays, choices = [], [], []
+        for parent, q in zip(parents, questions):
+            if q["type"] == MC:
+                mc_questions.append(
+                    MCQuestion(
+                        question_ptr=parent, choice_order=q["choice_order"] or None
+                    )
+                )
+                choices.extend(
+                    Choice(
+                        question_id=parent.pk,
+                        choice=str(choice["choice"]),
+                        correct=choice["correct"] is True,
+                    )
+                    for choice in q["choices"]
+                )
+            else:
+                essays.append(EssayQuestion(question_ptr=parent))
+        bulk_create_children(MCQuestion, mc_questions)
+        bulk_create_children(EssayQuestion, essays)
+        Choice.objects.bulk_create(choices)
+        Question.quiz.through.objects.bulk_create(
+            Question.quiz.through(question_id=parent.pk, quiz_id=quiz.pk)
+            for parent in parents
+        )
+        # bulk inserts send no signals, the cached payload is renewed here
+        quiz.payload_version = bump_payload_version([quiz.pk])
+    return len(parents)
+
+
+def bulk_create_children(model, objs, batch_size=500):
+    """
+    Insert the rows of the subclass table only, for parents already saved.
+
+    bulk_create() refuses multi-table inherited models; this is the insert
+    Model.save_base() does for the child table with ``raw=True``, through
+    the private Manager._insert(), batched. save_base() goes through it
+    too, and QuestionBankTestCase.test_bulk_create_children checks the
+    rows still load back as their subclasses after a Django upgrade.
+    """
+    fields = model._meta.local_concrete_fields
+    for start in range(0, len(objs), batch_size):
+        model._base_manager._insert(objs[start : start + batch_size], fields, raw=True)
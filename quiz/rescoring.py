@@ -0,0 +1,142 @@
+import logging
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+
+from .leaderboard import refresh_results
+from .models import (
+    Choice,
+    MCQuestion,
+    QuizProgress,
+    RescoreJob,
+    Sitting,
+    SittingAnswer,
+)
+
+logger = logging.getLogger(__name__)
+
+RESCORE_BATCH_SIZE = 500
+
+
+def enqueue_rescore(question, user=None):
+    """
+    Create a RescoreJob for ``question`` and queue it once the surrounding
+    transaction commits.
+    """
+    from .tasks import rescore_question_task
+
+    if not isinstance(question, MCQuestion):
+        raise ValueError("Only multiple choice questions are scored automatically.")
+    job = RescoreJob.objects.create(question=question, created_by=user)
+    transaction.on_commit(lambda: rescore_question_task.delay(str(job.pk)))
+    return job
+
+
+def rescore_question(question, batch_size=RESCORE_BATCH_SIZE, progress=None):
+    """
+    Grade every stored answer to ``question`` again against its current
+    correct choices.
+
+    The answers are read in batches of ``batch_size`` in primary key order.
+    The answers whose outcome changed are written with one bulk update per
+    batch, and the scores of their sittings are moved by one with an F()
+    update per direction. Marks set by hand on these answers are replaced
+    by the key. ``progress(processed, changed, total)`` is called after
+    every batch. Returns ``{"total", "processed", "changed"}``.
+    """
+    correct_ids = {
+        str(pk)
+        for pk in Choice.objects.filter(question=question, correct=True).values_list(
+            "pk", flat=True
+        )
+    }
+    answers = SittingAnswer.objects.filter(question=question).only(
+        "pk", "sitting_id", "answer", "correct"
+    )
+    stats = {"total": answers.count(), "processed": 0, "changed": 0}
+    last_pk = 0
+    while True:
+        batch = list(answers.filter(pk__gt=last_pk).order_by("pk")[:batch_size])
+        if not batch:
+            break
+        last_pk = batch[-1].pk
+
+        fixed = []
+        for answer in batch:
+            correct = answer.answer in correct_ids
+            if correct != answer.correct:
+                answer.correct = correct
+                fixed.append(answer)
+        if fixed:
+            with transaction.atomic():
+                SittingAnswer.objects.bulk_update(fixed, ["correct"])
+                for correct, delta in ((True, 1), (False, -1)):
+                    Sitting.objects.filter(
+                        pk__in=[a.sitting_id for a in fixed if a.correct is correct]
+                    ).update(current_score=F("current_score") + delta)
+                owners = {
+                    pk: (user_id, quiz_id)
+                    for pk, user_id, quiz_id in Sitting.objects.filter(
+                        pk__in={a.sitting_id for a in fixed}
+                    ).values_list("pk", "user_id", "quiz_id")
+                }
+                deltas = Counter()
+                for answer in fixed:
+                    deltas[owners[answer.sitting_id]] += 1 if answer.correct else -1
+                QuizProgress.objects.move_scores(deltas)
+            refresh_results({answer.sitting_id for answer in fixed})
+
+        stats["processed"] += len(batch)
+        stats["changed"] += len(fixed)
+        if progress is not None:
+            progress(stats["processed"], stats["changed"], stats["total"])
+    return stats
+
+
+def run_rescore_job(job_id):
+    """Re-score the question of a queued job. Called by the worker."""
+    job = RescoreJob.objects.select_related("question").get(pk=job_id)
+    if job.is_finished:
+        return job
+    job.status = RescoreJob.RUNNING
+    job.save(update_fields=["status"])
+
+    def progress(processed, changed, total):
+        RescoreJob.objects.filter(pk=job.pk).update(
+            processed=processed, changed=changed, total=total
+        )
+
+    try:
+        stats = rescore_question(job.question, progress=progress)
+    except Exception as exc:
+        logger.exception("Re-scoring job %s failed", job.pk)
+        job.refresh_from_db(fields=["processed", "changed", "total"])
+        job.status = RescoreJob.FAILED
+        job.error = str(exc)
+    else:
+        job.total, job.processed, job.changed = (
+            stats["total"],
+            stats["processed"],
+            stats["changed"],
+        )
+        job.status = RescoreJob.DONE
+    job.finished_at = timezone.now()
+    job.save()
+    return job
+
+
+def rescore_job_data(job):
+    return {
+        "id": str(job.pk),
+        "question": job.question_id,
+        "status": job.status,
+        "total": job.total,
+        "processed": job.processed,
+        "changed": job.changed,
+        "percent": job.percent,
+        "error": job.error,
+        "status_url": reverse("rescore_job_status", kwargs={"pk": job.pk}),
+    }
@@ -0,0 +1,53 @@
+from .models import Question, Quiz
+from .payload import bump_payload_version
+from .provisioning import schedule_provisioning
+
+
+def quiz_changed_receiver(sender, instance=None, **kwargs):
+    instance.payload_version = bump_payload_version([instance.pk])
+
+
+def quiz_pre_save_receiver(sender, instance=None, **kwargs):
+    instance._old_opens_at = (
+        Quiz.objects.filter(pk=instance.pk).values_list("opens_at", flat=True).first()
+        if instance.pk
+        else None
+    )
+
+
+def quiz_scheduled_receiver(sender, instance=None, created=False, **kwargs):
+    """Provision the quiz ahead of its opening time, when that changed"""
+    if kwargs.get("raw"):
+        return
+    if not created and instance.opens_at == getattr(instance, "_old_opens_at", None):
+        return
+    schedule_provisioning(instance)
+
+
+def question_changed_receiver(sender, instance=None, **kwargs):
+    bump_payload_version(instance.quiz.values_list("pk", flat=True))
+
+
+def choice_changed_receiver(sender, instance=None, **kwargs):
+    bump_payload_version(
+        Question.quiz.through.objects.filter(
+            question_id=instance.question_id
+        ).values_list("quiz_id", flat=True)
+    )
+
+
+def question_quiz_changed_receiver(
+    sender, instance=None, action=None, reverse=False, pk_set=None, **kwargs
+):
+    """
+    Questions added to or removed from a quiz, from either side of the
+    relation
+    """
+    if reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            bump_payload_version([instance.pk])
+    elif action in ("post_add", "post_remove"):
+        bump_payload_version(pk_set)
+    elif action == "pre_clear":
+        # after the clear there is no telling which quizzes had the question
+        bump_payload_version(instance.quiz.values_list("pk", flat=True))
@@ -0,0 +1,14 @@
+from celery import shared_task
+
+from .provisioning import run_provisioning
+from .rescoring import run_rescore_job
+
+
+@shared_task
+def rescore_question_task(job_id):
+    run_rescore_job(job_id)
+
+
+@shared_task
+def provision_sittings_task(quiz_id, opens_at):
+    run_provisioning(quiz_id, opens_at)
@@ -9,7 +9,9 @@ def correct_answer_for_all(context, question):
     processes the correct answer based on a given question object
     if the answer is incorrect, informs the user
     """
-    answers = question.get_choices()
+    # the order the choices were shown in during the sitting
+    sitting = context.get('sitting')
+    answers = question.get_choices(getattr(sitting, 'seed', None))
     incorrect_list = context.get('incorrect_questions', [])
     if question.id in incorrect_list:
         user_was_incorrect = True
@@ -1,3 +1,1538 @@
-from django.test import TestCase
+import datetime
+import io
+import json
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User, Student
+from config.celery import app as celery_app
+from course.models import Program, Course, CourseAllocation
+from result.models import TakenCourse
+from .models import (
+    Quiz,
+    Progress,
+    QuizProgress,
+    MCQuestion,
+    Choice,
+    EssayQuestion,
+    Question,
+    Sitting,
+    SittingAnswer,
+    RescoreJob,
+    LeaderboardBucket,
+    draw_questions,
+)
+from .analysis import get_item_analysis
+from . import live
+from .compaction import compact_sittings
+from .expiry import FULL_RELOAD_INTERVAL, ExpiryScheduler
+from .leaderboard import get_standing, record_result, top_entries
+from .marking import essay_queue, mark_answers
+from .provisioning import provision_sittings, run_provisioning
+from . import question_bank
+from .payload import get_payload_version, get_quiz_payload
+from .rescoring import rescore_question
+
+
+class QuizTestMixin:
+    def setUp(self):
+        cache.clear()
+        program = Program.objects.create(title="Computer Science")
+        self.course = Course.objects.create(
+            title="Algorithms", code="CS101", credit=3, program=program
+        )
+        self.quiz = Quiz.objects.create(
+            course=self.course, title="Sorting", category="practice"
+        )
+        self.user = User.objects.create_user(username="student", password="password")
+        self.questions = []
+        for i in range(3):
+            question = MCQuestion.objects.create(content=f"Question {i}")
+            question.quiz.add(self.quiz)
+            Choice.objects.create(question=question, choice="Right", correct=True)
+            Choice.objects.create(question=question, choice="Wrong", correct=False)
+            self.questions.append(question)
+        self.essay = EssayQuestion.objects.create(content="Explain quicksort")
+        self.essay.quiz.add(self.quiz)
+        self.questions.append(self.essay)
+
+    def choice(self, question, correct):
+        return str(question.choice_set.get(correct=correct).pk)
+
+
+class SittingTestCase(QuizTestMixin, TestCase):
+    def test_new_sitting(self):
+        sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+        self.assertEqual(sitting.progress(), (0, 4))
+        self.assertEqual(sitting.get_max_score, 4)
+        self.assertEqual(
+            [q.pk for q in sitting.get_questions()], [q.pk for q in self.questions]
+        )
+        self.assertEqual(sitting.get_first_question(), self.questions[0])
+
+    def test_answers(self):
+        sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+        for question, correct in zip(self.questions, [True, False, True]):
+            question = sitting.get_first_question()
+            guess = self.choice(question, correct)
+            with self.assertNumQueries(4):
+                sitting.add_user_answer(question, guess, correct)
+        essay = sitting.get_first_question()
+        self.assertIsInstance(essay, EssayQuestion)
+        sitting.add_user_answer(essay, "Divide and conquer")
+        self.assertIs(sitting.get_first_question(), False)
+
+        sitting.refresh_from_db()
+        self.assertEqual(sitting.progress(), (4, 4))
+        self.assertEqual(sitting.get_current_score, 2)
+        self.assertEqual(sitting.get_percent_correct, 50)
+        self.assertEqual(
+            sitting.get_incorrect_questions, [self.questions[1].pk, self.essay.pk]
+        )
+        questions = sitting.get_questions(with_answers=True)
+        self.assertEqual(questions[3].user_answer, "Divide and conquer")
+        self.assertEqual(
+            questions[1].user_answer, self.choice(self.questions[1], False)
+        )
+
+    def test_resubmitted_answer(self):
+        sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+        question = sitting.get_first_question()
+        self.assertTrue(sitting.add_user_answer(question, "1", True))
+        sitting.current_position = 0
+        self.assertFalse(sitting.add_user_answer(question, "2", True))
+        sitting.refresh_from_db()
+        self.assertEqual(sitting.progress(), (1, 4))
+        self.assertEqual(sitting.current_score, 1)
+        self.assertEqual(sitting.answers.get().answer, "1")
+
+    def test_marking(self):
+        sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+        sitting.add_user_answer(self.questions[0], "1", True)
+        sitting.add_user_answer(self.questions[1], "2", True)
+        sitting.mark_quiz_complete()
+
+        sitting.add_incorrect_question(self.questions[1])
+        sitting.refresh_from_db()
+        self.assertEqual(sitting.current_score, 1)
+        self.assertEqual(sitting.get_incorrect_questions, [self.questions[1].pk])
+
+        sitting.remove_incorrect_question(self.questions[1])
+        sitting.refresh_from_db()
+        self.assertEqual(sitting.current_score, 2)
+        self.assertEqual(sitting.get_incorrect_questions, [])
+
+        # toggled again, or on a question left blank, the score stays
+        sitting.remove_incorrect_question(self.questions[1])
+        sitting.add_incorrect_question(self.questions[2])
+        sitting.remove_incorrect_question(self.questions[2])
+        sitting.refresh_from_db()
+        self.assertEqual(sitting.current_score, 2)
+        sitting.add_incorrect_question(self.questions[1])
+        sitting.add_incorrect_question(self.questions[1])
+        sitting.refresh_from_db()
+        self.assertEqual(sitting.current_score, 1)
+
+    def test_long_quiz(self):
+        questions = Question.objects.bulk_create(
+            Question(content=f"Extra {i}") for i in range(300)
+        )
+        self.quiz.question_set.add(*questions)
+        sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+        self.assertEqual(sitting.get_max_score, 304)
+        self.assertEqual(len(sitting.get_questions()), 304)
+
+
+@override_settings(
+    STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+)
+class QuizTakeTestCase(QuizTestMixin, TestCase):
+    def test_take(self):
+        self.essay.quiz.clear()
+        self.client.force_login(self.user)
+        url = reverse(
+            "quiz_take", kwargs={"pk": self.course.pk, "slug": self.quiz.slug}
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["progress"], (0, 3))
+
+        for question in self.questions[:2]:
+            response = self.client.post(
+                url,
+                {"answers": self.choice(question, question.pk != self.questions[1].pk)},
+            )
+            self.assertEqual(response.status_code, 200)
+        sitting = Sitting.objects.get(user=self.user)
+        self.assertEqual(sitting.progress(), (2, 3))
+        self.assertEqual(sitting.current_score, 1)
+
+        response = self.client.post(
+            url, {"answers": self.choice(self.questions[2], True)}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["score"], 2)
+        self.assertEqual(response.context["max_score"], 3)
+        # practice quizzes are not kept
+        self.assertFalse(Sitting.objects.exists())
+
+
+@override_settings(
+    STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage",
+    QUIZ_LIVE_SITTINGS=True,
+    QUIZ_LIVE_CHECKPOINT=2,
+)
+class LiveSittingTestCase(QuizTestMixin, TestCase):
+    def test_checkpoints(self):
+        sitting = live.restore_sitting(
+            Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+        )
+        with self.assertNumQueries(0):
+            self.assertTrue(live.record_answer(sitting, self.questions[0], "1", True))
+        self.assertFalse(SittingAnswer.objects.exists())
+        self.assertEqual(sitting.progress(), (1, 4))
+
+        # a second request for the same position is turned away
+        stale = Sitting.objects.get(pk=sitting.pk)
+        self.assertFalse(live.record_answer(stale, self.questions[0], "2", False))
+
+        self.assertTrue(live.record_answer(sitting, self.questions[1], "2"))
+        stored = Sitting.objects.get(pk=sitting.pk)
+        self.assertEqual((stored.current_position, stored.current_score), (2, 1))
+        self.assertEqual(
+            list(SittingAnswer.objects.values_list("position", "answer", "correct")),
+            [(0, "1", True), (1, "2", False)],
+        )
+
+        # losing the cache resumes from the last checkpoint
+        live.record_answer(sitting, self.questions[2], "3", True)
+        cache.clear()
+        resumed = live.restore_sitting(Sitting.objects.get(pk=sitting.pk))
+        self.assertEqual((resumed.current_position, resumed.current_score), (2, 1))
+
+    def test_take(self):
+        self.essay.quiz.clear()
+        Quiz.objects.filter(pk=self.quiz.pk).update(exam_paper=True)
+        self.client.force_login(self.user)
+        url = reverse(
+            "quiz_take", kwargs={"pk": self.course.pk, "slug": self.quiz.slug}
+        )
+        self.client.get(url)
+        guesses = [
+            self.choice(q, q.pk != self.questions[1].pk) for q in self.questions[:3]
+        ]
+        response = self.client.post(url, {"answers": guesses[0]})
+        self.assertEqual(response.context["progress"], (1, 3))
+        sitting = Sitting.objects.get(user=self.user)
+        self.assertEqual(sitting.current_position, 0)
+        self.assertFalse(QuizProgress.objects.exists())
+
+        for guess in guesses[1:]:
+            response = self.client.post(url, {"answers": guess})
+        self.assertEqual(response.context["score"], 2)
+        sitting.refresh_from_db()
+        self.assertTrue(sitting.complete)
+        self.assertEqual((sitting.current_position, sitting.current_score), (3, 2))
+        self.assertEqual(sitting.answers.count(), 3)
+        self.assertEqual(
+            QuizProgress.objects.values_list("score", "possible").get(), (2, 3)
+        )
+        self.assertIsNone(cache.get(live.live_key(sitting.pk, "position")))
+
+
+class ProgressTestCase(QuizTestMixin, TestCase):
+    def test_add_score(self):
+        QuizProgress.objects.add_score(self.user, self.quiz, 1, 1)
+        with self.assertNumQueries(1):
+            QuizProgress.objects.add_score(self.user, self.quiz, 0, 1)
+        progress = QuizProgress.objects.get()
+        self.assertEqual((progress.score, progress.possible), (1, 2))
+
+    def test_titles_sharing_a_prefix(self):
+        other = Quiz.objects.create(
+            course=self.course, title="Sorting, part 2", category="exam"
+        )
+        progress = Progress.objects.new_progress(self.user)
+        progress.update_score(self.quiz, 1, 1)
+        progress.update_score(other, 0, 1)
+        progress.update_score(other, 1, 1)
+        self.assertEqual(
+            dict(QuizProgress.objects.values_list("quiz__title", "possible")),
+            {"Sorting": 1, "Sorting, part 2": 2},
+        )
+
+    def test_list_all_cat_scores(self):
+        exam = Quiz.objects.create(course=self.course, title="Final", category="exam")
+        midterm = Quiz.objects.create(
+            course=self.course, title="Midterm", category="exam"
+        )
+        QuizProgress.objects.add_score(self.user, self.quiz, 3, 4)
+        QuizProgress.objects.add_score(self.user, exam, 1, 4)
+        QuizProgress.objects.add_score(self.user, midterm, 0, 1)
+        progress = Progress.objects.new_progress(self.user)
+        with self.assertNumQueries(1):
+            scores = progress.list_all_cat_scores()
+        self.assertEqual(
+            scores, {"Экзамен": [1, 4, 20], "Практическое задание": [3, 1, 75]}
+        )
+
+    def test_take_records_progress(self):
+        sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+        self.client.force_login(self.user)
+        url = reverse(
+            "quiz_take", kwargs={"pk": self.course.pk, "slug": self.quiz.slug}
+        )
+        with override_settings(
+            STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+        ):
+            self.client.post(url, {"answers": self.choice(self.questions[0], True)})
+            self.client.post(url, {"answers": self.choice(self.questions[1], False)})
+        progress = QuizProgress.objects.get(user=self.user, quiz=self.quiz)
+        self.assertEqual((progress.score, progress.possible), (1, 2))
+        self.assertEqual(sitting.answers.count(), 2)
+
+    @override_settings(
+        STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+    )
+    def test_double_submit_counts_once(self):
+        sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+        self.client.force_login(self.user)
+        url = reverse(
+            "quiz_take", kwargs={"pk": self.course.pk, "slug": self.quiz.slug}
+        )
+        answer = {"answers": self.choice(self.questions[0], True)}
+        self.client.post(url, answer)
+        # a second tab that read the sitting before the first answer landed
+        Sitting.objects.filter(pk=sitting.pk).update(
+            current_position=0, current_score=0
+        )
+        self.client.post(url, answer)
+        progress = QuizProgress.objects.get(user=self.user, quiz=self.quiz)
+        self.assertEqual((progress.score, progress.possible), (1, 1))
+        self.assertEqual(sitting.answers.count(), 1)
+
+
+@override_settings(
+    STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+)
+class QuizPayloadTestCase(QuizTestMixin, TestCase):
+    def payload(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return get_quiz_payload(self.quiz)
+
+    def test_payload(self):
+        payload = self.payload()
+        self.assertEqual(list(payload), [q.pk for q in self.questions])
+        self.assertIsInstance(payload[self.essay.pk], EssayQuestion)
+        question = payload[self.questions[0].pk]
+        guess = self.choice(question, True)
+        with self.assertNumQueries(0):
+            self.payload()
+            self.assertEqual(
+                [choice.choice for choice in question.get_choices()],
+                ["Right", "Wrong"],
+            )
+            self.assertTrue(question.check_if_correct(guess))
+
+    def test_edits_bump_the_version(self):
+        question = self.questions[0]
+        edits = [
+            lambda: Choice.objects.filter(question=question, correct=True).get().save(),
+            lambda: question.choice_set.first().delete(),
+            lambda: MCQuestion.objects.get(pk=question.pk).save(),
+            lambda: self.quiz.save(),
+            lambda: self.quiz.question_set.remove(self.essay),
+            lambda: MCQuestion.objects.create(content="New").quiz.add(self.quiz),
+            lambda: question.quiz.clear(),
+        ]
+        version = get_payload_version(self.quiz.pk)
+        for edit in edits:
+            with self.captureOnCommitCallbacks(execute=True):
+                edit()
+            self.assertNotEqual(get_payload_version(self.quiz.pk), version)
+            version = get_payload_version(self.quiz.pk)
+        self.assertEqual(
+            [type(q).__name__ for q in self.payload().values()],
+            ["MCQuestion", "MCQuestion", "MCQuestion"],
+        )
+
+    def test_version_is_read_with_the_quiz(self):
+        self.payload()
+        question = self.questions[0]
+        Choice.objects.filter(question=question, correct=False).update(correct=True)
+        # as another process would, the version comes with the quiz row
+        MCQuestion.objects.get(pk=question.pk).save()
+        payload = get_quiz_payload(Quiz.objects.get(pk=self.quiz.pk))
+        self.assertEqual(
+            [choice.correct for choice in payload[question.pk].get_choices()],
+            [True, True],
+        )
+
+    def test_take_without_question_queries(self):
+        self.client.force_login(self.user)
+        url = reverse(
+            "quiz_take", kwargs={"pk": self.course.pk, "slug": self.quiz.slug}
+        )
+        self.client.get(url)
+        guess = self.choice(self.questions[0], True)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(url, {"answers": guess})
+        self.assertEqual(response.context["question"], self.questions[1])
+        self.assertEqual(response.context["previous"]["previous_outcome"], True)
+        tables = ("quiz_question", "quiz_mcquestion", "quiz_choice")
+        self.assertEqual(
+            [
+                query["sql"]
+                for query in context.captured_queries
+                if any(f'"{table}"' in query["sql"] for table in tables)
+            ],
+            [],
+        )
+
+
+class RandomizationTestCase(QuizTestMixin, TestCase):
+    def test_draw_questions(self):
+        ids = list(range(1, 101))
+        self.assertEqual(draw_questions(ids, 7), ids)
+        drawn = draw_questions(ids, 7, max_questions=10)
+        self.assertEqual(len(drawn), 10)
+        self.assertEqual(drawn, sorted(drawn))
+        shuffled = draw_questions(ids, 7, random_order=True, max_questions=10)
+        self.assertEqual(sorted(shuffled), drawn)
+        self.assertEqual(
+            shuffled, draw_questions(ids, 7, random_order=True, max_questions=10)
+        )
+        self.assertNotEqual(
+            draw_questions(ids, 7, random_order=True),
+            draw_questions(ids, 8, random_order=True),
+        )
+
+    def test_new_sitting(self):
+        self.quiz.random_order = True
+        self.quiz.max_questions = 2
+        self.quiz.save()
+        with CaptureQueriesContext(connection) as context:
+            sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+        self.assertFalse(
+            any("RANDOM()" in query["sql"] for query in context.captured_queries)
+        )
+        self.assertEqual(sitting.get_max_score, 2)
+        self.assertEqual(
+            [q.pk for q in sitting.get_questions()],
+            draw_questions(
+                [q.pk for q in self.questions], sitting.seed, True, max_questions=2
+            ),
+        )
+
+    def test_choice_order(self):
+        question = self.questions[0]
+        for i in range(8):
+            Choice.objects.create(question=question, choice=f"Option {9 - i}")
+        choices = list(question.choice_set.order_by("id"))
+
+        question.choice_order = "none"
+        self.assertEqual(question.get_choices(), choices)
+        question.choice_order = "content"
+        self.assertEqual(
+            question.get_choices(), sorted(choices, key=lambda c: c.choice)
+        )
+        question.choice_order = "random"
+        self.assertEqual(question.get_choices(1), question.get_choices(1))
+        self.assertNotEqual(question.get_choices(1), question.get_choices(2))
+        self.assertEqual(sorted(question.get_choices(1), key=lambda c: c.id), choices)
+
+    @override_settings(
+        STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+    )
+    def test_rerender_keeps_the_order(self):
+        self.essay.quiz.clear()
+        for question in self.questions[:3]:
+            question.choice_order = "random"
+            question.save()
+            for i in range(6):
+                Choice.objects.create(question=question, choice=f"Option {i}")
+        self.quiz.random_order = True
+        self.quiz.save()
+        self.client.force_login(self.user)
+        url = reverse(
+            "quiz_take", kwargs={"pk": self.course.pk, "slug": self.quiz.slug}
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self.client.get(url)
+        second = self.client.get(url)
+        self.assertEqual(first.context["question"], second.context["question"])
+        self.assertEqual(
+            first.context["form"].fields["answers"].choices,
+            second.context["form"].fields["answers"].choices,
+        )
+
+
+@override_settings(
+    STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+)
+class QuizMarkingTestCase(QuizTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.lecturer = User.objects.create_user(
+            username="lecturer", password="password"
+        )
+        # set directly, saving a new lecturer sends the credentials email
+        User.objects.filter(pk=self.lecturer.pk).update(is_lecturer=True)
+
+    def complete_sitting(self, size):
+        questions = [
+            MCQuestion.objects.create(content=f"Extra {i}") for i in range(size)
+        ]
+        self.quiz.question_set.add(*questions)
+        Choice.objects.bulk_create(
+            Choice(question=question, choice=text, correct=text == "Right")
+            for question in questions
+            for text in ("Right", "Wrong")
+        )
+        cache.clear()
+        sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+        for question in sitting.get_questions():
+            if isinstance(question, EssayQuestion):
+                sitting.add_user_answer(question, "An essay")
+            else:
+                choice = question.get_choices()[question.id % 2]
+                sitting.add_user_answer(question, str(choice.id), choice.correct)
+        sitting.mark_quiz_complete()
+        return sitting
+
+    def get_queries(self, sitting):
+        self.client.force_login(self.lecturer)
+        cache.clear()
+        url = reverse("quiz_marking_detail", kwargs={"pk": sitting.pk})
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(context.captured_queries)
+
+    def test_query_budget(self):
+        response, queries = self.get_queries(self.complete_sitting(10))
+        questions = response.context["questions"]
+        self.assertEqual(len(questions), 14)
+        self.assertEqual(questions[3].user_answer, "An essay")
+        self.assertIs(questions[3].user_was_correct, False)
+        self.assertEqual(
+            [q.user_was_correct for q in questions[:3]], [False, True, False]
+        )
+        self.assertContains(response, "An essay")
+
+        Sitting.objects.all().delete()
+        response, many_queries = self.get_queries(self.complete_sitting(100))
+        self.assertEqual(len(response.context["questions"]), 114)
+        self.assertEqual(many_queries, queries)
+
+    def test_get_questions_order(self):
+        sitting = self.complete_sitting(20)
+        order = list(
+            sitting.questions.order_by("position").values_list("question_id", flat=True)
+        )
+        with self.assertNumQueries(4):
+            questions = sitting.get_questions(with_answers=True)
+        self.assertEqual([q.pk for q in questions], order)
+        with self.assertNumQueries(2):
+            questions = sitting.get_questions(
+                with_answers=True, payload=get_quiz_payload(self.quiz)
+            )
+        self.assertEqual([q.pk for q in questions], order)
+
+    def test_toggle(self):
+        sitting = self.complete_sitting(0)
+        self.assertEqual(sitting.current_score, 1)
+        QuizProgress.objects.add_score(self.user, self.quiz, 1, 4)
+        self.client.force_login(self.lecturer)
+        url = reverse("quiz_marking_detail", kwargs={"pk": sitting.pk})
+        self.client.post(url, {"qid": self.essay.pk})
+        sitting.refresh_from_db()
+        self.assertEqual(sitting.current_score, 2)
+        self.assertNotIn(self.essay.pk, sitting.get_incorrect_questions)
+        self.assertEqual(QuizProgress.objects.get(user=self.user).score, 2)
+
+
+@override_settings(
+    STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+)
+class EssayMarkingTestCase(QuizTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.lecturer = User.objects.create_user(
+            username="lecturer", password="password"
+        )
+        User.objects.filter(pk=self.lecturer.pk).update(is_lecturer=True)
+        CourseAllocation.objects.create(lecturer=self.lecturer).courses.add(self.course)
+        self.sittings = []
+        for i in range(6):
+            user = User.objects.create_user(username=f"student{i}")
+            sitting = Sitting.objects.new_sitting(user, self.quiz, self.course)
+            sitting.add_user_answer(self.questions[0], "0", True)
+            sitting.add_user_answer(self.essay, f"Essay {i}")
+            sitting.mark_quiz_complete()
+            QuizProgress.objects.add_score(user, self.quiz, 1, 2)
+            self.sittings.append(sitting)
+        # unfinished sittings are not marked yet
+        sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+        sitting.add_user_answer(self.essay, "Draft")
+
+    def test_queue(self):
+        with self.assertNumQueries(1):
+            answers = [
+                (answer.answer, answer.sitting.user.username, answer.question.pk)
+                for answer in essay_queue(self.quiz)
+            ]
+        self.assertEqual(
+            answers,
+            [(f"Essay {i}", f"student{i}", self.essay.pk) for i in range(6)],
+        )
+
+    def test_mark_answers(self):
+        answers = list(essay_queue(self.quiz))
+        marks = {answer.pk: i % 2 == 0 for i, answer in enumerate(answers[:4])}
+        # answers to other questions are not marked here
+        marks[SittingAnswer.objects.exclude(question=self.essay).first().pk] = True
+        # read, bulk update and one score update, the same for the quiz
+        # progress, in a savepoint, then the leaderboard entries of the two
+        # sittings changed
+        with self.assertNumQueries(19):
+            self.assertEqual(mark_answers(self.quiz, marks), 4)
+        self.assertEqual(
+            [answer.answer for answer in essay_queue(self.quiz)],
+            ["Essay 4", "Essay 5"],
+        )
+        self.assertEqual(
+            list(
+                Sitting.objects.filter(pk__in=[s.pk for s in self.sittings])
+                .order_by("pk")
+                .values_list("current_score", flat=True)
+            ),
+            [2, 1, 2, 1, 1, 1],
+        )
+        self.assertEqual(self.progress(), [2, 1, 2, 1, 1, 1])
+
+        # marking again moves the score back
+        mark_answers(self.quiz, {answers[0].pk: False})
+        self.sittings[0].refresh_from_db()
+        self.assertEqual(self.sittings[0].current_score, 1)
+        self.assertEqual(self.progress(), [1, 1, 2, 1, 1, 1])
+
+    def progress(self):
+        return list(
+            QuizProgress.objects.filter(user__in=[s.user for s in self.sittings])
+            .order_by("user_id")
+            .values_list("score", flat=True)
+        )
+
+    def test_view(self):
+        self.client.force_login(self.lecturer)
+        url = reverse("essay_marking", kwargs={"pk": self.quiz.pk})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        answers = response.context["answers"]
+        self.assertEqual(answers.paginator.count, 6)
+        self.assertContains(response, "Essay 5")
+
+        data = {f"mark_{answer.pk}": "1" for answer in answers[:3]}
+        data[f"mark_{answers[3].pk}"] = ""
+        response = self.client.post(f"{url}?page=1", data)
+        self.assertRedirects(response, f"{url}?page=1")
+        self.assertEqual(essay_queue(self.quiz).count(), 3)
+
+    def test_view_scoping(self):
+        other = User.objects.create_user(username="other", password="password")
+        User.objects.filter(pk=other.pk).update(is_lecturer=True)
+        self.client.force_login(other)
+        url = reverse("essay_marking", kwargs={"pk": self.quiz.pk})
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.client.force_login(self.user)
+        self.assertNotEqual(self.client.get(url).status_code, 200)
+
+
+@override_settings(
+    STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+)
+class ItemAnalysisTestCase(QuizTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.lecturer = User.objects.create_user(
+            username="lecturer", password="password"
+        )
+        User.objects.filter(pk=self.lecturer.pk).update(is_lecturer=True)
+        CourseAllocation.objects.create(lecturer=self.lecturer).courses.add(self.course)
+        # student i answers the first 3 - i questions right
+        for i in range(4):
+            self.take(f"student{i}", 3 - i)
+
+    def take(self, username, right):
+        sitting = Sitting.objects.new_sitting(
+            User.objects.create_user(username=username), self.quiz, self.course
+        )
+        for j, question in enumerate(self.questions[:3]):
+            correct = j < right
+            sitting.add_user_answer(question, self.choice(question, correct), correct)
+        sitting.mark_quiz_complete()
+
+    def test_analysis(self):
+        analysis = get_item_analysis(self.quiz)
+        self.assertEqual(analysis["sittings"], 4)
+        self.assertEqual(analysis["mean"], 1.5)
+        self.assertEqual(analysis["reliability"], 0.75)
+        first, second, third, essay = analysis["items"]
+        self.assertEqual(first["difficulty"], 0.75)
+        self.assertEqual(first["discrimination"], 0.775)
+        self.assertEqual(second["difficulty"], 0.5)
+        self.assertEqual(third["difficulty"], 0.25)
+        self.assertEqual(
+            [(d["text"], d["count"], d["share"]) for d in first["distractors"]],
+            [("Right", 3, 0.75), ("Wrong", 1, 0.25)],
+        )
+        self.assertEqual(essay["answered"], 0)
+        self.assertIsNone(essay["difficulty"])
+        self.assertEqual(essay["distractors"], [])
+
+    def test_cached_until_taken(self):
+        analysis = get_item_analysis(self.quiz)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_item_analysis(self.quiz), analysis)
+        self.take("late", 3)
+        self.assertEqual(get_item_analysis(self.quiz)["sittings"], 5)
+
+    def test_view(self):
+        url = reverse("item_analysis", kwargs={"pk": self.quiz.pk})
+        self.client.force_login(self.lecturer)
+        response = self.client.get(url)
+        self.assertEqual(response.context["analysis"]["reliability"], 0.75)
+        self.assertContains(response, "Explain quicksort")
+        response = self.client.get(url, HTTP_ACCEPT="application/json")
+        self.assertEqual(response.json()["items"][0]["difficulty"], 0.75)
+
+        other = User.objects.create_user(username="other", password="password")
+        User.objects.filter(pk=other.pk).update(is_lecturer=True)
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+@override_settings(
+    STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+)
+class QuestionBankTestCase(QuizTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        question = self.questions[0]
+        question.explanation = "Pick {the} right = one"
+        question.choice_order = "random"
+        question.save()
+        self.target = Quiz.objects.create(
+            course=self.course, title="Imported", category="practice"
+        )
+
+    def exported(self, quiz):
+        return question_bank.export_questions(quiz, question_bank.JSON)
+
+    def test_round_trip(self):
+        expected = json.loads(self.exported(self.quiz))["questions"]
+        self.assertEqual(expected[0]["choice_order"], "random")
+        self.assertEqual(expected[3]["type"], "essay")
+        for format in question_bank.FORMATS:
+            content = question_bank.export_questions(self.quiz, format)
+            questions = question_bank.parse_questions(content, format)
+            if format == question_bank.GIFT:
+                # GIFT has no choice order
+                expected[0]["choice_order"] = ""
+            self.assertEqual(questions, expected, format)
+
+        self.assertEqual(question_bank.import_questions(self.target, questions), 4)
+        cache.clear()
+        self.assertEqual(json.loads(self.exported(self.target))["questions"], expected)
+        self.assertEqual(
+            [type(q) for q in get_quiz_payload(self.target).values()],
+            [MCQuestion, MCQuestion, MCQuestion, EssayQuestion],
+        )
+
+    def test_bulk_create_children(self):
+        # pins the private Manager._insert() the import relies on
+        mc, essay = Question.objects.bulk_create(
+            [Question(content="Choose"), Question(content="Write")]
+        )
+        question_bank.bulk_create_children(
+            MCQuestion, [MCQuestion(question_ptr=mc, choice_order="content")]
+        )
+        question_bank.bulk_create_children(
+            EssayQuestion, [EssayQuestion(question_ptr=essay)]
+        )
+        loaded = MCQuestion.objects.get(pk=mc.pk)
+        self.assertEqual((loaded.content, loaded.choice_order), ("Choose", "content"))
+        self.assertEqual(EssayQuestion.objects.get(pk=essay.pk).content, "Write")
+        self.assertEqual(
+            [
+                type(q)
+                for q in Question.objects.filter(
+                    pk__in=[mc.pk, essay.pk]
+                ).select_subclasses()
+            ],
+            [MCQuestion, EssayQuestion],
+        )
+
+    def test_import_is_batched(self):
+        questions = [
+            {
+                "type": "mc",
+                "content": f"Question {i}",
+                "explanation": "",
+                "choice_order": "",
+                "choices": [
+                    {"choice": "Right", "correct": True},
+                    {"choice": "Wrong", "correct": False},
+                ],
+            }
+            for i in range(1000)
+        ]
+        version = get_payload_version(self.target.pk)
+        with CaptureQueriesContext(connection) as context:
+            with self.captureOnCommitCallbacks(execute=True):
+                question_bank.import_questions(self.target, questions)
+        self.assertLess(len(context.captured_queries), 20)
+        self.assertEqual(self.target.question_set.count(), 1000)
+        self.assertEqual(
+            Choice.objects.filter(question__quiz=self.target).count(), 2000
+        )
+        self.assertNotEqual(get_payload_version(self.target.pk), version)
+
+    def test_invalid_file(self):
+        content = json.dumps(
+            [
+                {"type": "mc", "content": "No choices", "choices": []},
+                {"type": "essay", "content": ""},
+                {
+                    "content": "No right choice",
+                    "choices": [{"choice": "a"}, {"choice": "b"}],
+                },
+                {"type": "essay", "content": "Fine"},
+            ]
+        )
+        with self.assertRaises(ValidationError) as cm:
+            question_bank.parse_questions(content, question_bank.JSON)
+        self.assertEqual(
+            cm.exception.messages,
+            [
+                "Вопрос 1: нужно не менее двух вариантов ответа.",
+                "Вопрос 2: нет текста вопроса.",
+                "Вопрос 3: нет правильного варианта ответа.",
+            ],
+        )
+        with self.assertRaises(ValidationError):
+            question_bank.parse_questions("Question {", question_bank.GIFT)
+
+    def test_gift(self):
+        content = r"""// a comment
+::Q1:: Is 1\=1? {
+    =Yes
+    ~No #feedback is dropped
+    ####Basic \{math\}
+}
+
+Describe recursion {}
+"""
+        mc, essay = question_bank.parse_questions(content, question_bank.GIFT)
+        self.assertEqual(mc["content"], "Is 1=1?")
+        self.assertEqual(
+            mc["choices"],
+            [
+                {"choice": "Yes", "correct": True},
+                {"choice": "No", "correct": False},
+            ],
+        )
+        self.assertEqual(mc["explanation"], "Basic {math}")
+        self.assertEqual(essay["type"], "essay")
+
+    def test_views(self):
+        lecturer = User.objects.create_user(username="lecturer", password="password")
+        User.objects.filter(pk=lecturer.pk).update(is_lecturer=True)
+        CourseAllocation.objects.create(lecturer=lecturer).courses.add(self.course)
+        self.client.force_login(lecturer)
+
+        url = reverse("question_export", kwargs={"pk": self.quiz.pk, "format": "csv"})
+        response = self.client.get(url)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        content = response.content
+
+        url = reverse("question_import", kwargs={"pk": self.target.pk})
+        self.assertEqual(self.client.get(url).status_code, 200)
+        response = self.client.post(
+            url, {"file": SimpleUploadedFile("bank.csv", content), "format": "csv"}
+        )
+        self.assertRedirects(
+            response,
+            reverse("quiz_index", args=[self.course.slug]),
+            fetch_redirect_response=False,
+        )
+        self.assertEqual(self.target.question_set.count(), 4)
+
+        response = self.client.post(
+            url,
+            {"file": SimpleUploadedFile("bank.csv", b"type\nmc\n"), "format": "csv"},
+        )
+        self.assertContains(response, "нет текста вопроса")
+        self.assertEqual(self.target.question_set.count(), 4)
+
+
+class ProvisioningTestCase(QuizTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.quiz.max_questions = 2
+        self.quiz.save()
+        users = User.objects.bulk_create(
+            User(username=f"student{i}", is_student=True) for i in range(5)
+        )
+        students = Student.objects.bulk_create(
+            Student(student=user) for user in users + [self.user]
+        )
+        TakenCourse.objects.bulk_create(
+            TakenCourse(student=student, course=self.course) for student in students
+        )
+        self.users = users
+
+    def test_provision_sittings(self):
+        started = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+        # the quiz row lock in its own savepoint is three of them
+        with self.assertNumQueries(9):
+            self.assertEqual(provision_sittings(self.quiz), 5)
+        self.assertEqual(provision_sittings(self.quiz), 0)
+        sittings = Sitting.objects.exclude(pk=started.pk)
+        self.assertEqual(
+            sorted(sittings.values_list("user_id", flat=True)),
+            [user.pk for user in self.users],
+        )
+        for sitting in sittings:
+            self.assertEqual(sitting.progress(), (0, 2))
+            self.assertEqual(len(sitting.get_questions()), 2)
+
+        # opening the quiz finds the provisioned sitting
+        with self.assertNumQueries(1):
+            sitting = Sitting.objects.user_sitting(
+                self.users[0], self.quiz, self.course
+            )
+        self.assertIn(sitting, sittings)
+
+    def test_scheduled(self):
+        celery_app.conf.CELERY_TASK_ALWAYS_EAGER = True
+        self.addCleanup(setattr, celery_app.conf, "CELERY_TASK_ALWAYS_EAGER", False)
+        opens_at = timezone.now() + datetime.timedelta(minutes=5)
+        self.quiz.opens_at = opens_at
+        with self.captureOnCommitCallbacks(execute=True):
+            self.quiz.save()
+        self.assertEqual(Sitting.objects.count(), 6)
+
+        # saved again at the same opening time, nothing more is queued
+        self.quiz.title = "Renamed"
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.quiz.save()
+        self.assertEqual(callbacks, [])
+
+        # a task queued for an earlier schedule does nothing
+        Sitting.objects.all().delete()
+        self.quiz.opens_at = opens_at + datetime.timedelta(days=1)
+        self.quiz.save()
+        self.assertEqual(run_provisioning(self.quiz.pk, opens_at.isoformat()), 0)
+
+        call_command("provision_sittings", stdout=io.StringIO())
+        self.assertFalse(Sitting.objects.exists())
+        call_command("provision_sittings", quiz=self.quiz.pk, stdout=io.StringIO())
+        self.assertEqual(Sitting.objects.count(), 6)
+
+    def test_closed_until_open(self):
+        Quiz.objects.filter(pk=self.quiz.pk).update(
+            opens_at=timezone.now() + datetime.timedelta(hours=1)
+        )
+        self.client.force_login(self.user)
+        url = reverse(
+            "quiz_take", kwargs={"pk": self.course.pk, "slug": self.quiz.slug}
+        )
+        response = self.client.get(url)
+        self.assertRedirects(
+            response,
+            reverse("quiz_index", args=[self.course.slug]),
+            fetch_redirect_response=False,
+        )
+        self.assertFalse(Sitting.objects.exists())
+
+
+class ExpiryTestCase(QuizTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.quiz.duration = 30
+        self.quiz.exam_paper = True
+        self.quiz.save()
+        self.now = timezone.now()
+
+    def start(self, username, minutes_left):
+        sitting = Sitting.objects.new_sitting(
+            User.objects.create_user(username=username), self.quiz, self.course
+        )
+        sitting.add_user_answer(self.questions[0], "1", True)
+        sitting.deadline = self.now + datetime.timedelta(minutes=minutes_left)
+        sitting.save(update_fields=["deadline"])
+        return sitting
+
+    def test_deadline(self):
+        sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+        self.assertAlmostEqual(
+            sitting.deadline,
+            self.now + datetime.timedelta(minutes=30),
+            delta=datetime.timedelta(seconds=5),
+        )
+        self.quiz.opens_at = self.now + datetime.timedelta(hours=1)
+        self.assertEqual(
+            self.quiz.get_deadline(self.now),
+            self.quiz.opens_at + datetime.timedelta(minutes=30),
+        )
+        self.quiz.duration = None
+        self.assertIsNone(self.quiz.get_deadline(self.now))
+
+    def test_scheduler(self):
+        late = [self.start(f"late{i}", -i - 1) for i in range(2)]
+        extended = self.start("extended", -1)
+        running = self.start("running", 10)
+        scheduler = ExpiryScheduler()
+        scheduler.load()
+        self.assertEqual(len(scheduler.heap), 4)
+        Sitting.objects.filter(pk=extended.pk).update(
+            deadline=self.now + datetime.timedelta(minutes=5)
+        )
+
+        expired = scheduler.run_once(self.now)
+        self.assertEqual(sorted(expired), [late[0].pk, late[1].pk])
+        for sitting in late:
+            sitting.refresh_from_db()
+            self.assertTrue(sitting.complete)
+            self.assertEqual(sitting.end, sitting.deadline)
+            self.assertEqual(sitting.current_score, 1)
+        self.assertFalse(Sitting.objects.get(pk=extended.pk).complete)
+        self.assertEqual(
+            sorted(pk for deadline, pk in scheduler.heap),
+            [extended.pk, running.pk],
+        )
+        self.assertEqual(
+            scheduler.seconds_to_next(self.now, 600),
+            5 * 60 + settings.QUIZ_DEADLINE_GRACE,
+        )
+
+        # nothing new and nothing due is one read
+        with self.assertNumQueries(1):
+            self.assertEqual(scheduler.run_once(self.now), [])
+        later = self.now + datetime.timedelta(minutes=15)
+        self.assertEqual(sorted(scheduler.run_once(later)), [extended.pk, running.pk])
+
+    def test_scheduler_out_of_order(self):
+        late = self.start("late", -1)
+        # not visible to the first load, as if not committed yet
+        Sitting.objects.filter(pk=late.pk).update(complete=True)
+        first = self.start("first", 10)
+        scheduler = ExpiryScheduler()
+        scheduler.load()
+        self.assertEqual(scheduler.scheduled, {first.pk})
+        # committed after a higher key was seen
+        Sitting.objects.filter(pk=late.pk).update(complete=False)
+        self.assertEqual(scheduler.run_once(self.now), [late.pk])
+
+        # committed long after it started: left to the next full read
+        slow = self.start("slow", -1)
+        Sitting.objects.filter(pk=slow.pk).update(
+            start=self.now - datetime.timedelta(hours=1)
+        )
+        self.assertEqual(scheduler.run_once(self.now), [])
+        scheduler.swept_at -= FULL_RELOAD_INTERVAL
+        self.assertEqual(scheduler.run_once(self.now), [slow.pk])
+
+    def test_practice_sittings_are_dropped(self):
+        Quiz.objects.filter(pk=self.quiz.pk).update(exam_paper=False)
+        self.start("late", -1)
+        call_command("expire_sittings", once=True, stdout=io.StringIO())
+        self.assertFalse(Sitting.objects.exists())
+
+    def test_take_after_deadline(self):
+        sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+        Sitting.objects.filter(pk=sitting.pk).update(
+            deadline=self.now - datetime.timedelta(minutes=1)
+        )
+        self.client.force_login(self.user)
+        url = reverse(
+            "quiz_take", kwargs={"pk": self.course.pk, "slug": self.quiz.slug}
+        )
+        response = self.client.post(
+            url, {"answers": self.choice(self.questions[0], True)}
+        )
+        self.assertRedirects(
+            response,
+            reverse("quiz_index", args=[self.course.slug]),
+            fetch_redirect_response=False,
+        )
+        sitting.refresh_from_db()
+        self.assertTrue(sitting.complete)
+        self.assertFalse(sitting.answers.exists())
+
+    @override_settings(
+        STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+    )
+    def test_single_page_submitted_at_deadline(self):
+        self.quiz.single_page = True
+        self.quiz.save()
+        sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+        # sent just before the deadline, received just after it
+        Sitting.objects.filter(pk=sitting.pk).update(
+            deadline=self.now - datetime.timedelta(seconds=5)
+        )
+        self.client.force_login(self.user)
+        url = reverse(
+            "quiz_take", kwargs={"pk": self.course.pk, "slug": self.quiz.slug}
+        )
+        answers = {f"question_{q.pk}": self.choice(q, True) for q in self.questions[:3]}
+        response = self.client.post(url, answers)
+        self.assertTemplateUsed(response, "result.html")
+        self.assertEqual(response.context["score"], 3)
+
+    def test_single_page_submitted_late(self):
+        self.quiz.single_page = True
+        self.quiz.save()
+        sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+        Sitting.objects.filter(pk=sitting.pk).update(
+            deadline=self.now - datetime.timedelta(minutes=1)
+        )
+        self.client.force_login(self.user)
+        url = reverse(
+            "quiz_take", kwargs={"pk": self.course.pk, "slug": self.quiz.slug}
+        )
+        response = self.client.post(
+            url,
+            {f"question_{self.questions[0].pk}": self.choice(self.questions[0], True)},
+        )
+        self.assertRedirects(
+            response,
+            reverse("quiz_index", args=[self.course.slug]),
+            fetch_redirect_response=False,
+        )
+        [message] = get_messages(response.wsgi_request)
+        self.assertIn("не принимаются", message.message)
+        sitting.refresh_from_db()
+        self.assertTrue(sitting.complete)
+        self.assertFalse(sitting.answers.exists())
+
+    def test_api_after_deadline(self):
+        sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+        Sitting.objects.filter(pk=sitting.pk).update(
+            deadline=self.now - datetime.timedelta(minutes=1)
+        )
+        self.client.force_login(self.user)
+        url = reverse(
+            "quiz-api:sitting", kwargs={"pk": self.course.pk, "slug": self.quiz.slug}
+        )
+        response = self.client.post(
+            url,
+            {
+                "answers": {
+                    str(self.questions[0].pk): self.choice(self.questions[0], True)
+                }
+            },
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 403)
+        sitting.refresh_from_db()
+        self.assertTrue(sitting.complete)
+        self.assertFalse(sitting.answers.exists())
+
+
+class CompactionTestCase(QuizTestMixin, TestCase):
+    def sitting(self, username, quiz=None, answered=False, days=0):
+        user, _ = User.objects.get_or_create(username=username)
+        sitting = Sitting.objects.new_sitting(user, quiz or self.quiz, self.course)
+        if answered:
+            sitting.add_user_answer(self.questions[0], "1", True)
+        Sitting.objects.filter(pk=sitting.pk).update(
+            start=timezone.now() - datetime.timedelta(days=days)
+        )
+        return sitting
+
+    def test_compact_sittings(self):
+        exam = Quiz.objects.create(
+            course=self.course, title="Final", category="exam", exam_paper=True
+        )
+        exam.question_set.add(*self.questions)
+        abandoned = [
+            self.sitting("practice", answered=True, days=10),
+            self.sitting("blank", quiz=exam, days=10),
+        ]
+        archived = self.sitting("exam", quiz=exam, answered=True, days=10)
+        fresh = self.sitting("fresh", answered=True)
+        duplicates = [self.sitting("twice"), self.sitting("twice", answered=True)]
+        duplicates.append(self.sitting("twice"))
+
+        report = compact_sittings(ttl=60 * 60 * 24 * 7, batch_size=1)
+        self.assertEqual(
+            report,
+            {"deleted": 2, "archived": 1, "merged": 2, "answers": 1, "questions": 16},
+        )
+        self.assertEqual(
+            sorted(Sitting.objects.values_list("pk", flat=True)),
+            [archived.pk, fresh.pk, duplicates[1].pk],
+        )
+        archived.refresh_from_db()
+        self.assertTrue(archived.complete)
+        self.assertEqual(archived.answers.count(), 1)
+        self.assertFalse(Sitting.objects.filter(pk__in=[s.pk for s in abandoned]))
+
+        out = io.StringIO()
+        call_command("compact_sittings", stdout=out)
+        self.assertIn("Deleted 0 stale sittings", out.getvalue())
+
+
+@override_settings(
+    STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+)
+class RescoreTestCase(QuizTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.question = self.questions[0]
+        self.right = self.question.choice_set.get(correct=True)
+        self.wrong = self.question.choice_set.get(correct=False)
+        self.sittings = []
+        for i in range(5):
+            user = User.objects.create_user(username=f"student{i}")
+            sitting = Sitting.objects.new_sitting(user, self.quiz, self.course)
+            choice = self.right if i % 2 else self.wrong
+            sitting.add_user_answer(self.question, str(choice.pk), choice.correct)
+            sitting.add_user_answer(self.questions[1], "0", True)
+            sitting.mark_quiz_complete()
+            QuizProgress.objects.add_score(user, self.quiz, sitting.current_score, 2)
+            self.sittings.append(sitting)
+
+    def fix_key(self):
+        # the wrong choice was the correct one all along
+        Choice.objects.filter(pk=self.wrong.pk).update(correct=True)
+        Choice.objects.filter(pk=self.right.pk).update(correct=False)
+
+    def scores(self):
+        return list(
+            Sitting.objects.filter(pk__in=[s.pk for s in self.sittings])
+            .order_by("pk")
+            .values_list("current_score", flat=True)
+        )
+
+    def progress(self):
+        return list(
+            QuizProgress.objects.filter(quiz=self.quiz)
+            .order_by("user_id")
+            .values_list("score", flat=True)
+        )
+
+    def test_rescore_question(self):
+        self.assertEqual(self.scores(), [1, 2, 1, 2, 1])
+        self.fix_key()
+        calls = []
+        stats = rescore_question(
+            self.question, batch_size=2, progress=lambda *args: calls.append(args)
+        )
+        self.assertEqual(stats, {"total": 5, "processed": 5, "changed": 5})
+        self.assertEqual(calls, [(2, 2, 5), (4, 4, 5), (5, 5, 5)])
+        self.assertEqual(self.scores(), [2, 1, 2, 1, 2])
+        self.assertEqual(self.progress(), [2, 1, 2, 1, 2])
+        self.assertEqual(
+            list(
+                SittingAnswer.objects.filter(question=self.question)
+                .order_by("sitting")
+                .values_list("correct", flat=True)
+            ),
+            [True, False, True, False, True],
+        )
+
+        # nothing left to change
+        with self.assertNumQueries(4):
+            stats = rescore_question(self.question, batch_size=10)
+        self.assertEqual(stats["changed"], 0)
+        self.assertEqual(self.scores(), [2, 1, 2, 1, 2])
+        self.assertEqual(self.progress(), [2, 1, 2, 1, 2])
+
+    def test_rescore_job(self):
+        celery_app.conf.CELERY_TASK_ALWAYS_EAGER = True
+        self.addCleanup(setattr, celery_app.conf, "CELERY_TASK_ALWAYS_EAGER", False)
+        lecturer = User.objects.create_user(username="lecturer", password="password")
+        User.objects.filter(pk=lecturer.pk).update(is_lecturer=True)
+        self.client.force_login(lecturer)
+        self.fix_key()
+        url = reverse("rescore_question", kwargs={"pk": self.question.pk})
+
+        # only the lecturers of the course may re-score its questions
+        response = self.client.post(url, HTTP_ACCEPT="application/json")
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(RescoreJob.objects.exists())
+
+        CourseAllocation.objects.create(lecturer=lecturer).courses.add(self.course)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, HTTP_ACCEPT="application/json")
+        self.assertEqual(response.status_code, 202)
+        data = self.client.get(response.json()["status_url"]).json()
+        self.assertEqual(data["status"], RescoreJob.DONE)
+        self.assertEqual((data["processed"], data["changed"]), (5, 5))
+        self.assertEqual(data["percent"], 100)
+        self.assertEqual(self.scores(), [2, 1, 2, 1, 2])
+        self.assertEqual(self.progress(), [2, 1, 2, 1, 2])
+
+        response = self.client.post(
+            reverse("rescore_question", kwargs={"pk": self.essay.pk})
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(
+    STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+)
+class SubmissionTestCase(QuizTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        self.answers = {
+            self.questions[0].pk: self.choice(self.questions[0], True),
+            self.questions[1].pk: self.choice(self.questions[1], False),
+            self.essay.pk: "Divide and conquer",
+        }
+
+    def test_submit_answers(self):
+        sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+        sitting.add_user_answer(self.questions[0], self.answers[self.questions[0].pk])
+        payload = get_quiz_payload(self.quiz)
+        stale = Sitting.objects.get(pk=sitting.pk)
+        with self.assertNumQueries(5):
+            answers = sitting.submit_answers(
+                {str(pk): guess for pk, guess in self.answers.items()}, payload
+            )
+        self.assertEqual(
+            [(a.position, a.answer, a.correct) for a in answers],
+            [
+                (1, self.answers[self.questions[1].pk], False),
+                (2, "", False),
+                (3, "Divide and conquer", False),
+            ],
+        )
+        sitting.refresh_from_db()
+        self.assertEqual(sitting.progress(), (4, 4))
+        self.assertEqual(sitting.current_score, 0)
+        # a second submission of the same state is refused
+        self.assertIs(stale.submit_answers(self.answers, payload), False)
+        self.assertEqual(sitting.answers.count(), 4)
+
+    def test_single_page(self):
+        self.quiz.single_page = True
+        self.quiz.save()
+        url = reverse(
+            "quiz_take", kwargs={"pk": self.course.pk, "slug": self.quiz.slug}
+        )
+        response = self.client.get(url)
+        self.assertTemplateUsed(response, "quiz_single_page.html")
+        self.assertEqual(len(response.context["form"].fields), 4)
+        self.assertContains(response, "Explain quicksort")
+
+        response = self.client.post(
+            url,
+            {f"question_{pk}": guess for pk, guess in self.answers.items()},
+        )
+        self.assertTemplateUsed(response, "result.html")
+        self.assertEqual(response.context["score"], 1)
+        self.assertEqual(response.context["max_score"], 4)
+        progress = QuizProgress.objects.get(user=self.user, quiz=self.quiz)
+        self.assertEqual((progress.score, progress.possible), (1, 4))
+
+    def test_api(self):
+        self.quiz.exam_paper = True
+        self.quiz.save()
+        url = reverse(
+            "quiz-api:sitting", kwargs={"pk": self.course.pk, "slug": self.quiz.slug}
+        )
+        data = self.client.get(url).json()
+        self.assertEqual((data["answered"], data["total"]), (0, 4))
+        self.assertEqual(
+            [(q["id"], q["type"]) for q in data["questions"]],
+            [(q.pk, "mc") for q in self.questions[:3]] + [(self.essay.pk, "essay")],
+        )
+        self.assertEqual(
+            [c["choice"] for c in data["questions"][0]["choices"]], ["Right", "Wrong"]
+        )
+        self.assertNotIn("correct", data["questions"][0]["choices"][0])
+
+        response = self.client.post(
+            url,
+            {"answers": {str(pk): guess for pk, guess in self.answers.items()}},
+            content_type="application/json",
+        )
+        data = response.json()
+        self.assertEqual(
+            (data["score"], data["max_score"], data["percent"]), (1, 4, 25)
+        )
+        self.assertFalse(data["passed"])
+        self.assertEqual(
+            [a["correct"] for a in data["answers"]], [True, False, False, False]
+        )
+        sitting = Sitting.objects.get(pk=data["sitting"])
+        self.assertTrue(sitting.complete)
+
+        self.quiz.single_attempt = True
+        self.quiz.save()
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_api_before_opening(self):
+        self.quiz.opens_at = timezone.now() + datetime.timedelta(hours=1)
+        self.quiz.save()
+        url = reverse(
+            "quiz-api:sitting", kwargs={"pk": self.course.pk, "slug": self.quiz.slug}
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 403)
+        self.assertIn("opens at", response.json()["detail"])
+        response = self.client.post(
+            url,
+            {"answers": {str(pk): guess for pk, guess in self.answers.items()}},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Sitting.objects.exists())
+
+    def test_api_rejects_bad_answers(self):
+        url = reverse(
+            "quiz-api:sitting", kwargs={"pk": self.course.pk, "slug": self.quiz.slug}
+        )
+        response = self.client.post(
+            url, {"answers": ["1"]}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class LeaderboardTestCase(QuizTestMixin, TestCase):
+    def result(self, username, correct, essay=None, quiz=None):
+        user, _ = User.objects.get_or_create(username=username)
+        sitting = Sitting.objects.new_sitting(user, quiz or self.quiz, self.course)
+        for question in self.questions[:correct]:
+            sitting.add_user_answer(question, "1", True)
+        if essay is not None:
+            sitting.add_user_answer(self.essay, essay)
+        sitting.mark_quiz_complete()
+        record_result(sitting)
+        return sitting
+
+    def buckets(self):
+        return dict(
+            LeaderboardBucket.objects.filter(quiz=self.quiz).values_list(
+                "percent", "count"
+            )
+        )
+
+    def test_best_results(self):
+        self.assertIsNone(get_standing(self.quiz, 50))
+        self.result("alice", 2)
+        self.result("bob", 3)
+        self.result("carol", 1)
+        # a worse attempt leaves the best one, a better one replaces it
+        self.result("alice", 1)
+        self.result("alice", 4)
+
+        self.assertEqual(
+            [(entry.user.username, entry.percent) for entry in top_entries(self.quiz)],
+            [("alice", 100), ("bob", 75), ("carol", 25)],
+        )
+        self.assertEqual(
+            [e.user.username for e in top_entries(self.quiz, 1)], ["alice"]
+        )
+        self.assertEqual(self.buckets(), {25: 1, 50: 0, 75: 1, 100: 1})
+        with self.assertNumQueries(1):
+            standing = get_standing(self.quiz, 75)
+        self.assertEqual(standing, {"rank": 2, "percentile": 50, "total": 3})
+        self.assertEqual(
+            get_standing(self.quiz, 60), {"rank": 3, "percentile": 33, "total": 3}
+        )
+
+    def test_lecturers_are_not_ranked(self):
+        lecturer = User.objects.create_user(username="lecturer")
+        User.objects.filter(pk=lecturer.pk).update(is_lecturer=True)
+        self.result("lecturer", 3)
+        self.assertEqual(top_entries(self.quiz), [])
+        self.assertEqual(self.buckets(), {})
+
+    def test_marking_moves_the_entry(self):
+        sitting = self.result("alice", 2, essay="Divide and conquer")
+        self.result("bob", 3)
+        answer = sitting.answers.get(question=self.essay)
+        mark_answers(self.quiz, {answer.pk: True})
+        self.assertEqual(
+            [(entry.user.username, entry.percent) for entry in top_entries(self.quiz)],
+            [("alice", 75), ("bob", 75)],
+        )
+        self.assertEqual(self.buckets(), {50: 0, 75: 2})
+
+        mark_answers(self.quiz, {answer.pk: False})
+        self.assertEqual(self.buckets(), {50: 1, 75: 1})
+
+    @override_settings(
+        STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+    )
+    def test_result_and_progress_pages(self):
+        self.essay.quiz.clear()
+        self.result("bob", 1)
+        self.client.force_login(self.user)
+        url = reverse(
+            "quiz_take", kwargs={"pk": self.course.pk, "slug": self.quiz.slug}
+        )
+        self.client.get(url)
+        for question in self.questions[:3]:
+            response = self.client.post(
+                url, {"answers": self.choice(question, question != self.questions[0])}
+            )
+        self.assertEqual(response.context["percent"], 67)
+        self.assertEqual(
+            response.context["standing"], {"rank": 1, "percentile": 75, "total": 2}
+        )
+        self.assertEqual(
+            [entry.user for entry in response.context["leaderboard"]][0], self.user
+        )
+
+        response = self.client.get(reverse("quiz_progress"))
+        [(entry, standing)] = response.context["rankings"]
+        self.assertEqual((entry.quiz, entry.percent), (self.quiz, 67))
+        self.assertEqual(standing["rank"], 1)
+
+    @override_settings(
+        STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+    )
+    def test_progress_page_queries(self):
+        self.client.force_login(self.user)
+        url = reverse("quiz_progress")
+        self.result("student", 2)
+        self.client.get(url)  # warms up what the first request caches
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(len(response.context["rankings"]), 1)
+
+        for i in range(3):
+            quiz = Quiz.objects.create(
+                course=self.course, title=f"Quiz {i}", category="practice"
+            )
+            quiz.question_set.add(*self.questions)
+            self.result("other", i, quiz=quiz)
+            self.result("student", i + 1, quiz=quiz)
+        # the ranks at all the quizzes come from one read of the buckets
+        with self.assertNumQueries(len(context.captured_queries)):
+            response = self.client.get(url)
+        self.assertEqual(
+            sorted(
+                (entry.percent, standing["rank"])
+                for entry, standing in response.context["rankings"]
+            ),
+            [(25, 1), (50, 1), (50, 1), (75, 1)],
+        )
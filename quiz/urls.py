@@ -11,7 +11,17 @@ urlpatterns = [
         view=QuizMarkingDetail.as_view(),
         name="quiz_marking_detail",
     ),
+    path("marking/<int:pk>/essays/", essay_marking, name="essay_marking"),
+    path("marking/<int:pk>/analysis/", item_analysis, name="item_analysis"),
     path("<int:pk>/<slug>/take/", view=QuizTake.as_view(), name="quiz_take"),
+    path(
+        "<int:pk>/questions/export/<str:format>/",
+        question_export,
+        name="question_export",
+    ),
+    path("<int:pk>/questions/import/", question_import, name="question_import"),
+    path("questions/<int:pk>/rescore/", rescore_question, name="rescore_question"),
+    path("rescore/<uuid:pk>/status/", rescore_job_status, name="rescore_job_status"),
     path("<slug>/quiz_add/", QuizCreateView.as_view(), name="quiz_create"),
     path("<slug>/<int:pk>/add/", QuizUpdateView.as_view(), name="quiz_update"),
     path("<slug>/<int:pk>/delete/", quiz_delete, name="quiz_delete"),
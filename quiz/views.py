@@ -1,7 +1,12 @@
 from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
 from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, render, redirect
+from django.urls import reverse
+from django.utils import timezone
 from django.utils.decorators import method_decorator
+from django.utils.formats import date_format
 from django.views.generic import (
     DetailView,
     ListView,
@@ -13,15 +18,41 @@ from django.views.generic import (
 )
 from django.contrib import messages
 from django.db import transaction
+from django.views.decorators.http import require_POST
 
 from accounts.decorators import lecturer_required
-from .models import Course, Progress, Sitting, EssayQuestion, Quiz, MCQuestion, Question
+from .models import (
+    Course,
+    Progress,
+    QuizProgress,
+    Sitting,
+    EssayQuestion,
+    Quiz,
+    MCQuestion,
+    Question,
+    RescoreJob,
+)
+from . import live, question_bank
+from .payload import get_quiz_payload
+from .analysis import get_item_analysis
+from .expiry import expire_sittings
+from .leaderboard import (
+    get_standing,
+    get_standings,
+    record_result,
+    refresh_results,
+    top_entries,
+)
+from .marking import essay_queue, mark_answers
+from .rescoring import enqueue_rescore, rescore_job_data
 from .forms import (
     QuizAddForm,
     MCQuestionForm,
     MCQuestionFormSet,
     QuestionForm,
     EssayForm,
+    QuizSubmissionForm,
+    QuestionImportForm,
 )
 
 
@@ -187,6 +218,13 @@ class QuizUserProgressView(TemplateView):
         context["cat_scores"] = progress.list_all_cat_scores
         context["exams"] = progress.show_exams()
         context["exams_counter"] = progress.show_exams().count()
+        entries = list(self.request.user.leaderboard_entries.select_related("quiz"))
+        context["rankings"] = list(
+            zip(
+                entries,
+                get_standings((entry.quiz, entry.percent) for entry in entries),
+            )
+        )
         return context
 
 
@@ -224,6 +262,9 @@ class QuizMarkingList(QuizMarkerMixin, SittingFilterTitleMixin, ListView):
 class QuizMarkingDetail(QuizMarkerMixin, DetailView):
     model = Sitting
 
+    def get_queryset(self):
+        return super().get_queryset().select_related("quiz", "user")
+
     def post(self, request, *args, **kwargs):
         sitting = self.get_object()
 
@@ -231,39 +272,177 @@ class QuizMarkingDetail(QuizMarkerMixin, DetailView):
         if q_to_toggle:
             q = Question.objects.get_subclass(id=int(q_to_toggle))
             if int(q_to_toggle) in sitting.get_incorrect_questions:
-                sitting.remove_incorrect_question(q)
+                delta = sitting.remove_incorrect_question(q)
             else:
-                sitting.add_incorrect_question(q)
+                delta = -sitting.add_incorrect_question(q)
+            if delta:
+                QuizProgress.objects.move_scores(
+                    {(sitting.user_id, sitting.quiz_id): delta}
+                )
+            refresh_results([sitting.pk])
 
         return self.get(request)
 
     def get_context_data(self, **kwargs):
         context = super(QuizMarkingDetail, self).get_context_data(**kwargs)
-        context["questions"] = context["sitting"].get_questions(with_answers=True)
+        sitting = context["sitting"]
+        context["questions"] = sitting.get_questions(
+            with_answers=True, payload=get_quiz_payload(sitting.quiz)
+        )
         return context
 
 
+def lecturer_quizzes(user):
+    """The quizzes of the courses allocated to ``user``, all for superusers."""
+    quizzes = Quiz.objects.all()
+    if not user.is_superuser:
+        quizzes = quizzes.filter(
+            course__allocated_course__lecturer__pk=user.id
+        ).distinct()
+    return quizzes
+
+
+@login_required
+@lecturer_required
+def essay_marking(request, pk):
+    """
+    The essay answers of a quiz waiting for marks, across all sittings,
+    with the marks of a whole page submitted at once.
+    """
+    quiz = get_object_or_404(lecturer_quizzes(request.user), pk=pk)
+
+    if request.method == "POST":
+        marks = {}
+        for key, value in request.POST.items():
+            answer_id = key.removeprefix("mark_")
+            if answer_id != key and answer_id.isdigit() and value in ("0", "1"):
+                marks[int(answer_id)] = value == "1"
+        marked = mark_answers(quiz, marks)
+        messages.success(request, f"Оценено ответов: {marked}.")
+        url = reverse("essay_marking", kwargs={"pk": quiz.pk})
+        return redirect(f"{url}?page={request.GET.get('page', 1)}")
+
+    paginator = Paginator(essay_queue(quiz), 50)
+    answers = paginator.get_page(request.GET.get("page"))
+    return render(
+        request,
+        "quiz/essay_marking.html",
+        {"title": quiz.title, "quiz": quiz, "answers": answers},
+    )
+
+
+@login_required
+@lecturer_required
+def item_analysis(request, pk):
+    """Difficulty and discrimination of the questions of a quiz."""
+    quiz = get_object_or_404(lecturer_quizzes(request.user), pk=pk)
+    analysis = get_item_analysis(quiz)
+    if "application/json" in request.headers.get("Accept", ""):
+        return JsonResponse(analysis)
+    return render(
+        request,
+        "quiz/item_analysis.html",
+        {"title": quiz.title, "quiz": quiz, "analysis": analysis},
+    )
+
+
+@login_required
+@lecturer_required
+def question_export(request, pk, format):
+    quiz = get_object_or_404(lecturer_quizzes(request.user), pk=pk)
+    if format not in question_bank.FORMATS:
+        raise Http404
+    response = HttpResponse(
+        question_bank.export_questions(quiz, format),
+        content_type=f"{question_bank.CONTENT_TYPES[format]}; charset=utf-8",
+    )
+    filename = f"{quiz.slug or quiz.pk}.{'txt' if format == 'gift' else format}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+@login_required
+@lecturer_required
+def question_import(request, pk):
+    """Add the questions of a JSON, CSV or GIFT file to a quiz at once."""
+    quiz = get_object_or_404(lecturer_quizzes(request.user), pk=pk)
+    if request.method == "POST":
+        form = QuestionImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            added = question_bank.import_questions(
+                quiz, form.cleaned_data["questions"]
+            )
+            messages.success(request, f"Добавлено вопросов: {added}.")
+            return redirect("quiz_index", quiz.course.slug)
+    else:
+        form = QuestionImportForm()
+    return render(
+        request,
+        "quiz/question_import.html",
+        {"title": quiz.title, "quiz": quiz, "form": form},
+    )
+
+
+@login_required
+@lecturer_required
+@require_POST
+def rescore_question(request, pk):
+    """
+    Queue the re-scoring of every answer to a multiple choice question,
+    after its correct choices were fixed.
+    """
+    question = get_object_or_404(
+        MCQuestion.objects.filter(quiz__in=lecturer_quizzes(request.user)).distinct(),
+        pk=pk,
+    )
+    job = enqueue_rescore(question, request.user)
+    if "application/json" in request.headers.get("Accept", ""):
+        return JsonResponse(rescore_job_data(job), status=202)
+    messages.success(request, f"Пересчет результатов по вопросу «{question}» запущен.")
+    return redirect("quiz_marking")
+
+
+@login_required
+@lecturer_required
+def rescore_job_status(request, pk):
+    job = get_object_or_404(RescoreJob, pk=pk)
+    if job.created_by_id != request.user.id and not request.user.is_superuser:
+        raise Http404
+    return JsonResponse(rescore_job_data(job))
+
+
 # @method_decorator([login_required, student_required], name='dispatch')
 @method_decorator([login_required], name="dispatch")
 class QuizTake(FormView):
     form_class = QuestionForm
     template_name = "question.html"
     result_template_name = "result.html"
+    single_page_template_name = "quiz_single_page.html"
     # single_complete_template_name = 'single_complete.html'
 
     def dispatch(self, request, *args, **kwargs):
         self.quiz = get_object_or_404(Quiz, slug=self.kwargs["slug"])
         self.course = get_object_or_404(Course, pk=self.kwargs["pk"])
-        quizQuestions = Question.objects.filter(quiz=self.quiz).count()
-        course = get_object_or_404(Course, pk=self.kwargs["pk"])
+        self.payload = get_quiz_payload(self.quiz)
 
-        if quizQuestions <= 0:
+        if not self.payload:
             messages.warning(request, f"Набор вопросов в тесте пуст. попробуйте позже!")
             return redirect("quiz_index", self.course.slug)
 
         if self.quiz.draft and not request.user.has_perm("quiz.change_quiz"):
             raise PermissionDenied
 
+        if (
+            self.quiz.opens_at
+            and self.quiz.opens_at > timezone.now()
+            and not (request.user.is_superuser or request.user.is_lecturer)
+        ):
+            opens_at = timezone.localtime(self.quiz.opens_at)
+            messages.info(
+                request, f"Тест откроется {date_format(opens_at, 'DATETIME_FORMAT')}."
+            )
+            return redirect("quiz_index", self.course.slug)
+
         self.sitting = Sitting.objects.user_sitting(
             request.user, self.quiz, self.course
         )
@@ -276,27 +455,59 @@ class QuizTake(FormView):
             )
             return redirect("quiz_index", self.course.slug)
 
+        if self.sitting.is_expired():
+            # the scheduler may not have reached it yet
+            expire_sittings([self.sitting.pk])
+            if self.quiz.single_page:
+                # the answers of a single page quiz were all in this request
+                messages.warning(
+                    request,
+                    f"Время на тест истекло, ответы после окончания времени не принимаются.",
+                )
+            else:
+                messages.info(request, f"Время на тест истекло, ваши ответы сохранены.")
+            return redirect("quiz_index", self.course.slug)
+
+        self.live = live.live_enabled() and not self.quiz.single_page
+        if self.live:
+            live.restore_sitting(self.sitting)
+
         return super(QuizTake, self).dispatch(request, *args, **kwargs)
 
+    def get_template_names(self):
+        if self.quiz.single_page:
+            return [self.single_page_template_name]
+        return super(QuizTake, self).get_template_names()
+
     def get_form(self, *args, **kwargs):
-        self.question = self.sitting.get_first_question()
         self.progress = self.sitting.progress()
 
+        if self.quiz.single_page:
+            self.questions = self.sitting.get_questions(payload=self.payload)[
+                self.sitting.current_position :
+            ]
+            return QuizSubmissionForm(self.questions, **self.get_form_kwargs())
+
+        self.question = self.sitting.get_first_question(self.payload)
+
         if self.question.__class__ is EssayQuestion:
             form_class = EssayForm
         else:
             form_class = self.form_class
 
-        return form_class(**self.get_form_kwargs())
+        return form_class(question=self.question, **self.get_form_kwargs())
 
     def get_form_kwargs(self):
         kwargs = super(QuizTake, self).get_form_kwargs()
 
-        return dict(kwargs, question=self.question)
+        return dict(kwargs, seed=self.sitting.seed)
 
     def form_valid(self, form):
+        if self.quiz.single_page:
+            return self.form_valid_submission(form)
+
         self.form_valid_user(form)
-        if self.sitting.get_first_question() is False:
+        if self.sitting.get_first_question(self.payload) is False:
             return self.final_result_user()
 
         self.request.POST = {}
@@ -305,9 +516,10 @@ class QuizTake(FormView):
 
     def get_context_data(self, **kwargs):
         context = super(QuizTake, self).get_context_data(**kwargs)
-        context["question"] = self.question
+        context["question"] = getattr(self, "question", None)
         context["quiz"] = self.quiz
-        context["course"] = get_object_or_404(Course, pk=self.kwargs["pk"])
+        context["course"] = self.course
+        context["deadline"] = self.sitting.deadline
         context["figure"] = "figure"
         if hasattr(self, "previous"):
             context["previous"] = self.previous
@@ -316,54 +528,78 @@ class QuizTake(FormView):
         return context
 
     def form_valid_user(self, form):
-        progress, _ = Progress.objects.get_or_create(user=self.request.user)
         guess = form.cleaned_data["answers"]
         is_correct = self.question.check_if_correct(guess)
 
-        if is_correct is True:
-            self.sitting.add_to_score(1)
-            progress.update_score(self.question, 1, 1)
-        else:
-            self.sitting.add_incorrect_question(self.question)
-            progress.update_score(self.question, 0, 1)
-
         if self.quiz.answers_at_end is not True:
             self.previous = {
                 "previous_answer": guess,
                 "previous_outcome": is_correct,
                 "previous_question": self.question,
-                "answers": self.question.get_choices(),
+                "answers": self.question.get_choices(self.sitting.seed),
                 "question_type": {self.question.__class__.__name__: True},
             }
         else:
             self.previous = {}
 
-        self.sitting.add_user_answer(self.question, guess)
-        self.sitting.remove_first_question()
+        if self.live:
+            live.record_answer(self.sitting, self.question, guess, is_correct is True)
+        elif self.sitting.add_user_answer(self.question, guess, is_correct is True):
+            # a duplicate answer, from a resubmitted form or another tab, is
+            # not counted again
+            QuizProgress.objects.add_score(
+                self.request.user, self.quiz, int(is_correct is True), 1
+            )
+
+    def form_valid_submission(self, form):
+        answers = self.sitting.submit_answers(form.get_answers(), self.payload)
+        if answers is False:
+            messages.info(self.request, f"Ваши ответы уже были отправлены.")
+            return redirect("quiz_index", self.course.slug)
+
+        QuizProgress.objects.add_score(
+            self.request.user,
+            self.quiz,
+            sum(answer.correct for answer in answers),
+            len(answers),
+        )
+        self.previous = {}
+        return self.final_result_user()
 
     def final_result_user(self):
         results = {
-            "course": get_object_or_404(Course, pk=self.kwargs["pk"]),
+            "course": self.course,
             "quiz": self.quiz,
             "score": self.sitting.get_current_score,
             "max_score": self.sitting.get_max_score,
             "percent": self.sitting.get_percent_correct,
             "sitting": self.sitting,
             "previous": self.previous,
-            "course": get_object_or_404(Course, pk=self.kwargs["pk"]),
         }
 
-        self.sitting.mark_quiz_complete()
+        if self.live:
+            # the progress of the whole sitting, in one write
+            live.complete_sitting(self.sitting)
+            QuizProgress.objects.add_score(
+                self.request.user,
+                self.quiz,
+                self.sitting.current_score,
+                self.sitting.current_position,
+            )
+        else:
+            self.sitting.mark_quiz_complete()
+        self.sitting.user = self.request.user
+        record_result(self.sitting)
+        results["leaderboard"] = top_entries(self.quiz)
+        results["standing"] = get_standing(self.quiz, results["percent"])
 
         if self.quiz.answers_at_end:
-            results["questions"] = self.sitting.get_questions(with_answers=True)
+            results["questions"] = self.sitting.get_questions(
+                with_answers=True, payload=self.payload
+            )
             results["incorrect_questions"] = self.sitting.get_incorrect_questions
 
-        if (
-            self.quiz.exam_paper is False
-            or self.request.user.is_superuser
-            or self.request.user.is_lecturer
-        ):
+        if not self.sitting.is_kept_for(self.request.user):
             self.sitting.delete()
 
         return render(self.request, self.result_template_name, results)
@@ -1,7 +1,14 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.auth.models import Group
 
-from .models import TakenCourse, Result
+from .models import (
+    TakenCourse,
+    Result,
+    GradingScale,
+    GradeBoundary,
+    CourseStatistics,
+)
+from .utils import regrade_taken_courses
 
 
 class ScoreAdmin(admin.ModelAdmin):
@@ -19,5 +26,47 @@ class ScoreAdmin(admin.ModelAdmin):
     ]
 
 
+class GradeBoundaryInline(admin.TabularInline):
+    model = GradeBoundary
+
+
+class GradingScaleAdmin(admin.ModelAdmin):
+    list_display = ["title", "program", "level"]
+    inlines = [GradeBoundaryInline]
+    actions = ["regrade"]
+
+    @admin.action(description="Re-apply selected scales to taken courses")
+    def regrade(self, request, queryset):
+        taken_courses = TakenCourse.objects.all()
+        if not queryset.filter(program=None, level=None).exists():
+            scopes = TakenCourse.objects.none()
+            for scale in queryset:
+                scope = taken_courses
+                if scale.program_id:
+                    scope = scope.filter(course__program_id=scale.program_id)
+                if scale.level:
+                    scope = scope.filter(course__level=scale.level)
+                scopes = scopes | scope
+            taken_courses = scopes
+        students = regrade_taken_courses(taken_courses)
+        messages.success(request, f"Regraded courses of {len(students)} students.")
+
+
+class CourseStatisticsAdmin(admin.ModelAdmin):
+    list_display = [
+        "course",
+        "students",
+        "mean",
+        "median",
+        "stddev",
+        "passed",
+        "failed",
+        "updated_at",
+    ]
+    list_select_related = ["course"]
+
+
 admin.site.register(TakenCourse, ScoreAdmin)
 admin.site.register(Result)
+admin.site.register(GradingScale, GradingScaleAdmin)
+admin.site.register(CourseStatistics, CourseStatisticsAdmin)
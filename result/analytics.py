@@ -0,0 +1,137 @@
+from statistics import median
+
+from django.db import transaction
+from django.db.models import Avg, Count, Q, StdDev
+from django.utils import timezone
+
+from .models import TakenCourse, CourseStatistics, GRADE, PASS, FAIL
+
+STATISTICS_FIELDS = (
+    "students",
+    "mean",
+    "median",
+    "stddev",
+    "passed",
+    "failed",
+    "histogram",
+)
+
+EMPTY_STATISTICS = {
+    "students": 0,
+    "mean": 0,
+    "median": 0,
+    "stddev": 0,
+    "passed": 0,
+    "failed": 0,
+    "histogram": {},
+}
+
+
+def compute_course_statistics(taken_courses):
+    """
+    Aggregate a TakenCourse queryset per course.
+
+    Count, mean, standard deviation, pass/fail counts and the grade
+    histogram are computed by the database; the median needs the totals,
+    which are read as a single ordered column. Returns ``{course_id:
+    {field: value}}`` for the fields of CourseStatistics.
+    """
+    taken_courses = taken_courses.order_by()
+    stats = {
+        row["course"]: {
+            "students": row["students"],
+            "mean": round(float(row["mean"] or 0), 2),
+            "stddev": round(float(row["stddev"] or 0), 2),
+            "passed": row["passed"],
+            "failed": row["failed"],
+            "median": 0,
+            "histogram": {},
+        }
+        for row in taken_courses.values("course").annotate(
+            students=Count("id"),
+            mean=Avg("total"),
+            stddev=StdDev("total"),
+            passed=Count("id", filter=Q(comment=PASS)),
+            failed=Count("id", filter=Q(comment=FAIL)),
+        )
+    }
+    grade_order = {grade: index for index, (grade, label) in enumerate(GRADE)}
+    for row in (
+        taken_courses.exclude(grade="")
+        .values("course", "grade")
+        .annotate(count=Count("id"))
+    ):
+        stats[row["course"]]["histogram"][row["grade"]] = row["count"]
+    for course_stats in stats.values():
+        course_stats["histogram"] = dict(
+            sorted(
+                course_stats["histogram"].items(),
+                key=lambda item: grade_order.get(item[0], len(grade_order)),
+            )
+        )
+
+    totals = {}
+    for course_id, total in taken_courses.order_by("course", "total").values_list(
+        "course", "total"
+    ):
+        totals.setdefault(course_id, []).append(float(total))
+    for course_id, values in totals.items():
+        stats[course_id]["median"] = round(median(values), 2)
+    return stats
+
+
+def refresh_course_statistics(course_ids, create=True):
+    """
+    Recompute the CourseStatistics rows of ``course_ids``, creating the
+    missing ones unless ``create`` is False.
+    """
+    course_ids = set(course_ids)
+    if not course_ids:
+        return
+    stats = compute_course_statistics(
+        TakenCourse.objects.filter(course_id__in=course_ids)
+    )
+    with transaction.atomic():
+        existing = {
+            obj.course_id: obj
+            for obj in CourseStatistics.objects.select_for_update().filter(
+                course_id__in=course_ids
+            )
+        }
+        to_update, to_create = [], []
+        now = timezone.now()
+        for course_id in course_ids:
+            values = {**EMPTY_STATISTICS, **stats.get(course_id, {})}
+            obj = existing.get(course_id)
+            if obj is None:
+                if create:
+                    to_create.append(CourseStatistics(course_id=course_id, **values))
+                continue
+            for field in STATISTICS_FIELDS:
+                setattr(obj, field, values[field])
+            # bulk_update does not set auto_now fields
+            obj.updated_at = now
+            to_update.append(obj)
+        CourseStatistics.objects.bulk_update(
+            to_update, STATISTICS_FIELDS + ("updated_at",)
+        )
+        CourseStatistics.objects.bulk_create(to_create)
+
+
+def statistics_data(obj):
+    course = obj.course
+    return {
+        "course": course.pk,
+        "code": course.code,
+        "title": course.title,
+        "semester": course.semester,
+        "level": course.level,
+        "students": obj.students,
+        "mean": obj.mean,
+        "median": obj.median,
+        "stddev": obj.stddev,
+        "passed": obj.passed,
+        "failed": obj.failed,
+        "histogram": obj.histogram,
+        "updated_at": obj.updated_at,
+    }
@@ -0,0 +1,46 @@
+import django_filters
+from django.db.models import Exists, OuterRef
+
+from ..models import TakenCourse, Result
+
+
+class TakenCourseFilter(django_filters.FilterSet):
+    semester = django_filters.CharFilter(field_name="course__semester")
+    level = django_filters.CharFilter(field_name="course__level")
+    program = django_filters.NumberFilter(field_name="course__program")
+    course_code = django_filters.CharFilter(
+        field_name="course__code", lookup_expr="iexact"
+    )
+    updated_since = django_filters.IsoDateTimeFilter(
+        field_name="updated_at", lookup_expr="gte"
+    )
+    session = django_filters.CharFilter(method="filter_session")
+
+    class Meta:
+        model = TakenCourse
+        fields = ["student", "course"]
+
+    def filter_session(self, queryset, name, value):
+        # a taken course has no session of its own, it belongs to the
+        # sessions in which its student has results at its semester and level
+        return queryset.filter(
+            Exists(
+                Result.objects.filter(
+                    student=OuterRef("student"),
+                    session=value,
+                    semester=OuterRef("course__semester"),
+                    level=OuterRef("course__level"),
+                )
+            )
+        )
+
+
+class ResultFilter(django_filters.FilterSet):
+    program = django_filters.NumberFilter(field_name="student__program")
+    updated_since = django_filters.IsoDateTimeFilter(
+        field_name="updated_at", lookup_expr="gte"
+    )
+
+    class Meta:
+        model = Result
+        fields = ["student", "session", "semester", "level"]
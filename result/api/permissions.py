@@ -0,0 +1,8 @@
+from rest_framework.permissions import BasePermission
+
+
+class IsSuperuser(BasePermission):
+    """Only superusers may read every student's scores and results."""
+
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_superuser)
@@ -0,0 +1,73 @@
+from rest_framework import serializers
+
+from ..models import TakenCourse, Result
+
+
+class SparseFieldsMixin:
+    """
+    Limit the serialized fields to the comma separated ``fields`` query
+    parameter, e.g. ``?fields=id,total,grade``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        fields = request.query_params.get("fields") if request else None
+        if fields:
+            wanted = set(fields.split(","))
+            for name in set(self.fields) - wanted:
+                self.fields.pop(name)
+
+
+class TakenCourseSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    # related values come from the select_related() of the view
+    username = serializers.CharField(source="student.student.username")
+    course_code = serializers.CharField(source="course.code")
+    semester = serializers.CharField(source="course.semester")
+    level = serializers.CharField(source="course.level")
+    program = serializers.IntegerField(source="course.program_id")
+
+    class Meta:
+        model = TakenCourse
+        fields = [
+            "id",
+            "student",
+            "username",
+            "course",
+            "course_code",
+            "semester",
+            "level",
+            "program",
+            "assignment",
+            "mid_exam",
+            "quiz",
+            "attendance",
+            "final_exam",
+            "total",
+            "grade",
+            "point",
+            "comment",
+            "updated_at",
+        ]
+
+
+class ResultSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    username = serializers.CharField(source="student.student.username")
+
+    class Meta:
+        model = Result
+        fields = [
+            "id",
+            "student",
+            "username",
+            "session",
+            "semester",
+            "level",
+            "gpa",
+            "cgpa",
+            "points",
+            "credits",
+            "level_points",
+            "level_credits",
+            "updated_at",
+        ]
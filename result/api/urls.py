@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+app_name = "result-api"
+
+urlpatterns = [
+    path(
+        "taken-courses/", views.TakenCourseListAPIView.as_view(), name="taken-courses"
+    ),
+    path("results/", views.ResultListAPIView.as_view(), name="results"),
+]
@@ -0,0 +1,69 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.http import http_date, parse_etags, quote_etag
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import generics, status
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+from ..models import TakenCourse, Result
+from .filters import TakenCourseFilter, ResultFilter
+from .permissions import IsSuperuser
+from .serializers import TakenCourseSerializer, ResultSerializer
+
+
+class IdCursorPagination(CursorPagination):
+    # ids never change, so a sync can page through while rows are updated
+    ordering = "id"
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+
+class ConditionalListMixin:
+    """
+    Answer list requests with an ETag and Last-Modified derived from the
+    filtered rows' latest ``updated_at`` and count, and with 304 Not
+    Modified when the client already has that version. The rows are only
+    fetched and serialized when something changed.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        state = queryset.order_by().aggregate(
+            last_modified=Max("updated_at"), count=Count("id")
+        )
+        etag = quote_etag(
+            hashlib.md5(
+                "{0}|{1}|{2}".format(
+                    request.get_full_path(), state["last_modified"], state["count"]
+                ).encode()
+            ).hexdigest()
+        )
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = super().list(request, *args, **kwargs)
+        response["ETag"] = etag
+        if state["last_modified"]:
+            response["Last-Modified"] = http_date(state["last_modified"].timestamp())
+        return response
+
+
+class TakenCourseListAPIView(ConditionalListMixin, generics.ListAPIView):
+    serializer_class = TakenCourseSerializer
+    permission_classes = [IsSuperuser]
+    pagination_class = IdCursorPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = TakenCourseFilter
+    queryset = TakenCourse.objects.select_related("student__student", "course")
+
+
+class ResultListAPIView(ConditionalListMixin, generics.ListAPIView):
+    serializer_class = ResultSerializer
+    permission_classes = [IsSuperuser]
+    pagination_class = IdCursorPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = ResultFilter
+    queryset = Result.objects.select_related("student__student")
@@ -3,3 +3,21 @@ from django.apps import AppConfig
 
 class ResultConfig(AppConfig):
     name = "result"
+
+    def ready(self) -> None:
+        from django.db.models.signals import post_save, post_delete, pre_save
+        from course.models import Course
+        from .models import TakenCourse
+        from .signals import (
+            taken_course_post_save_receiver,
+            taken_course_post_delete_receiver,
+            course_pre_save_receiver,
+            course_post_save_receiver,
+        )
+
+        post_save.connect(taken_course_post_save_receiver, sender=TakenCourse)
+        post_delete.connect(taken_course_post_delete_receiver, sender=TakenCourse)
+        pre_save.connect(course_pre_save_receiver, sender=Course)
+        post_save.connect(course_post_save_receiver, sender=Course)
+
+        return super().ready()
@@ -0,0 +1,229 @@
+"""
+Benchmarks of the grading and result pipeline.
+
+``run_benchmark`` builds a cohort of students for each size, drives the
+score entry, result and PDF views through the test client and records the
+wall time and number of queries of every scenario. Run it with
+``manage.py benchmark_results``, which uses a throwaway test database.
+"""
+import random
+import statistics
+import time
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User, Student
+from core.models import Session, Semester, DocumentJob
+from course.models import Program, Course, CourseAllocation
+from .models import TakenCourse, FIRST, SECOND
+from .utils import SCORE_FIELDS, apply_result_deltas, record_scores
+
+SCENARIOS = (
+    "add_score_for",
+    "grade_result",
+    "assessment_result",
+    "result_sheet_pdf_view",
+    "course_registration_form",
+)
+
+# scenarios queueing a DocumentJob, their report includes the job status
+DOCUMENT_SCENARIOS = ("result_sheet_pdf_view", "course_registration_form")
+
+
+def build_cohort(size, courses_per_semester=5, seed=0):
+    """
+    Create a program with ``courses_per_semester`` courses in each of the
+    first and second semester, a lecturer teaching them and ``size``
+    students registered for all of them, with scores recorded.
+    """
+    rng = random.Random(seed)
+    session = Session.objects.filter(is_current_session=True).first()
+    if session is None:
+        session = Session.objects.create(session="Benchmark", is_current_session=True)
+    # the score sheet view needs a current semester
+    if not Semester.objects.filter(is_current_semester=True).exists():
+        Semester.objects.create(
+            semester=FIRST, is_current_semester=True, session=session
+        )
+
+    prefix = f"bench{size}"
+    program = Program.objects.create(title=f"Benchmark {size}")
+    lecturer = User.objects.create_user(username=f"{prefix}-lecturer", password="x")
+    # set directly, saving new lecturers and students sends emails
+    User.objects.filter(pk=lecturer.pk).update(is_lecturer=True)
+    courses = [
+        Course.objects.create(
+            title=f"{prefix} {course_semester} {i}",
+            code=f"{prefix}-{course_semester[0]}{i}",
+            credit=rng.randint(2, 4),
+            program=program,
+            semester=course_semester,
+        )
+        for course_semester in (FIRST, SECOND)
+        for i in range(courses_per_semester)
+    ]
+    allocation = CourseAllocation.objects.create(lecturer=lecturer, session=session)
+    allocation.courses.add(*courses)
+
+    users = User.objects.bulk_create(
+        User(
+            username=f"{prefix}-student{i:05d}",
+            first_name="Student",
+            last_name=str(i),
+            is_student=True,
+        )
+        for i in range(size)
+    )
+    students = Student.objects.bulk_create(
+        Student(student=user, program=program) for user in users
+    )
+    TakenCourse.objects.bulk_create(
+        TakenCourse(student=student, course=course)
+        for student in students
+        for course in courses
+    )
+    apply_result_deltas(
+        {
+            (student.pk, course_semester, courses[0].level): (
+                0,
+                sum(c.credit for c in courses if c.semester == course_semester),
+            )
+            for student in students
+            for course_semester in (FIRST, SECOND)
+        },
+        session=session,
+    )
+    for course in courses:
+        record_scores(
+            course,
+            {
+                pk: {field: rng.randint(0, 20) for field in SCORE_FIELDS}
+                for pk in course.taken_courses.values_list("pk", flat=True)
+            },
+            session,
+        )
+    return {
+        "lecturer": lecturer,
+        "student": users[0],
+        "course": courses[0],
+        "taken_courses": list(courses[0].taken_courses.values_list("pk", flat=True)),
+        "rng": rng,
+    }
+
+
+def get_scenarios(cohort):
+    """Return ``{name: (user, callable(client) -> response)}``."""
+    course = cohort["course"]
+    rng = cohort["rng"]
+
+    def add_score_for(client):
+        data = {
+            str(pk): [str(rng.randint(0, 20)) for field in SCORE_FIELDS]
+            for pk in cohort["taken_courses"]
+        }
+        return client.post(reverse("add_score_for", kwargs={"id": course.pk}), data)
+
+    def get(url):
+        return lambda client: client.get(url)
+
+    return {
+        "add_score_for": (cohort["lecturer"], add_score_for),
+        "grade_result": (cohort["student"], get(reverse("grade_results"))),
+        "assessment_result": (cohort["student"], get(reverse("ass_results"))),
+        "result_sheet_pdf_view": (
+            cohort["lecturer"],
+            get(reverse("result_sheet_pdf_view", kwargs={"id": course.pk})),
+        ),
+        "course_registration_form": (
+            cohort["student"],
+            get(reverse("course_registration_form")),
+        ),
+    }
+
+
+def measure(client, func, repeat):
+    """Run ``func`` ``repeat`` times with a cold cache."""
+    timings, queries = [], []
+    for _ in range(repeat):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = func(client)
+            timings.append(time.perf_counter() - started)
+        queries.append(len(context.captured_queries))
+    return response, timings, queries
+
+
+def run_benchmark(sizes, repeat=3, scenarios=SCENARIOS, courses_per_semester=5):
+    results = []
+    for size in sizes:
+        cohort = build_cohort(size, courses_per_semester=courses_per_semester)
+        for name, (user, func) in get_scenarios(cohort).items():
+            if name not in scenarios:
+                continue
+            client = Client()
+            client.force_login(user)
+            response, timings, queries = measure(client, func, repeat)
+            entry = {
+                "scenario": name,
+                "size": size,
+                "status": response.status_code,
+                "queries": max(queries),
+                "seconds": {
+                    "min": round(min(timings), 6),
+                    "median": round(statistics.median(timings), 6),
+                    "max": round(max(timings), 6),
+                },
+            }
+            entry["error"] = None
+            if response.status_code >= 400:
+                entry["error"] = f"HTTP {response.status_code}"
+            if name in DOCUMENT_SCENARIOS:
+                job = DocumentJob.objects.filter(created_by=user).first()
+                entry["job"] = job.status if job else None
+                if job and job.status == DocumentJob.FAILED:
+                    # the timing of a document that failed to render means nothing
+                    entry["error"] = (
+                        "job failed: " + (job.error.splitlines() or [""])[-1]
+                    )
+            results.append(entry)
+    return {
+        "generated_at": timezone.now().isoformat(),
+        "database": connection.vendor,
+        "repeat": repeat,
+        "courses_per_semester": courses_per_semester,
+        "results": results,
+    }
+
+
+def compare_reports(baseline, report, time_tolerance=0.25):
+    """
+    List the regressions of ``report`` against ``baseline``: any scenario
+    that failed, any increase in queries, or a median time more than
+    ``time_tolerance`` slower.
+    """
+    previous = {
+        (entry["scenario"], entry["size"]): entry for entry in baseline["results"]
+    }
+    regressions = []
+    for entry in report["results"]:
+        name = "{scenario} ({size} students)".format(**entry)
+        if entry.get("error"):
+            regressions.append(f"{name}: {entry['error']}")
+            continue
+        old = previous.get((entry["scenario"], entry["size"]))
+        if old is None or old.get("error"):
+            continue
+        if entry["queries"] > old["queries"]:
+            regressions.append(
+                f"{name}: {entry['queries']} queries, was {old['queries']}"
+            )
+        median, old_median = entry["seconds"]["median"], old["seconds"]["median"]
+        if median > old_median * (1 + time_tolerance):
+            regressions.append(f"{name}: {median:.3f}s, was {old_median:.3f}s")
+    return regressions
@@ -0,0 +1,121 @@
+import io
+import multiprocessing
+import time
+import zipfile
+
+import django
+from django.db import connections
+
+from accounts.models import User
+from core.models import Semester
+from course.models import Course, CourseAllocation
+from .pdf import (
+    render_registration_form,
+    render_result_sheet,
+    result_sheet_filename,
+)
+
+RESULT_SHEETS = "result_sheets"
+REGISTRATION_FORMS = "registration_forms"
+
+EXPORTS = (RESULT_SHEETS, REGISTRATION_FORMS)
+
+
+def export_documents(kind, output, session, semester, processes=None):
+    """
+    Render every result sheet or registration form of ``semester`` in
+    ``session`` and write them into a ZIP archive at ``output`` (a path or
+    a writable file object).
+
+    The documents are rendered by a pool of ``processes`` workers (one per
+    core by default, 1 renders in this process) and written to the archive
+    as they complete. Returns ``{"documents", "bytes", "seconds"}``.
+    """
+    if kind == RESULT_SHEETS:
+        render, tasks = render_result_sheet_task, result_sheet_tasks(session, semester)
+    elif kind == REGISTRATION_FORMS:
+        render, tasks = render_registration_form_task, registration_form_tasks(
+            session, semester
+        )
+    else:
+        raise ValueError(f"Unknown export '{kind}', expected one of {EXPORTS}.")
+
+    started = time.perf_counter()
+    stats = {"documents": 0, "bytes": 0}
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as archive:
+        for filename, content in map_documents(render, tasks, processes):
+            archive.writestr(filename, content)
+            stats["documents"] += 1
+            stats["bytes"] += len(content)
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+def semester_archive_document(export, semester_id):
+    """The DocumentJob renderer of the ``export`` of ``semester_id``, a ZIP."""
+    semester = Semester.objects.select_related("session").get(pk=semester_id)
+    output = io.BytesIO()
+    # a daemonic process, such as a worker of celery's prefork pool, cannot
+    # start a pool of its own
+    processes = 1 if multiprocessing.current_process().daemon else None
+    export_documents(export, output, semester.session, semester, processes=processes)
+    return output.getvalue()
+
+
+def map_documents(render, tasks, processes=None):
+    if processes == 1 or len(tasks) <= 1:
+        yield from map(render, tasks)
+        return
+    # the workers open their own connections, they must not share ours
+    connections.close_all()
+    with multiprocessing.Pool(processes, initializer=django.setup) as pool:
+        yield from pool.imap_unordered(render, tasks)
+
+
+def result_sheet_tasks(session, semester):
+    courses = list(
+        Course.objects.filter(semester=str(semester), taken_courses__isnull=False)
+        .distinct()
+        .order_by("code")
+        .values_list("pk", flat=True)
+    )
+    # the latest allocation of a course names its lecturer
+    lecturers = dict(
+        CourseAllocation.objects.filter(courses__in=courses)
+        .order_by("pk")
+        .values_list("courses", "lecturer")
+    )
+    names = {
+        user.pk: user.get_full_name
+        for user in User.objects.filter(pk__in=lecturers.values())
+    }
+    return [
+        (pk, names.get(lecturers.get(pk), ""), str(semester), str(session))
+        for pk in courses
+    ]
+
+
+def registration_form_tasks(session, semester):
+    users = User.objects.filter(
+        student__takencourse__course__semester=str(semester)
+    ).distinct()
+    return [
+        (pk, str(session))
+        for pk in users.order_by("username").values_list("pk", flat=True)
+    ]
+
+
+def render_result_sheet_task(task):
+    course_id, lecturer_name, semester, session = task
+    course = Course.objects.get(pk=course_id)
+    return (
+        result_sheet_filename(course, semester, session),
+        render_result_sheet(course, lecturer_name, semester, session),
+    )
+
+
+def render_registration_form_task(task):
+    user_id, session = task
+    user = User.objects.get(pk=user_id)
+    filename = (user.username + ".pdf").replace("/", "-")
+    return filename, render_registration_form(user, session)
@@ -0,0 +1,113 @@
+from bisect import bisect_right
+
+from django.conf import settings
+from django.core.cache import cache
+
+GRADE_SCALES_CACHE_KEY = "result:grade-scales"
+
+
+class GradeScale:
+    """
+    A compiled grading scale.
+
+    ``boundaries`` is an iterable of ``(min_total, grade, point)``. A total is
+    mapped to its grade with a binary search over the sorted thresholds, and
+    ``grade_many`` grades a whole column of totals in one sorted pass over
+    the thresholds, without walking an if/elif ladder per row.
+    """
+
+    def __init__(self, boundaries, fail_grade="F", no_grade="NG"):
+        boundaries = sorted(boundaries, key=lambda b: float(b[0]))
+        self.thresholds = [float(b[0]) for b in boundaries]
+        self.grades = [b[1] for b in boundaries]
+        self.points = {b[1]: float(b[2]) for b in boundaries}
+        self.fail_grade = fail_grade
+        self.no_grade = no_grade
+
+    def grade(self, total):
+        if total is None:
+            return self.no_grade
+        index = bisect_right(self.thresholds, float(total))
+        if index == 0:
+            return self.fail_grade
+        return self.grades[index - 1]
+
+    def point(self, grade):
+        return self.points.get(grade, 0)
+
+    def grade_many(self, totals):
+        """
+        Return ``(grades, points)`` for a sequence of totals. The totals are
+        sorted once and walked up the thresholds together, each threshold
+        crossed once for the whole column.
+        """
+        totals = [None if total is None else float(total) for total in totals]
+        grades = [self.no_grade] * len(totals)
+        index, grade = 0, self.fail_grade
+        for row in sorted(
+            (row for row, total in enumerate(totals) if total is not None),
+            key=totals.__getitem__,
+        ):
+            while (
+                index < len(self.thresholds) and self.thresholds[index] <= totals[row]
+            ):
+                grade = self.grades[index]
+                index += 1
+            grades[row] = grade
+        return grades, [self.point(grade) for grade in grades]
+
+
+# The scale used when no GradingScale has been configured.
+DEFAULT_GRADE_SCALE = GradeScale(
+    [
+        (90, "A+", 4),
+        (85, "A", 4),
+        (80, "A-", 3.75),
+        (75, "B+", 3.5),
+        (70, "B", 3),
+        (65, "B-", 2.75),
+        (60, "C+", 2.5),
+        (55, "C", 2),
+        (50, "C-", 1.75),
+        (45, "D", 1),
+    ]
+)
+
+
+def get_grade_scales():
+    """
+    Return every configured scale compiled, keyed by ``(program_id, level)``.
+
+    The compiled scales are cached for GRADE_SCALES_CACHE_TIMEOUT seconds,
+    or until a GradingScale or GradeBoundary is saved or deleted in this
+    process.
+    """
+    scales = cache.get(GRADE_SCALES_CACHE_KEY)
+    if scales is None:
+        from .models import GradingScale
+
+        scales = {
+            (scale.program_id, scale.level): scale.compile()
+            for scale in GradingScale.objects.prefetch_related("boundaries")
+        }
+        cache.set(GRADE_SCALES_CACHE_KEY, scales, settings.GRADE_SCALES_CACHE_TIMEOUT)
+    return scales
+
+
+def get_grade_scale(program_id=None, level=None, scales=None):
+    """
+    Find the most specific scale for a program and level.
+
+    Falls back from (program, level) to the program, the level, the
+    catch-all scale and finally DEFAULT_GRADE_SCALE.
+    """
+    if scales is None:
+        scales = get_grade_scales()
+    for key in ((program_id, level), (program_id, None), (None, level), (None, None)):
+        if key in scales:
+            return scales[key]
+    return DEFAULT_GRADE_SCALE
+
+
+def clear_grade_scales(*args, **kwargs):
+    cache.delete(GRADE_SCALES_CACHE_KEY)
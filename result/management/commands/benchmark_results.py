@@ -0,0 +1,104 @@
+import json
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from config.celery import app as celery_app
+from result.benchmark import SCENARIOS, compare_reports, run_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure wall time and queries of the score entry, result and PDF "
+        "views for cohorts of several sizes and write a JSON report. The "
+        "cohorts are built in a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="50,200,1000",
+            help="Comma separated numbers of students, default 50,200,1000.",
+        )
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument(
+            "--courses",
+            type=int,
+            default=5,
+            help="Courses per semester of every cohort.",
+        )
+        parser.add_argument(
+            "--scenarios",
+            default=",".join(SCENARIOS),
+            help="Comma separated scenarios, all by default.",
+        )
+        parser.add_argument(
+            "--output", default="-", help="Path of the JSON report, - for stdout."
+        )
+        parser.add_argument(
+            "--baseline",
+            help="JSON report to compare with, regressions make the command fail.",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.25,
+            help="Allowed slowdown of the median time against the baseline.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options["sizes"].split(",")]
+        except ValueError:
+            raise CommandError("--sizes must be a list of integers.")
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"]) as f:
+                baseline = json.load(f)
+
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        eager = celery_app.conf.CELERY_TASK_ALWAYS_EAGER
+        celery_app.conf.CELERY_TASK_ALWAYS_EAGER = True
+        try:
+            with override_settings(
+                MEDIA_ROOT=tempfile.mkdtemp(),
+                STATICFILES_STORAGE=(
+                    "django.contrib.staticfiles.storage.StaticFilesStorage"
+                ),
+            ):
+                report = run_benchmark(
+                    sizes,
+                    repeat=options["repeat"],
+                    scenarios=options["scenarios"].split(","),
+                    courses_per_semester=options["courses"],
+                )
+        finally:
+            celery_app.conf.CELERY_TASK_ALWAYS_EAGER = eager
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        output = json.dumps(report, indent=2)
+        if options["output"] == "-":
+            self.stdout.write(output)
+        else:
+            with open(options["output"], "w") as f:
+                f.write(output)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}."))
+
+        if baseline is not None:
+            regressions = compare_reports(
+                baseline, report, time_tolerance=options["tolerance"]
+            )
+            if regressions:
+                raise CommandError(
+                    "Regressions against the baseline:\n" + "\n".join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS("No regressions."))
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Session, Semester
+from result.export import EXPORTS, export_documents
+
+
+class Command(BaseCommand):
+    help = (
+        "Render every result sheet or registration form of a semester into a "
+        "ZIP archive using a pool of worker processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=EXPORTS)
+        parser.add_argument("output", help="Path of the ZIP archive to write.")
+        parser.add_argument(
+            "--session", help="Session to export, the current one by default."
+        )
+        parser.add_argument(
+            "--semester", help="Semester to export, the current one by default."
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            help="Number of worker processes, one per core by default.",
+        )
+
+    def handle(self, *args, **options):
+        session = options["session"]
+        if session is None:
+            session = Session.objects.filter(is_current_session=True).first()
+        semester = options["semester"]
+        if semester is None:
+            semester = Semester.objects.filter(is_current_semester=True).first()
+        if session is None or semester is None:
+            raise CommandError("There is no current session or semester.")
+
+        stats = export_documents(
+            options["kind"],
+            options["output"],
+            session,
+            semester,
+            processes=options["processes"],
+        )
+        rate = stats["documents"] / stats["seconds"] if stats["seconds"] else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Exported {documents} documents ({bytes} bytes) to {output} in "
+                "{seconds:.2f}s ({rate:.1f} documents/s).".format(
+                    output=options["output"], rate=rate, **stats
+                )
+            )
+        )
@@ -0,0 +1,108 @@
+# Generated by Django 4.0.8 on 2026-10-18 19:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("course", "0032_remove_program_thumbnail"),
+        ("result", "0007_result_level"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GradingScale",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("title", models.CharField(max_length=100)),
+                (
+                    "level",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("Bachelor", "Bachelor Degree"),
+                            ("Master", "Master Degree"),
+                        ],
+                        max_length=25,
+                        null=True,
+                    ),
+                ),
+                (
+                    "program",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="course.program",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="GradeBoundary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "grade",
+                    models.CharField(
+                        choices=[
+                            ("A+", "A+"),
+                            ("A", "A"),
+                            ("A-", "A-"),
+                            ("B+", "B+"),
+                            ("B", "B"),
+                            ("B-", "B-"),
+                            ("C+", "C+"),
+                            ("C", "C"),
+                            ("C-", "C-"),
+                            ("D", "D"),
+                            ("F", "F"),
+                            ("NG", "NG"),
+                        ],
+                        max_length=2,
+                    ),
+                ),
+                ("min_total", models.DecimalField(decimal_places=2, max_digits=5)),
+                ("point", models.DecimalField(decimal_places=2, max_digits=3)),
+                (
+                    "scale",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="boundaries",
+                        to="result.gradingscale",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("-min_total",),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="gradingscale",
+            constraint=models.UniqueConstraint(
+                fields=("program", "level"), name="unique_grading_scale"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="gradeboundary",
+            unique_together={("scale", "grade")},
+        ),
+    ]
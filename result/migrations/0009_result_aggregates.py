@@ -0,0 +1,100 @@
+# Generated by Django 4.0.8 on 2026-10-18 19:10
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def backfill_aggregates(apps, schema_editor):
+    """
+    Compute the running sums of existing results from their taken courses
+    and create the missing semester rows for the current session.
+
+    Taken courses carry no session: their sums go to the latest row of each
+    semester, the one of the current session if any. The rows of earlier
+    sessions keep their GPA and CGPA as they were computed then.
+    """
+    TakenCourse = apps.get_model("result", "TakenCourse")
+    Result = apps.get_model("result", "Result")
+    Session = apps.get_model("core", "Session")
+
+    current_session = Session.objects.filter(is_current_session=True).first()
+    current = current_session.session if current_session else None
+    semester_sums, level_sums = {}, {}
+    for student_id, semester, level, credit, point in TakenCourse.objects.values_list(
+        "student_id", "course__semester", "course__level", "course__credit", "point"
+    ):
+        for sums, key in (
+            (semester_sums, (student_id, semester, level)),
+            (level_sums, (student_id, level)),
+        ):
+            points, credits = sums.get(key, (Decimal("0"), 0))
+            sums[key] = (points + (point or 0), credits + int(credit or 0))
+
+    latest = {}
+    for result in Result.objects.order_by("id"):
+        key = (result.student_id, result.semester, result.level)
+        if key not in latest or latest[key].session != current:
+            latest[key] = result
+
+    seen = set()
+    for key, result in latest.items():
+        seen.add(key)
+        result.points, result.credits = semester_sums.get(key, (0, 0))
+        result.level_points, result.level_credits = level_sums.get(
+            (result.student_id, result.level), (0, 0)
+        )
+        if result.credits:
+            result.gpa = round(float(result.points) / result.credits, 2)
+        if result.level_credits:
+            result.cgpa = round(float(result.level_points) / result.level_credits, 2)
+        result.save()
+
+    for (student_id, semester, level), (points, credits) in semester_sums.items():
+        if (student_id, semester, level) in seen:
+            continue
+        level_points, level_credits = level_sums[(student_id, level)]
+        Result.objects.create(
+            student_id=student_id,
+            semester=semester,
+            level=level,
+            session=current,
+            points=points,
+            credits=credits,
+            level_points=level_points,
+            level_credits=level_credits,
+            gpa=round(float(points) / credits, 2) if credits else 0,
+            cgpa=round(float(level_points) / level_credits, 2) if level_credits else 0,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_alter_newsandevents_posted_as"),
+        ("result", "0008_gradingscale"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="result",
+            name="credits",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="result",
+            name="level_credits",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="result",
+            name="level_points",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=9),
+        ),
+        migrations.AddField(
+            model_name="result",
+            name="points",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=9),
+        ),
+        migrations.RunPython(backfill_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.0.8 on 2026-10-18 19:23
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from result.analytics import compute_course_statistics
+
+
+def backfill_course_statistics(apps, schema_editor):
+    TakenCourse = apps.get_model("result", "TakenCourse")
+    CourseStatistics = apps.get_model("result", "CourseStatistics")
+    CourseStatistics.objects.bulk_create(
+        CourseStatistics(course_id=course_id, **values)
+        for course_id, values in compute_course_statistics(
+            TakenCourse.objects.all()
+        ).items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("course", "0032_remove_program_thumbnail"),
+        ("result", "0009_result_aggregates"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CourseStatistics",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("students", models.PositiveIntegerField(default=0)),
+                ("mean", models.FloatField(default=0)),
+                ("median", models.FloatField(default=0)),
+                ("stddev", models.FloatField(default=0)),
+                ("passed", models.PositiveIntegerField(default=0)),
+                ("failed", models.PositiveIntegerField(default=0)),
+                ("histogram", models.JSONField(blank=True, default=dict)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "course",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="statistics",
+                        to="course.course",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "course statistics",
+            },
+        ),
+        migrations.RunPython(backfill_course_statistics, migrations.RunPython.noop),
+    ]
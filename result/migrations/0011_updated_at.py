@@ -0,0 +1,23 @@
+# Generated by Django 4.0.8 on 2026-10-18 19:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("result", "0010_coursestatistics"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="result",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name="takencourse",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.0.8 on 2026-10-18 20:27
+
+from django.db import migrations, models
+import django.db.models.expressions
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("result", "0011_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="gradingscale",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.comparison.Coalesce(
+                    "program", django.db.models.expressions.Value(0)
+                ),
+                django.db.models.functions.comparison.Coalesce(
+                    "level", django.db.models.expressions.Value("")
+                ),
+                name="unique_grading_scale_fallback",
+            ),
+        ),
+    ]
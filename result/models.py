@@ -1,9 +1,13 @@
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_save, post_delete
 from django.urls import reverse
 
 from accounts.models import Student
-from core.models import Semester
-from course.models import Course
+from course.models import Course, Program, LEVEL as COURSE_LEVEL
+from .grading import GradeScale, get_grade_scale, clear_grade_scales
 
 YEARS = (
     (1, "1"),
@@ -94,6 +98,8 @@ class TakenCourse(models.Model):
     grade = models.CharField(choices=GRADE, max_length=2, blank=True)
     point = models.DecimalField(max_digits=5, decimal_places=2, default=0.0)
     comment = models.CharField(choices=COMMENT, max_length=200, blank=True)
+    # also set by the bulk writers in result.utils, for incremental syncs
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def get_absolute_url(self):
         return reverse("course_detail", kwargs={"slug": self.course.slug})
@@ -111,36 +117,13 @@ class TakenCourse(models.Model):
             + float(final_exam)
         )
 
+    @property
+    def grade_scale(self):
+        return get_grade_scale(self.course.program_id, self.course.level)
+
     # @staticmethod
     def get_grade(self, total):
-        # total = float(assignment) + float(mid_exam) + float(quiz) + float(attendance) + float(final_exam)
-        # total = self.get_total(assignment=assignment, mid_exam=mid_exam, quiz=quiz, attendance=attendance, final_exam=final_exam)
-        # total = total
-        if total >= 90:
-            grade = A_PLUS
-        elif total >= 85:
-            grade = A
-        elif total >= 80:
-            grade = A_MINUS
-        elif total >= 75:
-            grade = B_PLUS
-        elif total >= 70:
-            grade = B
-        elif total >= 65:
-            grade = B_MINUS
-        elif total >= 60:
-            grade = C_PLUS
-        elif total >= 55:
-            grade = C
-        elif total >= 50:
-            grade = C_MINUS
-        elif total >= 45:
-            grade = D
-        elif total < 45:
-            grade = F
-        else:
-            grade = NG
-        return grade
+        return self.grade_scale.grade(total)
 
     # @staticmethod
     def get_comment(self, grade):
@@ -153,128 +136,15 @@ class TakenCourse(models.Model):
         return comment
 
     def get_point(self, grade):
-        p = 0
-        # point = 0
-        # for i in student:
         credit = self.course.credit
-        if self.grade == A_PLUS:
-            point = 4
-        elif self.grade == A:
-            point = 4
-        elif self.grade == A_MINUS:
-            point = 3.75
-        elif self.grade == B_PLUS:
-            point = 3.5
-        elif self.grade == B:
-            point = 3
-        elif self.grade == B_MINUS:
-            point = 2.75
-        elif self.grade == C_PLUS:
-            point = 2.5
-        elif self.grade == C:
-            point = 2
-        elif self.grade == C_MINUS:
-            point = 1.75
-        elif self.grade == D:
-            point = 1
-        else:
-            point = 0
-        p += int(credit) * point
-        return p
-
-    def calculate_gpa(self, total_credit_in_semester):
-        current_semester = Semester.objects.get(is_current_semester=True)
-        student = TakenCourse.objects.filter(
-            student=self.student,
-            course__level=self.student.level,
-            course__semester=current_semester,
-        )
-        p = 0
-        point = 0
-        for i in student:
-            credit = i.course.credit
-            if i.grade == A_PLUS:
-                point = 4
-            elif i.grade == A:
-                point = 4
-            elif i.grade == A_MINUS:
-                point = 3.75
-            elif i.grade == B_PLUS:
-                point = 3.5
-            elif i.grade == B:
-                point = 3
-            elif i.grade == B_MINUS:
-                point = 2.75
-            elif i.grade == C_PLUS:
-                point = 2.5
-            elif i.grade == C:
-                point = 2
-            elif i.grade == C_MINUS:
-                point = 1.75
-            elif i.grade == D:
-                point = 1
-            else:
-                point = 0
-            p += int(credit) * point
-        try:
-            gpa = p / total_credit_in_semester
-            return round(gpa, 2)
-        except ZeroDivisionError:
-            return 0
-
-    def calculate_cgpa(self):
-        current_semester = Semester.objects.get(is_current_semester=True)
-        previousResult = Result.objects.filter(
-            student__id=self.student.id, level__lt=self.student.level
-        )
-        previous_cgpa = 0
-        for i in previousResult:
-            if i.cgpa is not None:
-                previous_cgpa += i.cgpa
-        cgpa = 0
-        if str(current_semester) == SECOND:
-            first_sem_gpa = 0.0
-            sec_sem_gpa = 0.0
-            try:
-                first_sem_result = Result.objects.get(
-                    student=self.student.id, semester=FIRST, level=self.student.level
-                )
-                first_sem_gpa += first_sem_result.gpa
-            except:
-                first_sem_gpa = 0
-
-            try:
-                sec_sem_result = Result.objects.get(
-                    student=self.student.id, semester=SECOND, level=self.student.level
-                )
-                sec_sem_gpa += sec_sem_result.gpa
-            except:
-                sec_sem_gpa = 0
-
-            taken_courses = TakenCourse.objects.filter(
-                student=self.student, student__level=self.student.level
-            )
-            taken_course_credits = 0
-            taken_course_points = 0
-            for i in taken_courses:
-                taken_course_points += float(i.point)
-            for i in taken_courses:
-                taken_course_credits += int(i.course.credit)
-            # cgpa = (first_sem_gpa + sec_sem_gpa) / 2
-
-            print("taken_course_points = ", taken_course_points)
-            print("taken_course_credits = ", taken_course_credits)
-            print("first_sem_gpa = ", first_sem_gpa)
-            print("sec_sem_gpa = ", sec_sem_gpa)
-            print("cgpa = ", round(taken_course_points / taken_course_credits, 2))
+        return int(credit) * self.grade_scale.point(grade)
 
-            try:
-                cgpa = taken_course_points / taken_course_credits
-                return round(cgpa, 2)
-            except ZeroDivisionError:
-                return 0
-
-            # return round(cgpa, 2)
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember the stored point so a save can adjust Result by the delta
+        instance._loaded_point = instance.__dict__.get("point")
+        return instance
 
 
 class Result(models.Model):
@@ -284,3 +154,102 @@ class Result(models.Model):
     semester = models.CharField(max_length=100, choices=SEMESTER)
     session = models.CharField(max_length=100, blank=True, null=True)
     level = models.CharField(max_length=25, choices=LEVEL, null=True)
+    # running credit-weighted point sums of the semester and of the whole
+    # level, adjusted by result.utils.apply_result_deltas on every change
+    points = models.DecimalField(max_digits=9, decimal_places=2, default=0)
+    credits = models.IntegerField(default=0)
+    level_points = models.DecimalField(max_digits=9, decimal_places=2, default=0)
+    level_credits = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+
+class GradingScale(models.Model):
+    """
+    Grade thresholds for a program and/or level. A scale without a program
+    or level applies to everything not covered by a more specific one.
+    """
+
+    title = models.CharField(max_length=100)
+    program = models.ForeignKey(
+        Program, on_delete=models.CASCADE, null=True, blank=True
+    )
+    level = models.CharField(max_length=25, choices=COURSE_LEVEL, null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["program", "level"], name="unique_grading_scale"
+            ),
+            # NULLs never collide in the constraint above, the program-only,
+            # level-only and catch-all scales are kept unique here
+            models.UniqueConstraint(
+                Coalesce("program", Value(0)),
+                Coalesce("level", Value("")),
+                name="unique_grading_scale_fallback",
+            ),
+        ]
+
+    def __str__(self):
+        return self.title
+
+    def clean(self):
+        # the constraint on expressions is not checked by model forms
+        duplicates = GradingScale.objects.filter(
+            program=self.program_id, level=self.level
+        ).exclude(pk=self.pk)
+        if (self.program_id is None or self.level is None) and duplicates.exists():
+            raise ValidationError(
+                "A grading scale for this program and level already exists."
+            )
+
+    def compile(self):
+        return GradeScale(
+            (b.min_total, b.grade, b.point) for b in self.boundaries.all()
+        )
+
+
+class GradeBoundary(models.Model):
+    scale = models.ForeignKey(
+        GradingScale, on_delete=models.CASCADE, related_name="boundaries"
+    )
+    grade = models.CharField(choices=GRADE, max_length=2)
+    min_total = models.DecimalField(max_digits=5, decimal_places=2)
+    point = models.DecimalField(max_digits=3, decimal_places=2)
+
+    class Meta:
+        ordering = ("-min_total",)
+        unique_together = ("scale", "grade")
+
+    def __str__(self):
+        return "{0} >= {1}".format(self.grade, self.min_total)
+
+
+class CourseStatistics(models.Model):
+    """
+    Score statistics of a course, refreshed by
+    result.analytics.refresh_course_statistics whenever scores are written.
+    """
+
+    course = models.OneToOneField(
+        Course, on_delete=models.CASCADE, related_name="statistics"
+    )
+    students = models.PositiveIntegerField(default=0)
+    mean = models.FloatField(default=0)
+    median = models.FloatField(default=0)
+    stddev = models.FloatField(default=0)
+    passed = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    # number of students per grade
+    histogram = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "course statistics"
+
+    def __str__(self):
+        return str(self.course)
+
+
+for model in (GradingScale, GradeBoundary):
+    post_save.connect(clear_grade_scales, sender=model)
+    post_delete.connect(clear_grade_scales, sender=model)
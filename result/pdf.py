@@ -0,0 +1,394 @@
+import hashlib
+from functools import lru_cache
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+
+from reportlab.platypus import (
+    SimpleDocTemplate,
+    Paragraph,
+    Spacer,
+    Table,
+    TableStyle,
+    Image,
+)
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT, TA_JUSTIFY
+from reportlab.lib.units import inch
+from reportlab.lib import colors
+
+from accounts.models import User, Student
+from core.models import Session
+from course.models import Course
+from .models import TakenCourse, PASS, FAIL, F, FIRST, SECOND
+from .transcript import get_transcript
+
+cm = 2.54
+
+RESULT_SHEET_HEADER = (
+    "S/N",
+    "ID NO.",
+    "FULL NAME",
+    "TOTAL",
+    "GRADE",
+    "POINT",
+    "COMMENT",
+)
+
+
+@lru_cache(maxsize=None)
+def get_styles():
+    """Paragraph styles shared by every document, built once per process."""
+    styles = getSampleStyleSheet()
+    styles.add(
+        ParagraphStyle(
+            name="Title12",
+            parent=styles["Normal"],
+            alignment=TA_CENTER,
+            fontName="Helvetica",
+            fontSize=12,
+            leading=15,
+        )
+    )
+    styles.add(
+        ParagraphStyle(
+            name="Title10",
+            parent=styles["Title12"],
+            fontSize=10,
+        )
+    )
+    styles.add(
+        ParagraphStyle(name="right", parent=styles["Normal"], alignment=TA_RIGHT)
+    )
+    styles.add(
+        ParagraphStyle(
+            name="Heading18",
+            parent=styles["Title12"],
+            leading=18,
+        )
+    )
+    styles.add(ParagraphStyle(name="School", parent=styles["Heading18"], fontSize=10))
+    styles.add(
+        ParagraphStyle(name="Department", parent=styles["Heading18"], fontSize=9)
+    )
+    styles.add(
+        ParagraphStyle(name="Semester", parent=styles["Department"], alignment=TA_LEFT)
+    )
+    styles.add(
+        ParagraphStyle(name="SemesterTotal", parent=styles["Semester"], fontSize=8)
+    )
+    styles.add(
+        ParagraphStyle(
+            name="Certification", parent=styles["SemesterTotal"], alignment=TA_JUSTIFY
+        )
+    )
+    return styles
+
+
+def get_logo(offset_x, offset_y):
+    logo = Image(settings.STATICFILES_DIRS[0] + "/img/logo.png", 1 * inch, 1 * inch)
+    logo.__setattr__("_offs_x", offset_x)
+    logo.__setattr__("_offs_y", offset_y)
+    return logo
+
+
+def get_picture(user, offset_x, offset_y):
+    picture = Image(settings.BASE_DIR + user.get_picture(), 1.0 * inch, 1.0 * inch)
+    picture.__setattr__("_offs_x", offset_x)
+    picture.__setattr__("_offs_y", offset_y)
+    return picture
+
+
+def get_result_sheet_rows(course):
+    """All rows of the sheet in one query, in a stable order."""
+    return [
+        (
+            taken.student.student.username.upper(),
+            taken.student.student.get_full_name.capitalize(),
+            str(taken.total),
+            taken.grade,
+            str(taken.point),
+            taken.comment,
+        )
+        for taken in TakenCourse.objects.filter(course=course)
+        .select_related("student__student")
+        .order_by("student__student__username")
+    ]
+
+
+def render_result_sheet(course, lecturer_name, semester, session, use_cache=True):
+    """
+    Render the result sheet of ``course`` and return the PDF bytes.
+
+    The students are laid out in a single table whose header repeats on
+    every page. The output is cached under a hash of its content, so an
+    unchanged sheet is only rendered once (see RESULT_SHEET_CACHE_TIMEOUT).
+    """
+    rows = get_result_sheet_rows(course)
+    titles = (str(semester), str(session), lecturer_name, str(course.level))
+
+    timeout = settings.RESULT_SHEET_CACHE_TIMEOUT
+    use_cache = use_cache and timeout != 0
+    digest = hashlib.sha256(repr((titles, rows)).encode()).hexdigest()
+    cache_key = f"result:sheet:{digest}"
+    if use_cache:
+        pdf = cache.get(cache_key)
+        if pdf is not None:
+            return pdf
+
+    pdf = build_result_sheet(rows, *titles)
+    if use_cache:
+        cache.set(cache_key, pdf, timeout)
+    return pdf
+
+
+def build_result_sheet(rows, semester, session, lecturer_name, level):
+    styles = get_styles()
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        rightMargin=0,
+        leftMargin=6.5 * cm,
+        topMargin=0.3 * cm,
+        bottomMargin=0,
+    )
+    Story = [Spacer(1, 0.2)]
+    Story.append(get_logo(-200, -45))
+
+    title = "<b> " + semester + " Semester " + session + " Result Sheet</b>"
+    Story.append(Paragraph(title.upper(), styles["Title12"]))
+    Story.append(Spacer(1, 0.1 * inch))
+    title = "<b>Course lecturer: " + lecturer_name + "</b>"
+    Story.append(Paragraph(title.upper(), styles["Title10"]))
+    Story.append(Spacer(1, 0.1 * inch))
+    title = "<b>Level: </b>" + level
+    Story.append(Paragraph(title.upper(), styles["Title10"]))
+    Story.append(Spacer(1, 0.6 * inch))
+
+    data = [RESULT_SHEET_HEADER]
+    table_style = [
+        ("BACKGROUND", (0, 0), (-1, 0), colors.black),
+        ("TEXTCOLOR", (1, 0), (-1, 0), colors.white),
+        ("TEXTCOLOR", (0, 0), (0, 0), colors.cyan),
+        ("ALIGN", (0, 0), (-1, 0), "CENTER"),
+        ("VALIGN", (0, 0), (-1, 0), "MIDDLE"),
+        ("INNERGRID", (0, 1), (-1, -1), 0.05, colors.black),
+        ("BOX", (0, 0), (-1, -1), 0.1, colors.black),
+    ]
+    no_of_pass = no_of_fail = 0
+    for count, (username, full_name, total, grade, point, comment) in enumerate(
+        rows, start=1
+    ):
+        data.append(
+            (
+                count,
+                username,
+                Paragraph(full_name, styles["Normal"]),
+                total,
+                grade,
+                point,
+                comment,
+            )
+        )
+        if grade == F:
+            table_style.append(("TEXTCOLOR", (0, count), (-1, count), colors.red))
+        if comment == PASS:
+            no_of_pass += 1
+        elif comment == FAIL:
+            no_of_fail += 1
+
+    table = Table(
+        data,
+        colWidths=[inch] * len(RESULT_SHEET_HEADER),
+        rowHeights=[0.5 * inch] + [None] * len(rows),
+        repeatRows=1,
+    )
+    table.setStyle(TableStyle(table_style))
+    Story.append(table)
+
+    Story.append(Spacer(1, 1 * inch))
+    tbl_data = [
+        [
+            Paragraph("<b>Date:</b>_____________________________", styles["Normal"]),
+            Paragraph("<b>No. of PASS:</b> " + str(no_of_pass), styles["right"]),
+        ],
+        [
+            Paragraph(
+                "<b>Siganture / Stamp:</b> _____________________________",
+                styles["Normal"],
+            ),
+            Paragraph("<b>No. of FAIL: </b>" + str(no_of_fail), styles["right"]),
+        ],
+    ]
+    Story.append(Table(tbl_data))
+
+    doc.build(Story)
+    return buffer.getvalue()
+
+
+def result_sheet_filename(course, semester, session):
+    fname = (
+        str(semester)
+        + "_semester_"
+        + str(session)
+        + "_"
+        + str(course)
+        + "_resultSheet.pdf"
+    )
+    return fname.replace("/", "-")
+
+
+REGISTRATION_TABLE_STYLE = [
+    ("ALIGN", (-2, -2), (-2, -2), "CENTER"),
+    ("ALIGN", (1, 0), (1, 0), "CENTER"),
+    ("ALIGN", (0, 0), (0, 0), "CENTER"),
+    ("ALIGN", (-4, 0), (-4, 0), "LEFT"),
+    ("TEXTCOLOR", (0, -1), (-1, -1), colors.black),
+    ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.black),
+    ("BOX", (0, 0), (-1, -1), 0.25, colors.black),
+]
+
+REGISTRATION_HEADER_STYLE = REGISTRATION_TABLE_STYLE + [
+    ("VALIGN", (-2, -2), (-2, -2), "MIDDLE"),
+    ("VALIGN", (1, 0), (1, 0), "MIDDLE"),
+    ("VALIGN", (0, 0), (0, 0), "MIDDLE"),
+    ("VALIGN", (-4, 0), (-4, 0), "MIDDLE"),
+    ("ALIGN", (-3, 0), (-3, 0), "LEFT"),
+    ("VALIGN", (-3, 0), (-3, 0), "MIDDLE"),
+]
+
+
+def render_registration_form(user, session):
+    """Render the course registration form of the student ``user``."""
+    styles = get_styles()
+    transcript = get_transcript(Student.objects.get(student=user))
+    courses = transcript["courses"]
+    level = transcript["level"] or ""
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, rightMargin=15, leftMargin=15, topMargin=0, bottomMargin=0
+    )
+    Story = [Spacer(1, 0.5)]
+    Story.append(Spacer(1, 0.4 * inch))
+
+    title = "<b>EZOD UNIVERSITY OF TECHNOLOGY, ADAMA</b>"  # TODO: Make this dynamic
+    Story.append(Paragraph(title.upper(), styles["Heading18"]))
+    title = (
+        "<b>SCHOOL OF ELECTRICAL ENGINEERING & COMPUTING</b>"  # TODO: Make this dynamic
+    )
+    Story.append(Paragraph(title.upper(), styles["School"]))
+    Story.append(Spacer(1, 0.1 * inch))
+    title = (
+        "<b>DEPARTMENT OF COMPUTER SCIENCE & ENGINEERING</b>"  # TODO: Make this dynamic
+    )
+    Story.append(Paragraph(title, styles["Department"]))
+    Story.append(Spacer(1, 0.3 * inch))
+
+    title = "<b><u>STUDENT COURSE REGISTRATION FORM</u></b>"
+    Story.append(Paragraph(title.upper(), styles["Heading18"]))
+    tbl_data = [
+        [
+            Paragraph(
+                "<b>Registration Number : " + user.username.upper() + "</b>",
+                styles["Normal"],
+            )
+        ],
+        [
+            Paragraph(
+                "<b>Name : " + user.get_full_name.upper() + "</b>",
+                styles["Normal"],
+            )
+        ],
+        [
+            Paragraph(
+                "<b>Session : " + str(session).upper() + "</b>",
+                styles["Normal"],
+            ),
+            Paragraph("<b>Level: " + level + "</b>", styles["Normal"]),
+        ],
+    ]
+    Story.append(Table(tbl_data))
+
+    for semester in (FIRST, SECOND):
+        Story.append(Spacer(1, 0.6 * inch))
+        title = "<b>" + semester.upper() + " SEMESTER</b>"
+        Story.append(Paragraph(title, styles["Semester"]))
+
+        header = [
+            (
+                "S/No",
+                "Course Code",
+                "Course Title",
+                "Unit",
+                Paragraph(
+                    "<b>Name, Signature of course lecturer & Date</b>",
+                    styles["Normal"],
+                ),
+            )
+        ]
+        table_header = Table(header, 1 * [1.4 * inch], 1 * [0.5 * inch])
+        table_header.setStyle(TableStyle(REGISTRATION_HEADER_STYLE))
+        Story.append(table_header)
+
+        data = []
+        semester_unit = 0
+        for taken in courses:
+            if taken.course.semester != semester:
+                continue
+            semester_unit += int(taken.course.credit)
+            data.append(
+                (
+                    len(data) + 1,
+                    taken.course.code.upper(),
+                    Paragraph(taken.course.title, styles["Normal"]),
+                    taken.course.credit,
+                    "",
+                )
+            )
+        if data:
+            table_body = Table(data, 1 * [1.4 * inch], len(data) * [0.3 * inch])
+            table_body.setStyle(TableStyle(REGISTRATION_TABLE_STYLE))
+            Story.append(table_body)
+
+        title = (
+            "<b>Total "
+            + semester.capitalize()
+            + " Semester Credit : "
+            + str(semester_unit)
+            + "</b>"
+        )
+        Story.append(Paragraph(title, styles["SemesterTotal"]))
+
+    Story.append(Spacer(1, 2))
+    certification_text = (
+        "CERTIFICATION OF REGISTRATION: I certify that <b>"
+        + str(user.get_full_name.upper())
+        + "</b> has been duly registered for the <b>"
+        + level
+        + " level </b> of study in the department of COMPUTER SICENCE & "
+        "ENGINEERING and that the courses and credits registered are as "
+        "approved by the senate of the University"
+    )
+    Story.append(Paragraph(certification_text, styles["Certification"]))
+
+    Story.append(get_logo(-218, 480))
+    Story.append(get_picture(user, 218, 550))
+
+    doc.build(Story)
+    return buffer.getvalue()
+
+
+# ########################################################
+# Background document jobs (see core.documents)
+# ########################################################
+def result_sheet_document(course_id, lecturer_id, semester, session):
+    course = Course.objects.get(pk=course_id)
+    lecturer = User.objects.get(pk=lecturer_id)
+    return render_result_sheet(course, lecturer.get_full_name, semester, session)
+
+
+def registration_form_document(user_id):
+    session = Session.objects.get(is_current_session=True)
+    return render_registration_form(User.objects.get(pk=user_id), session)
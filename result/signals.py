@@ -0,0 +1,82 @@
+from django.utils import timezone
+
+from course.models import Course
+from .models import TakenCourse
+from .analytics import refresh_course_statistics
+from .transcript import clear_transcripts
+from .utils import apply_result_deltas, regrade_taken_courses, to_points
+
+
+def taken_course_post_save_receiver(sender, instance=None, created=False, **kwargs):
+    """
+    Adjust the student's Result by the change in points (and by the course
+    credit when the course was just registered)
+    """
+    if kwargs.get("raw"):
+        return
+    old_point = 0 if created else getattr(instance, "_loaded_point", instance.point)
+    course = instance.course
+    credits = int(course.credit or 0) if created else 0
+    apply_result_deltas(
+        {
+            (instance.student_id, course.semester, course.level): (
+                to_points(instance.point) - to_points(old_point),
+                credits,
+            )
+        }
+    )
+    instance._loaded_point = instance.point
+    refresh_course_statistics([instance.course_id])
+    clear_transcripts([instance.student_id])
+
+
+def taken_course_post_delete_receiver(sender, instance=None, **kwargs):
+    """
+    Take a dropped course out of the student's Result
+    """
+    course = instance.course
+    apply_result_deltas(
+        {
+            (instance.student_id, course.semester, course.level): (
+                -to_points(instance.point),
+                -int(course.credit or 0),
+            )
+        },
+        # the student's results may already be gone in a cascading delete
+        create=False,
+    )
+    # the course itself may be going away too
+    refresh_course_statistics([instance.course_id], create=False)
+    clear_transcripts([instance.student_id])
+
+
+def course_pre_save_receiver(sender, instance=None, **kwargs):
+    instance._old_credit = (
+        Course.objects.filter(pk=instance.pk).values_list("credit", flat=True).first()
+        if instance.pk
+        else None
+    )
+
+
+def course_post_save_receiver(sender, instance=None, created=False, **kwargs):
+    """
+    When the credit of a course changes, regrade its taken courses (the
+    points are credit weighted) and move the credit difference into the
+    students' Result
+    """
+    old_credit = getattr(instance, "_old_credit", None)
+    if created or kwargs.get("raw") or old_credit is None:
+        return
+    # the transcripts and the API rows hold the course title, code and credit
+    clear_transcripts(instance.taken_courses.values_list("student_id", flat=True))
+    instance.taken_courses.update(updated_at=timezone.now())
+    difference = int(instance.credit or 0) - int(old_credit or 0)
+    if not difference:
+        return
+    students = regrade_taken_courses(instance.taken_courses.all())
+    apply_result_deltas(
+        {
+            (student_id, instance.semester, instance.level): (0, difference)
+            for student_id in students
+        }
+    )
@@ -0,0 +1,95 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import User, Student
+from core.models import Session, Semester
+from course.models import Program, Course, CourseAllocation
+from result.models import TakenCourse, CourseStatistics
+from result.utils import record_scores
+
+
+@override_settings(
+    STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+)
+class CourseStatisticsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.session = Session.objects.create(
+            session="2024/2025", is_current_session=True
+        )
+        self.semester = Semester.objects.create(
+            semester="First", is_current_semester=True, session=self.session
+        )
+        program = Program.objects.create(title="Computer Science")
+        self.courses = [
+            Course.objects.create(
+                title=f"Course {i}",
+                code=f"CS10{i}",
+                credit=3,
+                program=program,
+                semester="First",
+            )
+            for i in range(2)
+        ]
+        self.taken = []
+        for i in range(4):
+            student = Student.objects.create(
+                student=User.objects.create(username=f"student{i}"), program=program
+            )
+            for course in self.courses:
+                self.taken.append(
+                    TakenCourse.objects.create(student=student, course=course)
+                )
+        course = self.courses[0]
+        record_scores(
+            course,
+            {
+                obj.pk: {"final_exam": total}
+                for obj, total in zip(
+                    [obj for obj in self.taken if obj.course_id == course.pk],
+                    [20, 50, 60, 94],
+                )
+            },
+            self.session,
+        )
+
+    def test_statistics_are_refreshed_on_score_entry(self):
+        stats = CourseStatistics.objects.get(course=self.courses[0])
+        self.assertEqual(stats.students, 4)
+        self.assertEqual(stats.mean, 56)
+        self.assertEqual(stats.median, 55)
+        self.assertEqual(stats.stddev, 26.42)
+        self.assertEqual((stats.passed, stats.failed), (3, 1))
+        self.assertEqual(stats.histogram, {"A+": 1, "C+": 1, "C-": 1, "F": 1})
+
+    def test_dropping_a_course_updates_the_statistics(self):
+        TakenCourse.objects.filter(course=self.courses[0], total=20).delete()
+        stats = CourseStatistics.objects.get(course=self.courses[0])
+        self.assertEqual((stats.students, stats.failed), (3, 0))
+
+    def test_endpoint(self):
+        admin = User.objects.create_superuser(username="admin", password="pw")
+        self.client.force_login(admin)
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                reverse("course_statistics"), {"semester": "First"}
+            )
+        courses = response.json()["courses"]
+        self.assertEqual([course["code"] for course in courses], ["CS100", "CS101"])
+        self.assertEqual(courses[0]["histogram"]["F"], 1)
+
+    def test_lecturers_only_see_their_courses(self):
+        lecturer = User.objects.create_user(username="lecturer", password="pw")
+        User.objects.filter(pk=lecturer.pk).update(is_lecturer=True)
+        allocation = CourseAllocation.objects.create(lecturer=lecturer)
+        allocation.courses.add(self.courses[1])
+        self.client.force_login(lecturer)
+        response = self.client.get(reverse("course_statistics"))
+        self.assertEqual(
+            [course["code"] for course in response.json()["courses"]], ["CS101"]
+        )
+        response = self.client.get(
+            reverse("course_statistics_detail", kwargs={"id": self.courses[0].pk})
+        )
+        self.assertEqual(response.status_code, 404)
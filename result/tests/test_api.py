@@ -0,0 +1,104 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User, Student
+from course.models import Program, Course
+from result.models import TakenCourse, Result
+
+
+class ResultAPITestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        program = Program.objects.create(title="Computer Science")
+        self.courses = [
+            Course.objects.create(
+                title=f"Course {i}",
+                code=f"CS10{i}",
+                credit=3,
+                program=program,
+                semester=semester,
+            )
+            for i, semester in enumerate(["First", "Second"])
+        ]
+        for i in range(5):
+            student = Student.objects.create(
+                student=User.objects.create(username=f"student{i}"), program=program
+            )
+            for course in self.courses:
+                TakenCourse.objects.create(student=student, course=course, total=50)
+        self.admin = User.objects.create_superuser(username="admin", password="pw")
+        self.client.force_login(self.admin)
+        self.url = reverse("result-api:taken-courses")
+
+    def test_pages_are_served_in_a_fixed_number_of_queries(self):
+        # session, user, ETag aggregate and the page itself
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url, {"page_size": 4})
+        data = response.json()
+        self.assertEqual(len(data["results"]), 4)
+        self.assertEqual(data["results"][0]["username"], "student0")
+        self.assertEqual(data["results"][0]["course_code"], "CS100")
+        with self.assertNumQueries(4):
+            response = self.client.get(data["next"])
+        self.assertEqual(len(response.json()["results"]), 4)
+
+    def test_filters_and_sparse_fields(self):
+        response = self.client.get(
+            self.url, {"semester": "Second", "fields": "id,grade,course_code"}
+        )
+        results = response.json()["results"]
+        self.assertEqual(len(results), 5)
+        self.assertEqual(set(results[0]), {"id", "grade", "course_code"})
+        self.assertEqual({row["course_code"] for row in results}, {"CS101"})
+
+    def test_updated_since(self):
+        since = timezone.now()
+        taken = TakenCourse.objects.first()
+        taken.total = 90
+        taken.save()
+        response = self.client.get(self.url, {"updated_since": since.isoformat()})
+        self.assertEqual([row["id"] for row in response.json()["results"]], [taken.pk])
+
+    def test_session(self):
+        Result.objects.filter(student__student__username="student0").update(
+            session="2025/2026"
+        )
+        response = self.client.get(self.url, {"session": "2025/2026"})
+        self.assertEqual(
+            {row["username"] for row in response.json()["results"]}, {"student0"}
+        )
+        self.assertEqual(len(response.json()["results"]), 2)
+
+    def test_course_changes_are_synced(self):
+        since = timezone.now()
+        course = self.courses[0]
+        course.title = "Renamed"
+        course.save()
+        response = self.client.get(self.url, {"updated_since": since.isoformat()})
+        self.assertEqual(
+            {row["course_code"] for row in response.json()["results"]}, {"CS100"}
+        )
+        self.assertEqual(len(response.json()["results"]), 5)
+
+    def test_conditional_get(self):
+        response = self.client.get(self.url)
+        etag = response["ETag"]
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        TakenCourse.objects.first().save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_results(self):
+        response = self.client.get(reverse("result-api:results"), {"semester": "First"})
+        results = response.json()["results"]
+        self.assertEqual(len(results), 5)
+        self.assertEqual(results[0]["credits"], 3)
+
+    def test_only_superusers(self):
+        self.client.force_login(User.objects.get(username="student0"))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
@@ -0,0 +1,93 @@
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from reportlab.platypus import Spacer
+
+from config.celery import app as celery_app
+from core.models import DocumentJob
+from result import pdf
+from result.benchmark import SCENARIOS, compare_reports, run_benchmark
+
+
+@override_settings(
+    MEDIA_ROOT=tempfile.mkdtemp(),
+    STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage",
+)
+@mock.patch.object(pdf, "get_logo", lambda *args: Spacer(1, 1))
+@mock.patch.object(pdf, "get_picture", lambda *args: Spacer(1, 1))
+class BenchmarkTestCase(TestCase):
+    def setUp(self):
+        celery_app.conf.CELERY_TASK_ALWAYS_EAGER = True
+        self.addCleanup(setattr, celery_app.conf, "CELERY_TASK_ALWAYS_EAGER", False)
+
+    def test_report(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            report = run_benchmark([3, 5], repeat=2, courses_per_semester=2)
+        self.assertEqual(report["repeat"], 2)
+        self.assertEqual(
+            [(entry["scenario"], entry["size"]) for entry in report["results"]],
+            [(name, size) for size in (3, 5) for name in SCENARIOS],
+        )
+        for entry in report["results"]:
+            self.assertIn(entry["status"], (200, 302))
+            self.assertIsNone(entry["error"])
+            self.assertGreater(entry["queries"], 0)
+            self.assertLessEqual(entry["seconds"]["min"], entry["seconds"]["max"])
+        # on_commit callbacks run when the block exits, the job is queued
+        self.assertEqual(report["results"][3]["job"], "pending")
+        self.assertEqual(compare_reports(report, report), [])
+
+    def test_failed_job_is_an_error(self):
+        failed = DocumentJob(
+            status=DocumentJob.FAILED, error="Traceback\nOSError: boom"
+        )
+        with mock.patch.object(DocumentJob.objects, "filter") as filter:
+            filter.return_value.first.return_value = failed
+            report = run_benchmark(
+                [3],
+                repeat=1,
+                scenarios=["result_sheet_pdf_view"],
+                courses_per_semester=1,
+            )
+        [entry] = report["results"]
+        self.assertEqual(entry["error"], "job failed: OSError: boom")
+        self.assertEqual(
+            compare_reports(report, report),
+            ["result_sheet_pdf_view (3 students): job failed: OSError: boom"],
+        )
+
+    def test_compare_reports(self):
+        def report(queries, median):
+            return {
+                "results": [
+                    {
+                        "scenario": "grade_result",
+                        "size": 50,
+                        "queries": queries,
+                        "seconds": {"median": median},
+                    }
+                ]
+            }
+
+        baseline = report(6, 0.1)
+        self.assertEqual(compare_reports(baseline, report(6, 0.12)), [])
+        self.assertEqual(
+            compare_reports(baseline, report(7, 0.2)),
+            [
+                "grade_result (50 students): 7 queries, was 6",
+                "grade_result (50 students): 0.200s, was 0.100s",
+            ],
+        )
+        self.assertEqual(
+            compare_reports(baseline, report(7, 0.2), 2),
+            [
+                "grade_result (50 students): 7 queries, was 6",
+            ],
+        )
+        broken = report(6, 0.01)
+        broken["results"][0]["error"] = "HTTP 500"
+        self.assertEqual(
+            compare_reports(baseline, broken),
+            ["grade_result (50 students): HTTP 500"],
+        )
@@ -0,0 +1,128 @@
+import io
+import tempfile
+import zipfile
+from unittest import mock
+
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from reportlab.platypus import Spacer
+
+from accounts.models import User, Student
+from config.celery import app as celery_app
+from core.models import Session, Semester, DocumentJob
+from course.models import Program, Course, CourseAllocation
+from result import export, pdf
+from result.export import (
+    RESULT_SHEETS,
+    REGISTRATION_FORMS,
+    export_documents,
+    result_sheet_tasks,
+)
+from result.models import TakenCourse
+
+
+@mock.patch.object(pdf, "get_logo", lambda *args: Spacer(1, 1))
+@mock.patch.object(pdf, "get_picture", lambda *args: Spacer(1, 1))
+class ExportDocumentsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.session = Session.objects.create(
+            session="2024/2025", is_current_session=True
+        )
+        self.semester = Semester.objects.create(
+            semester="First", is_current_semester=True, session=self.session
+        )
+        program = Program.objects.create(title="Computer Science")
+        lecturer = User.objects.create(
+            username="lecturer", first_name="Ada", last_name="Lovelace"
+        )
+        allocation = CourseAllocation.objects.create(
+            lecturer=lecturer, session=self.session
+        )
+        courses = [
+            Course.objects.create(
+                title=f"Course {i}",
+                code=f"CS10{i}",
+                credit=3,
+                program=program,
+                semester="First",
+            )
+            for i in range(3)
+        ]
+        allocation.courses.add(courses[0])
+        Course.objects.create(
+            title="Unregistered", code="CS200", credit=3, program=program
+        )
+        for i in range(2):
+            student = Student.objects.create(
+                student=User.objects.create(username=f"student{i}"), program=program
+            )
+            for course in courses:
+                TakenCourse.objects.create(student=student, course=course)
+
+    def test_result_sheets(self):
+        output = io.BytesIO()
+        stats = export_documents(
+            RESULT_SHEETS, output, self.session, self.semester, processes=1
+        )
+        self.assertEqual(stats["documents"], 3)
+        tasks = result_sheet_tasks(self.session, self.semester)
+        self.assertEqual([task[1] for task in tasks], ["Ada Lovelace", "", ""])
+        names = zipfile.ZipFile(output).namelist()
+        self.assertEqual(len(names), 3)
+        self.assertIn(
+            "First_semester_2024-2025_Course 0 (CS100)_resultSheet.pdf", names
+        )
+
+    def test_registration_forms(self):
+        output = io.BytesIO()
+        export_documents(
+            REGISTRATION_FORMS, output, self.session, self.semester, processes=1
+        )
+        archive = zipfile.ZipFile(output)
+        self.assertEqual(archive.namelist(), ["student0.pdf", "student1.pdf"])
+        self.assertTrue(archive.read("student0.pdf").startswith(b"%PDF"))
+
+    def test_command_reports_throughput(self):
+        stdout = io.StringIO()
+        with tempfile.NamedTemporaryFile(suffix=".zip") as output:
+            call_command(
+                "export_documents",
+                RESULT_SHEETS,
+                output.name,
+                processes=1,
+                stdout=stdout,
+            )
+            self.assertEqual(len(zipfile.ZipFile(output.name).namelist()), 3)
+        self.assertIn("Exported 3 documents", stdout.getvalue())
+        self.assertIn("documents/s", stdout.getvalue())
+
+    @override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+    def test_admin_action_queues_a_document_job(self):
+        celery_app.conf.CELERY_TASK_ALWAYS_EAGER = True
+        self.addCleanup(setattr, celery_app.conf, "CELERY_TASK_ALWAYS_EAGER", False)
+        admin = User.objects.create_superuser(username="admin", password="pw")
+        self.client.force_login(admin)
+        with mock.patch.object(
+            export, "map_documents", lambda render, tasks, processes: map(render, tasks)
+        ), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("admin:core_semester_changelist"),
+                {
+                    "action": "export_result_sheets",
+                    "_selected_action": [self.semester.pk],
+                },
+            )
+        self.assertEqual(response.status_code, 302)
+        job = DocumentJob.objects.get()
+        self.assertEqual(job.status, DocumentJob.DONE)
+        [message] = get_messages(response.wsgi_request)
+        self.assertIn(job.get_absolute_url(), message.message)
+
+        response = self.client.get(job.get_absolute_url())
+        self.assertEqual(response["Content-Type"], "application/zip")
+        content = b"".join(response.streaming_content)
+        self.assertEqual(len(zipfile.ZipFile(io.BytesIO(content)).namelist()), 3)
@@ -0,0 +1,74 @@
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+
+from accounts.models import User, Student
+from course.models import Program, Course
+from result.grading import DEFAULT_GRADE_SCALE, get_grade_scale
+from result.models import TakenCourse, GradingScale, GradeBoundary
+from result.utils import regrade_taken_courses
+
+
+class GradeScaleTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_default_scale_matches_thresholds(self):
+        grades, points = DEFAULT_GRADE_SCALE.grade_many([100, 90, 89.99, 45, 44.99, 0])
+        self.assertEqual(grades, ["A+", "A+", "A", "D", "F", "F"])
+        self.assertEqual(points, [4, 4, 4, 1, 0, 0])
+        self.assertEqual(DEFAULT_GRADE_SCALE.grade(None), "NG")
+
+    def test_grade_many_matches_grade(self):
+        totals = [72, None, 45, 0, 100, 44.99, 85, 45, None, 59.5, 90]
+        grades, points = DEFAULT_GRADE_SCALE.grade_many(totals)
+        self.assertEqual(grades, [DEFAULT_GRADE_SCALE.grade(total) for total in totals])
+        self.assertEqual(points, [DEFAULT_GRADE_SCALE.point(grade) for grade in grades])
+        self.assertEqual(DEFAULT_GRADE_SCALE.grade_many([]), ([], []))
+
+    def test_most_specific_scale_wins(self):
+        program = Program.objects.create(title="Mathematics")
+        general = GradingScale.objects.create(title="General")
+        GradeBoundary.objects.create(scale=general, grade="A", min_total=50, point=4)
+        special = GradingScale.objects.create(title="Maths", program=program)
+        GradeBoundary.objects.create(scale=special, grade="B", min_total=50, point=3)
+
+        self.assertEqual(get_grade_scale(program.pk, "Bachelor").grade(60), "B")
+        self.assertEqual(get_grade_scale(None, "Bachelor").grade(60), "A")
+
+        # editing a boundary invalidates the compiled scales
+        special.boundaries.update(min_total=70)
+        GradeBoundary.objects.get(scale=special).save()
+        self.assertEqual(get_grade_scale(program.pk, "Bachelor").grade(60), "F")
+
+    def test_fallback_scales_are_unique(self):
+        program = Program.objects.create(title="Mathematics")
+        for fields in ({}, {"program": program}, {"level": "Bachelor"}):
+            GradingScale.objects.create(title="First", **fields)
+            duplicate = GradingScale(title="Second", **fields)
+            with self.assertRaises(ValidationError):
+                duplicate.full_clean()
+            with self.assertRaises(IntegrityError), transaction.atomic():
+                duplicate.save()
+        GradingScale.objects.create(title="Both", program=program, level="Bachelor")
+        self.assertEqual(GradingScale.objects.count(), 4)
+
+    def test_regrade_taken_courses(self):
+        program = Program.objects.create(title="Physics")
+        course = Course.objects.create(
+            title="Mechanics", code="PH101", credit=2, program=program
+        )
+        student = Student.objects.create(
+            student=User.objects.create(username="student"), program=program
+        )
+        taken = TakenCourse.objects.create(student=student, course=course, total=60)
+        scale = GradingScale.objects.create(title="Physics", program=program)
+        GradeBoundary.objects.create(scale=scale, grade="A", min_total=55, point=4)
+
+        # the transcript versions are renewed in the database (2 updates)
+        with self.assertNumQueries(20):
+            students = regrade_taken_courses(TakenCourse.objects.all())
+        self.assertEqual(students, {student.pk})
+        taken.refresh_from_db()
+        self.assertEqual((taken.grade, taken.point, taken.comment), ("A", 8, "PASS"))
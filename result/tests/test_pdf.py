@@ -0,0 +1,80 @@
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from reportlab.platypus import Spacer
+
+from accounts.models import User, Student
+from config.celery import app as celery_app
+from core.models import Session, Semester, DocumentJob
+from course.models import Program, Course
+from result import pdf
+from result.models import TakenCourse
+
+
+# the logo shipped in static/ is a placeholder reportlab cannot read
+@mock.patch.object(pdf, "get_logo", lambda *args: Spacer(1, 1))
+class ResultSheetTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        celery_app.conf.CELERY_TASK_ALWAYS_EAGER = True
+        self.addCleanup(setattr, celery_app.conf, "CELERY_TASK_ALWAYS_EAGER", False)
+        session = Session.objects.create(session="2024/2025", is_current_session=True)
+        Semester.objects.create(
+            semester="First", is_current_semester=True, session=session
+        )
+        program = Program.objects.create(title="Computer Science")
+        self.course = Course.objects.create(
+            title="Algorithms", code="CS101", credit=3, program=program
+        )
+        for i in range(60):
+            student = Student.objects.create(
+                student=User.objects.create(username=f"student{i}"), program=program
+            )
+            TakenCourse.objects.create(
+                student=student, course=self.course, total=i, grade="F", comment="FAIL"
+            )
+        self.lecturer = User.objects.create_superuser(
+            username="lecturer", password="password"
+        )
+
+    @override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+    def test_result_sheet_is_rendered_by_a_job(self):
+        self.client.force_login(self.lecturer)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(
+                reverse("result_sheet_pdf_view", kwargs={"id": self.course.pk})
+            )
+        job = DocumentJob.objects.get()
+        self.assertRedirects(
+            response, job.get_absolute_url(), fetch_redirect_response=False
+        )
+        self.assertEqual(job.status, DocumentJob.DONE)
+        response = self.client.get(job.get_absolute_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertTrue(b"".join(response.streaming_content).startswith(b"%PDF"))
+
+    def test_unchanged_sheet_is_not_rendered_again(self):
+        with mock.patch.object(
+            pdf, "build_result_sheet", wraps=pdf.build_result_sheet
+        ) as build:
+            first = pdf.render_result_sheet(self.course, "Lecturer", "First", "2024")
+            with self.assertNumQueries(1):
+                second = pdf.render_result_sheet(
+                    self.course, "Lecturer", "First", "2024"
+                )
+            self.assertEqual(first, second)
+            TakenCourse.objects.filter(course=self.course).update(total=99)
+            pdf.render_result_sheet(self.course, "Lecturer", "First", "2024")
+        self.assertEqual(build.call_count, 2)
+
+    @mock.patch.object(pdf, "get_picture", lambda *args: Spacer(1, 1))
+    def test_registration_form(self):
+        user = User.objects.get(username="student0")
+        session = Session.objects.get()
+        with self.assertNumQueries(4):
+            form = pdf.render_registration_form(user, session)
+        self.assertTrue(form.startswith(b"%PDF"))
@@ -0,0 +1,79 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import User, Student
+from core.models import Session, Semester
+from course.models import Program, Course
+from result.models import TakenCourse
+from result.transcript import get_transcript
+from result.utils import record_scores
+
+
+class TranscriptTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.session = Session.objects.create(
+            session="2024/2025", is_current_session=True
+        )
+        self.semester = Semester.objects.create(
+            semester="First", is_current_semester=True, session=self.session
+        )
+        program = Program.objects.create(title="Computer Science")
+        self.user = User.objects.create_user(username="student", password="password")
+        # set directly, saving a new student sends the credentials email
+        User.objects.filter(pk=self.user.pk).update(is_student=True)
+        self.student = Student.objects.create(student=self.user, program=program)
+        self.courses = []
+        for i, (semester, credit) in enumerate(
+            [("First", 3), ("First", 2), ("Second", 4)]
+        ):
+            course = Course.objects.create(
+                title=f"Course {i}",
+                code=f"CS10{i}",
+                credit=credit,
+                program=program,
+                semester=semester,
+            )
+            self.courses.append(course)
+            TakenCourse.objects.create(student=self.student, course=course)
+
+    def test_transcript_is_built_in_a_fixed_number_of_queries(self):
+        with self.assertNumQueries(3):
+            transcript = get_transcript(self.student)
+        self.assertEqual(len(transcript["courses"]), 3)
+        self.assertEqual(transcript["credits"], {"First": 5, "Second": 4})
+        self.assertEqual(transcript["total_credits"], 9)
+        self.assertEqual(transcript["sessions"], ["2024/2025"])
+        with self.assertNumQueries(0):
+            self.assertEqual(get_transcript(self.student), transcript)
+
+    def test_transcript_is_dropped_when_scores_change(self):
+        self.assertEqual(get_transcript(self.student)["previous_cgpa"], 0)
+        course = self.courses[2]
+        taken = TakenCourse.objects.get(course=course)
+        with self.captureOnCommitCallbacks(execute=True):
+            record_scores(
+                course,
+                {taken.pk: {"final_exam": 90}},
+                self.session,
+            )
+        # the student as a new request loads it, with the renewed version
+        self.student.refresh_from_db()
+        transcript = get_transcript(self.student)
+        self.assertEqual(transcript["courses"][2].grade, "A+")
+        # 4 credits * 4 points over the 9 credits taken at the level
+        self.assertEqual(transcript["previous_cgpa"], 1.78)
+
+    @override_settings(
+        STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+    )
+    def test_grade_result(self):
+        self.client.force_login(self.user)
+        self.student.refresh_from_db()
+        get_transcript(self.student)
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("grade_results"))
+        self.assertEqual(response.context["total_first_semester_credit"], 5)
+        self.assertEqual(response.context["total_sec_semester_credit"], 4)
+        self.assertEqual(len(response.context["courses"]), 3)
@@ -0,0 +1,171 @@
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.http import QueryDict
+from django.test import TestCase
+
+from accounts.models import User, Student
+from core.models import Session, Semester
+from course.models import Program, Course
+from result.models import TakenCourse, Result
+from result.utils import parse_scores, record_scores
+
+
+def score_sheet(rows):
+    data = QueryDict(mutable=True)
+    for pk, scores in rows.items():
+        data.setlist(str(pk), [str(score) for score in scores])
+    return data
+
+
+class ScoreEntryTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.session = Session.objects.create(
+            session="2024/2025", is_current_session=True
+        )
+        self.semester = Semester.objects.create(
+            semester="First", is_current_semester=True, session=self.session
+        )
+        program = Program.objects.create(title="Computer Science")
+        self.course = Course.objects.create(
+            title="Algorithms",
+            code="CS101",
+            credit=3,
+            program=program,
+            semester="First",
+        )
+        Course.objects.create(
+            title="Databases", code="CS102", credit=3, program=program, semester="First"
+        )
+        self.taken = []
+        for i in range(5):
+            user = User.objects.create(username=f"student{i}")
+            student = Student.objects.create(student=user, program=program)
+            self.taken.append(
+                TakenCourse.objects.create(student=student, course=self.course)
+            )
+
+    def test_parse_scores_rejects_bad_rows(self):
+        data = score_sheet({self.taken[0].pk: [10, 10, "x", 10, 150]})
+        with self.assertRaises(ValidationError) as cm:
+            parse_scores(data)
+        self.assertEqual(len(cm.exception.messages), 2)
+
+    def test_record_scores_updates_rows_and_results(self):
+        data = score_sheet({tc.pk: [10, 20, 10, 5, 45] for tc in self.taken})
+        record_scores(self.course, parse_scores(data), self.session)
+
+        taken = TakenCourse.objects.get(pk=self.taken[0].pk)
+        self.assertEqual(taken.total, 90)
+        self.assertEqual(taken.grade, "A+")
+        self.assertEqual(taken.point, 12)
+        self.assertEqual(taken.comment, "PASS")
+
+        result = Result.objects.get(student=taken.student)
+        self.assertEqual((result.points, result.credits), (12, 3))
+        self.assertEqual(result.gpa, 4.0)
+        self.assertEqual(result.cgpa, 4.0)
+        self.assertEqual(Result.objects.count(), len(self.taken))
+
+    def test_record_scores_query_count_is_constant(self):
+        data = score_sheet({tc.pk: [10, 10, 10, 10, 10] for tc in self.taken})
+        # the first submission also compiles the grading scales, and renewing
+        # the transcript versions is an update each for results and scores
+        with self.assertNumQueries(18):
+            record_scores(self.course, parse_scores(data), self.session)
+        # a second pass updates the existing results instead of creating them
+        data = score_sheet({tc.pk: [20, 10, 10, 10, 10] for tc in self.taken})
+        with self.assertNumQueries(17):
+            record_scores(self.course, parse_scores(data), self.session)
+
+    def test_record_scores_rejects_foreign_rows(self):
+        data = score_sheet({self.taken[0].pk: [1, 1, 1, 1, 1], 999: [1, 1, 1, 1, 1]})
+        with self.assertRaises(ValidationError):
+            record_scores(self.course, parse_scores(data), self.session)
+        self.assertEqual(TakenCourse.objects.get(pk=self.taken[0].pk).total, 0)
+
+
+class ResultAggregateTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        Session.objects.create(session="2024/2025", is_current_session=True)
+        program = Program.objects.create(title="Computer Science")
+        self.first = Course.objects.create(
+            title="Algorithms",
+            code="CS101",
+            credit=3,
+            program=program,
+            semester="First",
+        )
+        self.second = Course.objects.create(
+            title="Compilers",
+            code="CS201",
+            credit=2,
+            program=program,
+            semester="Second",
+        )
+        self.student = Student.objects.create(
+            student=User.objects.create(username="student"), program=program
+        )
+
+    def get_result(self, semester):
+        return Result.objects.get(student=self.student, semester=semester)
+
+    def test_registration_score_and_drop_adjust_results(self):
+        first = TakenCourse.objects.create(student=self.student, course=self.first)
+        second = TakenCourse.objects.create(student=self.student, course=self.second)
+        self.assertEqual(self.get_result("First").credits, 3)
+        self.assertEqual(self.get_result("Second").level_credits, 5)
+
+        first = TakenCourse.objects.get(pk=first.pk)
+        first.point = 12
+        first.save()
+        second.point = 4
+        second.save()
+        result = self.get_result("Second")
+        self.assertEqual((result.gpa, result.cgpa), (2.0, 3.2))
+        self.assertEqual(self.get_result("First").gpa, 4.0)
+
+        second.delete()
+        result = self.get_result("First")
+        self.assertEqual((result.level_points, result.level_credits), (12, 3))
+        self.assertEqual(result.cgpa, 4.0)
+
+    def test_new_session_gets_its_own_results(self):
+        taken = TakenCourse.objects.create(student=self.student, course=self.first)
+        taken.point = 12
+        taken.save()
+        Session.objects.update(is_current_session=False)
+        Session.objects.create(session="2025/2026", is_current_session=True)
+
+        taken.point = 6
+        taken.save()
+        TakenCourse.objects.create(student=self.student, course=self.second)
+        results = {
+            (result.session, result.semester): result
+            for result in Result.objects.filter(student=self.student)
+        }
+        self.assertEqual(
+            sorted(results),
+            [("2024/2025", "First"), ("2025/2026", "First"), ("2025/2026", "Second")],
+        )
+        # the earlier session keeps the results it had
+        old = results[("2024/2025", "First")]
+        self.assertEqual(
+            (old.points, old.credits, old.gpa, old.cgpa), (12, 3, 4.0, 4.0)
+        )
+        new = results[("2025/2026", "First")]
+        self.assertEqual((new.points, new.credits, new.gpa), (6, 3, 2.0))
+        self.assertEqual((new.level_points, new.level_credits), (6, 5))
+        self.assertEqual(results[("2025/2026", "Second")].cgpa, 1.2)
+
+    def test_credit_change_rescales_points(self):
+        taken = TakenCourse.objects.create(
+            student=self.student, course=self.first, total=95
+        )
+        self.first.credit = 4
+        self.first.save()
+        taken.refresh_from_db()
+        self.assertEqual(taken.point, 16)
+        result = self.get_result("First")
+        self.assertEqual((result.points, result.credits, result.gpa), (16, 4, 4.0))
@@ -0,0 +1,88 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Sum
+
+from accounts.models import Student
+from .models import TakenCourse, Result, SECOND
+
+
+def transcript_cache_key(student_id, version=""):
+    return f"result:transcript:{student_id}:{version}"
+
+
+def get_transcript(student):
+    """
+    Return the transcript of ``student`` at their current level.
+
+    The transcript is built in three queries (taken courses, results and
+    the credit/point totals grouped by level and semester) and cached
+    under the student's transcript version, until one of their scores or
+    results changes.
+    """
+    key = transcript_cache_key(student.pk, student.transcript_version)
+    transcript = cache.get(key)
+    if transcript is None:
+        transcript = build_transcript(student)
+        cache.set(key, transcript, settings.TRANSCRIPT_CACHE_TIMEOUT)
+    return transcript
+
+
+def build_transcript(student):
+    taken_courses = list(
+        TakenCourse.objects.filter(student=student)
+        .select_related("course")
+        .order_by("id")
+    )
+    # the level of study is the one of the most recently registered course
+    level = taken_courses[-1].course.level if taken_courses else None
+    results = list(
+        Result.objects.filter(student=student, level=level).order_by(
+            "session", "semester"
+        )
+    )
+    totals = {
+        (row["course__level"], row["course__semester"]): {
+            "courses": row["courses"],
+            "credits": row["credits"] or 0,
+            "points": row["points"] or 0,
+        }
+        for row in TakenCourse.objects.filter(student=student)
+        .order_by()
+        .values("course__level", "course__semester")
+        .annotate(
+            courses=Count("id"),
+            credits=Sum("course__credit"),
+            points=Sum("point"),
+        )
+    }
+    credits = {
+        semester: total["credits"]
+        for (total_level, semester), total in totals.items()
+        if total_level == level
+    }
+    previous_cgpa = next(
+        (result.cgpa for result in results if result.semester == SECOND), 0
+    )
+    return {
+        "level": level,
+        "courses": [obj for obj in taken_courses if obj.course.level == level],
+        "results": results,
+        "sessions": sorted({result.session for result in results if result.session}),
+        "totals": totals,
+        "credits": credits,
+        "total_credits": sum(credits.values()),
+        "previous_cgpa": previous_cgpa or 0,
+    }
+
+
+def clear_transcripts(student_ids):
+    """
+    Make the cached transcripts of ``student_ids`` stale by renewing their
+    version. It is stored with the student, so it commits or rolls back
+    with the change and every process sees it whatever the cache backend.
+    """
+    Student.objects.filter(pk__in=set(student_ids)).update(
+        transcript_version=uuid.uuid4().hex
+    )
@@ -6,6 +6,8 @@ from .views import (
     assessment_result,
     course_registration_form,
     result_sheet_pdf_view,
+    course_statistics,
+    course_statistics_detail,
 )
 
 
@@ -18,4 +20,10 @@ urlpatterns = [
     path(
         "registration/form/", course_registration_form, name="course_registration_form"
     ),
+    path("statistics/", course_statistics, name="course_statistics"),
+    path(
+        "statistics/<int:id>/",
+        course_statistics_detail,
+        name="course_statistics_detail",
+    ),
 ]
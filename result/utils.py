@@ -0,0 +1,273 @@
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import Session
+from .analytics import refresh_course_statistics
+from .grading import get_grade_scale, get_grade_scales
+from .models import TakenCourse, Result, FAIL, PASS
+from .transcript import clear_transcripts
+
+# Order of the score inputs posted for each student in add_score_for.html
+SCORE_FIELDS = ("assignment", "mid_exam", "quiz", "attendance", "final_exam")
+
+MAX_SCORE = Decimal("100")
+
+
+def parse_scores(data):
+    """
+    Validate a whole score sheet before anything is written.
+
+    ``data`` is the submitted QueryDict (without the csrf token) where each
+    key is a TakenCourse id and its value list holds the scores in the
+    order of SCORE_FIELDS. Returns ``{taken_course_id: {field: Decimal}}``
+    and raises ValidationError listing every bad row.
+    """
+    scores = {}
+    errors = []
+    for key in data.keys():
+        if not str(key).isdigit():
+            errors.append(f"Unknown field '{key}'.")
+            continue
+        values = data.getlist(key)
+        if len(values) != len(SCORE_FIELDS):
+            errors.append(f"Row {key}: expected {len(SCORE_FIELDS)} scores.")
+            continue
+        row = {}
+        for field, value in zip(SCORE_FIELDS, values):
+            try:
+                score = Decimal(value.strip() or "0").quantize(Decimal("0.01"))
+            except (InvalidOperation, AttributeError):
+                errors.append(f"Row {key}: '{value}' is not a valid {field} score.")
+                continue
+            if not Decimal("0") <= score <= MAX_SCORE:
+                errors.append(f"Row {key}: {field} must be between 0 and 100.")
+                continue
+            row[field] = score
+        scores[int(key)] = row
+    if errors:
+        raise ValidationError(errors)
+    return scores
+
+
+def record_scores(course, scores, session):
+    """
+    Write a validated score sheet for ``course`` in one transaction.
+
+    All TakenCourse rows are fetched in one query and written back with a
+    single bulk_update, then the Result rows of the affected students in
+    ``session``, at the semester and level of the course, are adjusted by
+    the change in points.
+    """
+    with transaction.atomic():
+        taken_courses = list(
+            TakenCourse.objects.select_related("course").filter(
+                course=course, pk__in=scores.keys()
+            )
+        )
+        unknown = set(scores) - {obj.pk for obj in taken_courses}
+        if unknown:
+            raise ValidationError(
+                "Students %s are not registered for this course."
+                % ", ".join(map(str, sorted(unknown)))
+            )
+
+        old_points = {obj.pk: obj.point for obj in taken_courses}
+        now = timezone.now()
+        for obj in taken_courses:
+            for field, score in scores[obj.pk].items():
+                setattr(obj, field, score)
+            obj.total = obj.get_total(*[getattr(obj, field) for field in SCORE_FIELDS])
+            obj.updated_at = now
+        apply_grades(taken_courses, get_grade_scale(course.program_id, course.level))
+
+        TakenCourse.objects.bulk_update(
+            taken_courses,
+            SCORE_FIELDS + ("total", "grade", "point", "comment", "updated_at"),
+        )
+        apply_result_deltas(
+            {
+                (obj.student_id, course.semester, course.level): (
+                    obj.point - old_points[obj.pk],
+                    0,
+                )
+                for obj in taken_courses
+            },
+            session=session,
+        )
+        refresh_course_statistics([course.pk])
+        clear_transcripts(obj.student_id for obj in taken_courses)
+    return taken_courses
+
+
+def apply_grades(taken_courses, scale):
+    """Set grade, point and comment on ``taken_courses`` with one scale lookup."""
+    grades, points = scale.grade_many([obj.total for obj in taken_courses])
+    for obj, grade, point in zip(taken_courses, grades, points):
+        obj.grade = grade
+        obj.point = to_points(int(obj.course.credit) * point)
+        obj.comment = FAIL if grade in (scale.fail_grade, scale.no_grade) else PASS
+
+
+def regrade_taken_courses(queryset, batch_size=1000):
+    """
+    Re-apply the grading scales to every row of ``queryset``.
+
+    Rows are graded per (program, level) scale in one ``grade_many`` call,
+    written back with bulk_update and the Result aggregates are adjusted
+    by the change in points. Returns the ids of the affected students.
+    """
+    with transaction.atomic():
+        taken_courses = list(
+            queryset.select_related("course").only(
+                "id",
+                "student",
+                "total",
+                "point",
+                "course__credit",
+                "course__program",
+                "course__level",
+                "course__semester",
+            )
+        )
+        old_points = {obj.pk: obj.point for obj in taken_courses}
+        groups = {}
+        for obj in taken_courses:
+            groups.setdefault((obj.course.program_id, obj.course.level), []).append(obj)
+
+        scales = get_grade_scales()
+        for (program_id, level), rows in groups.items():
+            apply_grades(rows, get_grade_scale(program_id, level, scales=scales))
+        now = timezone.now()
+        for obj in taken_courses:
+            obj.updated_at = now
+
+        TakenCourse.objects.bulk_update(
+            taken_courses,
+            ["grade", "point", "comment", "updated_at"],
+            batch_size=batch_size,
+        )
+        deltas = {}
+        for obj in taken_courses:
+            key = (obj.student_id, obj.course.semester, obj.course.level)
+            points, credits = deltas.get(key, (0, 0))
+            deltas[key] = (points + obj.point - old_points[obj.pk], credits)
+        apply_result_deltas(deltas)
+        refresh_course_statistics({obj.course_id for obj in taken_courses})
+        students = {obj.student_id for obj in taken_courses}
+        clear_transcripts(students)
+    return students
+
+
+def apply_result_deltas(deltas, session=None, create=True):
+    """
+    Adjust the Result aggregates by ``{(student_id, semester, level):
+    (points, credits)}`` instead of rescanning the students' history.
+
+    Only the rows of ``session`` (the current session by default) change:
+    the semester row gets the change in its own sums and every row of the
+    student at that level in the session gets it in the level sums; GPA
+    and CGPA are then derived from the sums. The rows of earlier sessions
+    are kept as they were. A missing semester row is created for the
+    session, carrying on from the student's latest sums, unless
+    ``create`` is False. The number of queries does not depend on the
+    number of students.
+    """
+    deltas = {key: value for key, value in deltas.items() if any(value)}
+    if not deltas:
+        return []
+    if session is None:
+        session = Session.objects.filter(is_current_session=True).first()
+    session = str(session) if session is not None else None
+
+    with transaction.atomic():
+        semester_rows, level_rows = {}, {}
+        # the latest rows of any session, the sums a new session starts from
+        latest_semester, latest_level = {}, {}
+        for result in (
+            Result.objects.select_for_update()
+            .filter(
+                student_id__in={key[0] for key in deltas},
+                level__in={key[2] for key in deltas},
+            )
+            .order_by("id")
+        ):
+            key = (result.student_id, result.semester, result.level)
+            latest_semester[key] = result
+            latest_level[(result.student_id, result.level)] = result
+            if result.session == session:
+                level_rows.setdefault((result.student_id, result.level), []).append(
+                    result
+                )
+                semester_rows[key] = result
+
+        to_create = []
+        for (student_id, semester, level), (points, credits) in deltas.items():
+            siblings = level_rows.setdefault((student_id, level), [])
+            result = semester_rows.get((student_id, semester, level))
+            if result is None:
+                if not create:
+                    continue
+                previous = latest_semester.get((student_id, semester, level))
+                level_previous = (
+                    siblings[0] if siblings else latest_level.get((student_id, level))
+                )
+                result = Result(
+                    student_id=student_id,
+                    semester=semester,
+                    session=session,
+                    level=level,
+                    points=previous.points if previous else 0,
+                    credits=previous.credits if previous else 0,
+                    level_points=level_previous.level_points if level_previous else 0,
+                    level_credits=level_previous.level_credits if level_previous else 0,
+                )
+                semester_rows[(student_id, semester, level)] = result
+                siblings.append(result)
+                to_create.append(result)
+            result.points = to_points(result.points + to_points(points))
+            result.credits += credits
+            for row in siblings:
+                row.level_points = to_points(row.level_points + to_points(points))
+                row.level_credits += credits
+
+        touched = [
+            row
+            for student_id, semester, level in deltas
+            for row in level_rows[(student_id, level)]
+        ]
+        touched = list({id(row): row for row in touched}.values())
+        now = timezone.now()
+        for row in touched:
+            row.gpa = _ratio(float(row.points), row.credits)
+            row.cgpa = _ratio(float(row.level_points), row.level_credits)
+            row.updated_at = now
+
+        Result.objects.bulk_update(
+            [row for row in touched if row.pk],
+            [
+                "points",
+                "credits",
+                "level_points",
+                "level_credits",
+                "gpa",
+                "cgpa",
+                "updated_at",
+            ],
+        )
+        Result.objects.bulk_create(to_create)
+        clear_transcripts(row.student_id for row in touched)
+    return touched
+
+
+def to_points(value):
+    return Decimal(str(value or 0)).quantize(Decimal("0.01"))
+
+
+def _ratio(points, credits):
+    try:
+        return round(points / credits, 2)
+    except ZeroDivisionError:
+        return 0